@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+import time
+from typing import TYPE_CHECKING, Optional
+
+import metrics
+from config import Config
+from health import Watchdog
+from tracing import FileSpanExporter, Tracer
+
+if TYPE_CHECKING:
+    import discord
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SIGNAL_CYCLES = 3
+
+
+class App:
+    """
+    The bot's long-lived services, built from a Config.
+
+    Construction only wires objects together: nothing connects to the
+    database, Reddit or Discord until ``start``. The schema check runs once
+    per process, not on every gateway reconnect.
+    """
+
+    def __init__(self, config: Config):
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from sqlalchemy.orm import sessionmaker
+
+        import storage
+        from reddit_monitor import RedditMonitor
+
+        self.config = config
+        self.engine = storage.create_engine(config.database_url)
+        metrics.instrument_engine(self.engine)
+        self.session_factory = sessionmaker(
+            self.engine,
+            class_=AsyncSession,  # This makes sessions async-capable
+            expire_on_commit=False,  # Keeps objects usable after commit
+            autoflush=False  # More explicit control over when SQL is executed
+        )
+
+        self.span_exporter = FileSpanExporter(config.trace_file) if config.trace_sample_ratio > 0 else None
+        self.reddit_monitor = RedditMonitor(
+            config.reddit_client_id,
+            config.reddit_secret,
+            config.user_agent,
+            self.session_factory,
+            max_posts=config.new_posts,
+            min_posts=config.new_posts_min,
+            reddit_kwargs=config.reddit_kwargs,
+            tracer=Tracer(self.span_exporter, config.trace_sample_ratio),
+            fetch_concurrency=config.fetch_concurrency,
+            notify_concurrency=config.notify_concurrency,
+            comment_batch_size=config.comment_batch_size,
+            new_filter_backfill=config.new_filter_backfill,
+            concurrent_reads=storage.supports_concurrent_reads(config.database_url)
+        )
+        if config.profile_cycles:
+            self.reddit_monitor.profiler.request(config.profile_cycles)
+
+        self.watchdog = Watchdog(self.reddit_monitor, max_cycle_age=config.health_max_cycle_age)
+        self.metrics_server: Optional[metrics.MetricsServer] = None
+        self.monitor_task: Optional[asyncio.Task] = None
+        self.started_at: Optional[float] = None
+        self._schema_ready = False
+
+    async def ensure_schema(self) -> None:
+        """Create any missing tables with one catalog query; a no-op after the first call."""
+        if self._schema_ready:
+            return
+        from sqlalchemy import inspect
+
+        from migrations import backfill_entry_keywords
+        from models import Base, EntryKeyword
+
+        def create_missing(sync_conn) -> list:
+            existing = set(inspect(sync_conn).get_table_names())
+            missing = [table for table in Base.metadata.sorted_tables if table.name not in existing]
+            if missing:
+                Base.metadata.create_all(sync_conn, tables=missing, checkfirst=False)
+            if EntryKeyword.__table__ in missing:
+                # Databases from before entry_keywords only have the comma separated column
+                backfill_entry_keywords(sync_conn)
+            return [table.name for table in missing]
+
+        async with self.engine.begin() as conn:
+            created = await conn.run_sync(create_missing)
+        if created:
+            logger.info("Created tables: %s", ', '.join(created))
+        self._schema_ready = True
+
+    async def start(self, discord_client: discord.Client) -> None:
+        """Check the schema and start the metrics server, span exporter and monitor loop."""
+        self.started_at = time.monotonic()
+        await self.ensure_schema()
+
+        if self.config.metrics_port and self.metrics_server is None:
+            self.watchdog.start()
+            self.metrics_server = metrics.MetricsServer(port=self.config.metrics_port, watchdog=self.watchdog)
+            await self.metrics_server.start()
+
+        if self.span_exporter is not None:
+            self.span_exporter.start()
+
+        if self.monitor_task is None or self.monitor_task.done():
+            loop = asyncio.get_running_loop()
+            self.monitor_task = loop.create_task(
+                self.reddit_monitor.monitor_loop(discord_client, self.config.check_interval, self.config.cycle_budget)
+            )
+            self.watchdog.watch_task(self.monitor_task)
+            try:
+                loop.add_signal_handler(signal.SIGUSR1, self.reddit_monitor.profiler.request, PROFILE_SIGNAL_CYCLES)
+            except (NotImplementedError, AttributeError, RuntimeError):
+                # No SIGUSR1 / loop signal handlers on this platform or thread
+                pass
+
+    async def stop(self) -> None:
+        # Cancel the monitor task
+        if self.monitor_task and not self.monitor_task.done():
+            self.monitor_task.cancel()
+            try:
+                await self.monitor_task
+            except asyncio.CancelledError:
+                logger.info("Background task cancelled successfully")
+            except Exception as e:
+                logger.error(f"Error cancelling background task: {e}")
+
+        # Close database connections
+        try:
+            await self.engine.dispose()
+            logger.info("Database connections closed successfully")
+        except Exception as e:
+            logger.error(f"Error closing database connections: {e}")
+
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+            await self.watchdog.stop()
+            self.metrics_server = None
+
+        if self.span_exporter is not None:
+            await self.span_exporter.stop()
@@ -0,0 +1,210 @@
+"""
+Benchmarks for the matching and cycle pipeline.
+
+Usage:
+    python -m benchmarks.bench_cycle --scale realistic
+    python -m benchmarks.bench_cycle --scale extreme --repeat 3
+
+Matching is timed per post against one subreddit's filters (plain, body:
+and fuzzy: keywords), process_matches per entry, and full post and comment
+cycles against aiosqlite with fake Reddit and Discord clients, the comment
+cycle both unbatched and with COMMENT_BATCH_SUBREDDITS per listing.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Any, Dict, List
+
+from benchmarks import harness, synthetic
+from comment_stream import COMMENT_BATCH_SUBREDDITS
+from matching import FuzzyIndex, compile_keywords, make_fuzzy, post_matches
+from models import EntryFilter, UserSubreddit
+
+# New comments per subreddit per cycle, as a multiple of the posts per cycle
+COMMENTS_PER_POST = 8
+
+
+def bench_post_matches_filter(scale: Dict[str, int], repeat: int, rng: random.Random) -> Dict[str, Any]:
+    """One sample = one post checked against every filter of a subreddit."""
+    monitor = synthetic.make_monitor()
+    filters_per_subreddit = max(scale['filters'] // scale['subreddits'], 1)
+    keyword_sets = synthetic.make_keyword_sets(filters_per_subreddit, rng)
+    posts = synthetic.make_posts('bench', repeat, rng)
+    post_iter = iter(posts)
+
+    def run():
+        post = next(post_iter)
+        for keywords in keyword_sets:
+            monitor._post_matches_filter(post, keywords)
+
+    samples = harness.time_sync(run, repeat)
+    return harness.summarize('post_matches_filter', samples, items_per_sample=filters_per_subreddit)
+
+
+def bench_post_matches_body(scale: Dict[str, int], repeat: int, rng: random.Random) -> Dict[str, Any]:
+    """Same as post_matches_filter, but every filter also has a body: keyword and posts carry a 4 KB selftext."""
+    monitor = synthetic.make_monitor()
+    filters_per_subreddit = max(scale['filters'] // scale['subreddits'], 1)
+    keyword_sets = [
+        keywords + [f"body:{rng.choice(synthetic.VOCAB)}"]
+        for keywords in synthetic.make_keyword_sets(filters_per_subreddit, rng)
+    ]
+    posts = synthetic.make_posts('bench', repeat, rng)
+    for post in posts:
+        post.selftext = synthetic.make_title(rng, words=600)
+    post_iter = iter(posts)
+
+    def run():
+        post = next(post_iter)
+        body_cache = {}
+        for keywords in keyword_sets:
+            monitor._post_matches_filter(post, keywords, body_cache)
+
+    samples = harness.time_sync(run, repeat)
+    return harness.summarize('post_matches_body', samples, items_per_sample=filters_per_subreddit)
+
+
+def add_typo(word: str, rng: random.Random) -> str:
+    """Swap two adjacent characters, the most common marketplace typo."""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def bench_post_matches_fuzzy(scale: Dict[str, int], repeat: int, rng: random.Random) -> Dict[str, Any]:
+    """Same as post_matches_filter with every keyword fuzzy: and a typo in a third of the title words."""
+    filters_per_subreddit = max(scale['filters'] // scale['subreddits'], 1)
+    compiled = [
+        compile_keywords(tuple(make_fuzzy(keywords)))
+        for keywords in synthetic.make_keyword_sets(filters_per_subreddit, rng)
+    ]
+    posts = synthetic.make_posts('bench', repeat, rng)
+    for post in posts:
+        post.title = ' '.join(add_typo(word, rng) if rng.random() < 0.33 else word for word in post.title.split())
+    post_iter = iter(posts)
+    # Built once per subreddit batch by the match stage
+    index = FuzzyIndex(keyword for keywords in compiled for keyword in keywords.fuzzy)
+
+    def run():
+        post = next(post_iter)
+        for keywords in compiled:
+            post_matches(post, keywords, fuzzy_index=index)
+
+    samples = harness.time_sync(run, repeat)
+    return harness.summarize('post_matches_fuzzy', samples, items_per_sample=filters_per_subreddit)
+
+
+async def bench_process_matches(scale: Dict[str, int], repeat: int, rng: random.Random) -> Dict[str, Any]:
+    """One sample = one entry evaluated against a full listing, notifications included."""
+    monitor = synthetic.make_monitor()
+    client = synthetic.FakeDiscordClient()
+    posts = synthetic.make_posts('bench', scale['posts'], rng)
+    user_sub = UserSubreddit(user_id='user0', discord_name='user0', subreddit='bench')
+    entries = [
+        EntryFilter(entry_name=f"entry{i}", keywords=','.join(keywords))
+        for i, keywords in enumerate(synthetic.make_keyword_sets(repeat, rng))
+    ]
+    entry_iter = iter(entries)
+
+    async def run():
+        await monitor.process_matches(client, posts, user_sub, next(entry_iter))
+
+    samples = await harness.time_async(run, repeat)
+    return harness.summarize('process_matches', samples, items_per_sample=scale['posts'])
+
+
+async def bench_full_cycle(scale: Dict[str, int], repeat: int, rng: random.Random) -> Dict[str, Any]:
+    """One sample = one _process_all_filters pass over aiosqlite with fake clients."""
+    engine, session_factory, subreddits = await synthetic.populated_database(scale, rng)
+    monitor = synthetic.make_monitor(session_factory, max_posts=scale['posts'])
+    client = synthetic.FakeDiscordClient()
+    newest = [time.time()]
+
+    async def run():
+        # Fresh, newer posts every cycle so each pass does the full amount of work
+        newest[0] += 3600
+        listings = {
+            name: synthetic.make_posts(name, scale['posts'], rng, newest_utc=newest[0])
+            for name in subreddits
+        }
+        await monitor._process_all_filters(client, synthetic.FakeReddit(listings))
+
+    try:
+        samples = await harness.time_async(run, repeat)
+        peak = await harness.peak_memory_async(run)
+    finally:
+        await engine.dispose()
+
+    return harness.summarize(
+        'full_cycle', samples, items_per_sample=scale['filters'], peak_bytes=peak,
+        messages_sent=client.messages_sent
+    )
+
+
+async def bench_comment_cycle(
+    scale: Dict[str, int],
+    repeat: int,
+    rng: random.Random,
+    batch_size: int
+) -> Dict[str, Any]:
+    """
+    One sample = one _process_all_filters pass where every filter is a
+    comment filter and each subreddit has ``COMMENTS_PER_POST`` times as
+    many new comments as the post cycle has posts.
+    """
+    engine, session_factory, subreddits = await synthetic.populated_database(scale, rng, comment_share=1.0)
+    monitor = synthetic.make_monitor(session_factory)
+    monitor.comment_batch_size = batch_size
+    client = synthetic.FakeDiscordClient()
+    per_subreddit = scale['posts'] * COMMENTS_PER_POST
+    state = {'newest': time.time(), 'next_id': 1, 'requests': 0}
+
+    async def run():
+        state['newest'] += 3600
+        comments = {}
+        for name in subreddits:
+            comments[name] = synthetic.make_comments(name, per_subreddit, rng, state['next_id'], state['newest'])
+            state['next_id'] += per_subreddit
+        reddit = synthetic.FakeReddit({}, comments)
+        await monitor._process_all_filters(client, reddit)
+        state['requests'] += reddit.calls
+
+    try:
+        samples = await harness.time_async(run, repeat)
+    finally:
+        await engine.dispose()
+
+    return harness.summarize(
+        f"comment_cycle_batch{batch_size}", samples, items_per_sample=per_subreddit * len(subreddits),
+        messages_sent=client.messages_sent, listing_requests_per_cycle=state['requests'] / repeat
+    )
+
+
+async def run_benchmarks(scale_name: str, repeat: int, seed: int) -> List[Dict[str, Any]]:
+    scale = synthetic.SCALES[scale_name]
+    rng = random.Random(seed)
+    return harness.prefix_names([
+        bench_post_matches_filter(scale, repeat * 20, rng),
+        bench_post_matches_body(scale, repeat * 20, rng),
+        bench_post_matches_fuzzy(scale, repeat * 20, rng),
+        await bench_process_matches(scale, repeat * 20, rng),
+        await bench_full_cycle(scale, repeat, rng),
+        await bench_comment_cycle(scale, repeat, rng, batch_size=1),
+        await bench_comment_cycle(scale, repeat, rng, batch_size=COMMENT_BATCH_SUBREDDITS),
+    ], scale_name)
+
+
+def main() -> None:
+    parser = harness.make_parser(__doc__, scale='realistic')
+    parser.add_argument('--repeat', type=int, default=5, help="Full cycles to time")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args.scale, args.repeat, args.seed))
+    harness.record(results, args.results, suite='cycle')
+
+
+if __name__ == '__main__':
+    main()
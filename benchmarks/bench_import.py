@@ -0,0 +1,67 @@
+"""
+Benchmark bulk filter import against per-filter add_filter on aiosqlite.
+
+Usage:
+    python -m benchmarks.bench_import --filters 50
+    python -m benchmarks.bench_import --filters 1000 --repeat 3
+
+Each sample writes one user's ``--filters`` filters, spread over ten
+subreddits, to a fresh in-memory database.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Any, Dict, List
+
+from benchmarks import harness, synthetic
+from filter_io import FilterSpec
+
+
+def make_specs(count: int, rng: random.Random, subreddits: int = 10) -> List[FilterSpec]:
+    names = synthetic.subreddit_names(subreddits)
+    return [
+        FilterSpec(rng.choice(names), f"entry{i}", keywords)
+        for i, keywords in enumerate(synthetic.make_keyword_sets(count, rng))
+    ]
+
+
+async def bench_import(name: str, specs: List[FilterSpec], repeat: int, bulk: bool) -> Dict[str, Any]:
+    """One sample = one user's filters written to a fresh database."""
+    samples = []
+    for i in range(repeat):
+        engine, session_factory = await synthetic.make_session_factory()
+        monitor = synthetic.make_monitor(session_factory)
+        try:
+            async def run():
+                if bulk:
+                    await monitor.import_filters('user0', 'user0', specs)
+                else:
+                    for spec in specs:
+                        await monitor.add_filter('user0', 'user0', spec.subreddit, spec.entry_name, spec.keywords)
+            samples.extend(await harness.time_async(run, 1))
+        finally:
+            await engine.dispose()
+    return harness.summarize(name, samples, items_per_sample=len(specs))
+
+
+async def run_benchmarks(filters: int, repeat: int, seed: int) -> List[Dict[str, Any]]:
+    specs = make_specs(filters, random.Random(seed))
+    return harness.prefix_names([
+        await bench_import('add_filter_loop', specs, repeat, bulk=False),
+        await bench_import('import_filters', specs, repeat, bulk=True),
+    ], str(filters))
+
+
+def main() -> None:
+    parser = harness.make_parser(__doc__)
+    parser.add_argument('--filters', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args.filters, args.repeat, args.seed))
+    harness.record(results, args.results, suite='import')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Simulate missed and re-downloaded posts for fixed and adaptive listing sizes.
+
+Usage:
+    python -m benchmarks.bench_page_sizing
+    python -m benchmarks.bench_page_sizing --fixed 10 --min-posts 5 --max-posts 100 --polls 500
+
+Posts arrive in each subreddit as a Poisson process at the rates in
+SUBREDDIT_RATES, with bursts at ``--burst-every`` polls, and every subreddit
+is polled every ``--interval`` seconds on a simulated clock. Strategies:
+
+    fixed       the old check_subreddit: one listing of ``--fixed`` posts
+    adaptive    RedditMonitor.check_subreddit with a ListingSizer between
+                ``--min-posts`` and ``--max-posts`` and truncation paging
+
+For each strategy and subreddit the run reports posts missed (never fetched
+before falling out of the listing), stale posts (fetched again after an
+earlier poll already returned them) and listing requests (one per 100
+posts).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import random
+from typing import Any, Dict, List, Optional
+
+from benchmarks import harness, synthetic
+from page_sizing import LISTING_CAP, PAGE_SIZE, ListingSizer
+
+# Posts per hour
+SUBREDDIT_RATES = {
+    'busy': 120.0,
+    'steady': 12.0,
+    'quiet': 0.5,
+    'dead': 0.01,
+}
+
+
+class CountingListing(synthetic.FakeSubredditListing):
+    def __init__(self, posts: List[synthetic.FakePost], counts: Dict[str, int]):
+        super().__init__(posts)
+        self.counts = counts
+
+    async def new(self, limit: Optional[int] = None, params: Optional[Dict[str, str]] = None):
+        self.counts['requests'] += max(math.ceil((limit or PAGE_SIZE) / PAGE_SIZE), 1)
+        async for post in super().new(limit, params):
+            yield post
+
+
+class SimulatedReddit(synthetic.FakeReddit):
+    def __init__(self, listings: Dict[str, List[synthetic.FakePost]]):
+        super().__init__(listings)
+        self.counts = {'requests': 0}
+
+    async def subreddit(self, name: str, fetch: bool = False) -> CountingListing:
+        return CountingListing(self.listings.get(name, []), self.counts)
+
+
+def arrivals(rng: random.Random, per_hour: float, start: float, end: float) -> List[float]:
+    times = []
+    t = start + rng.expovariate(per_hour / 3600)
+    while t < end:
+        times.append(t)
+        t += rng.expovariate(per_hour / 3600)
+    return times
+
+
+async def simulate(
+    strategy: str,
+    subreddit: str,
+    per_hour: float,
+    args: argparse.Namespace,
+    rng: random.Random
+) -> Dict[str, Any]:
+    clock = [0.0]
+    monitor = synthetic.make_monitor(max_posts=args.max_posts, min_posts=args.min_posts)
+    monitor.listing_sizer = ListingSizer(args.min_posts, args.max_posts, clock=lambda: clock[0])
+    reddit = SimulatedReddit({})
+    listing: List[synthetic.FakePost] = []
+    seen = set()
+    totals = {'arrived': 0, 'missed': 0, 'stale': 0, 'fetched': 0}
+
+    for poll in range(1, args.polls + 1):
+        start, clock[0] = clock[0], clock[0] + args.interval
+        rate = per_hour * (args.burst_factor if args.burst_every and poll % args.burst_every == 0 else 1)
+        new = [
+            synthetic.FakePost(rng.getrandbits(40), subreddit, '', created)
+            for created in arrivals(rng, rate, start, clock[0])
+        ]
+        totals['arrived'] += len(new)
+        listing = (new[::-1] + listing)[:LISTING_CAP]
+        # Posts that fell off the end of the listing unseen are lost for good
+        reddit.listings = {subreddit: listing}
+
+        if strategy == 'fixed':
+            posts = listing[:args.fixed]
+            reddit.counts['requests'] += math.ceil(args.fixed / PAGE_SIZE)
+        else:
+            posts = await monitor.check_subreddit(reddit, subreddit)
+        totals['fetched'] += len(posts)
+        for post in posts:
+            if post.name in seen:
+                totals['stale'] += 1
+            else:
+                seen.add(post.name)
+        totals['missed'] = totals['arrived'] - len(seen)
+
+    return {**totals, 'requests': reddit.counts['requests']}
+
+
+async def run_benchmarks(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    for strategy in ('fixed', 'adaptive'):
+        for subreddit, per_hour in SUBREDDIT_RATES.items():
+            outcome = await simulate(strategy, subreddit, per_hour, args, random.Random(args.seed))
+            print(f"{strategy:>8} {subreddit:>7}: {outcome['arrived']:6d} arrived {outcome['missed']:6d} missed "
+                  f"{outcome['stale']:7d} stale {outcome['requests']:6d} requests")
+            results.append({'name': f"page_sizing/{strategy}_{subreddit}", **outcome})
+    return results
+
+
+def main() -> None:
+    parser = harness.make_parser(__doc__)
+    parser.add_argument('--fixed', type=int, default=10, help="Old fixed NEW_POSTS")
+    parser.add_argument('--min-posts', type=int, default=5)
+    parser.add_argument('--max-posts', type=int, default=100)
+    parser.add_argument('--interval', type=float, default=600, help="Simulated seconds between polls")
+    parser.add_argument('--polls', type=int, default=500)
+    parser.add_argument('--burst-every', type=int, default=50, help="Every Nth poll interval is a burst, 0 for none")
+    parser.add_argument('--burst-factor', type=float, default=10)
+    args = parser.parse_args()
+
+    harness.record(asyncio.run(run_benchmarks(args)), args.results, suite='page_sizing')
+
+
+if __name__ == '__main__':
+    main()
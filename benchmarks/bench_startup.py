@@ -0,0 +1,100 @@
+"""
+Benchmark bot startup: module import time and time to the first completed monitor cycle.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --scale realistic --repeat 3
+
+The import is timed in a fresh interpreter per sample. Time to first cycle
+runs the App against a pre-populated SQLite file and a FakeRedditServer, from
+``App.start`` (what FilterBot.setup_hook calls) until the first cycle finishes.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks import harness, synthetic
+from fake_reddit import FakeRedditServer
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+
+
+def bench_import(module: str, repeat: int) -> Dict[str, Any]:
+    """One sample = ``import module`` in a new interpreter."""
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', IMPORT_SNIPPET.format(module=module)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(out.strip().splitlines()[-1]))
+    return harness.summarize(f"import_{module}", samples)
+
+
+async def first_cycle(database_url: str, server: FakeRedditServer, timeout: float = 60.0) -> float:
+    from app import App
+    from config import Config
+
+    app = App(Config(
+        reddit_client_id='bench',
+        reddit_secret='bench',
+        user_agent='bench',
+        database_url=database_url,
+        reddit_oauth_url=server.url,
+        reddit_url=server.url,
+    ))
+    try:
+        await app.start(synthetic.FakeDiscordClient())
+        deadline = time.monotonic() + timeout
+        while app.reddit_monitor.last_cycle_completed_at is None:
+            if time.monotonic() > deadline:
+                raise TimeoutError("No monitor cycle completed")
+            await asyncio.sleep(0.005)
+        return app.reddit_monitor.last_cycle_completed_at - app.started_at
+    finally:
+        await app.stop()
+
+
+async def bench_first_cycle(scale: Dict[str, int], repeat: int, rng: random.Random) -> Dict[str, Any]:
+    """One sample = App.start to the end of the first cycle, schema already in place."""
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine, _, subreddits = await synthetic.populated_database(scale, rng, database_url)
+        await engine.dispose()
+
+        # A generous rate-limit budget so asyncprawcore doesn't pace requests and the
+        # sample measures startup rather than rate limiting
+        async with FakeRedditServer(ratelimit_budget=1_000_000, seed=rng.randrange(2 ** 32)) as server:
+            for name in subreddits:
+                server.add_posts(name, [synthetic.make_title(rng) for _ in range(scale['posts'])])
+            samples = [await first_cycle(database_url, server) for _ in range(repeat)]
+
+    return harness.summarize('first_cycle', samples, items_per_sample=scale['filters'])
+
+
+async def run_benchmarks(scale_name: str, repeat: int, seed: int) -> List[Dict[str, Any]]:
+    scale = synthetic.SCALES[scale_name]
+    return harness.prefix_names([
+        bench_import('bot', repeat),
+        await bench_first_cycle(scale, repeat, random.Random(seed)),
+    ], scale_name)
+
+
+def main() -> None:
+    parser = harness.make_parser(__doc__, scale='small')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args.scale, args.repeat, args.seed))
+    harness.record(results, args.results, suite='startup')
+
+
+if __name__ == '__main__':
+    main()
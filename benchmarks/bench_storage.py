@@ -0,0 +1,135 @@
+"""
+Benchmark cycle write latency per storage backend.
+
+Usage:
+    python -m benchmarks.bench_storage
+    python -m benchmarks.bench_storage --mysql-url mysql+aiomysql://bot:pw@127.0.0.1:3306/bench
+
+One sample is one commit stage batch: the watermarks of ``--batch`` entries
+advanced in a single UPDATE and committed, while ``--readers`` tasks run the
+match stage's per-subreddit select in a loop. Backends compared:
+
+    sqlite_wal      storage.create_engine on a file (WAL, synchronous=NORMAL)
+    sqlite_default  plain aiosqlite engine on a file (rollback journal, synchronous=FULL)
+    mysql           the MySQL path, only when --mysql-url is given
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+import storage
+from benchmarks import harness, synthetic
+from models import Base, EntryFilter, UserSubreddit
+
+
+async def bench_writes(
+    name: str,
+    engine: AsyncEngine,
+    scale: Dict[str, int],
+    repeat: int,
+    batch: int,
+    readers: int,
+    rng: random.Random
+) -> Dict[str, Any]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    subreddits = await synthetic.populate_scale(session_factory, scale, rng)
+    async with session_factory() as session:
+        entry_ids = list((await session.execute(select(EntryFilter.id))).scalars())
+
+    stop = asyncio.Event()
+    reads = [0]
+
+    async def reader():
+        while not stop.is_set():
+            async with session_factory() as session:
+                stmt = (
+                    select(UserSubreddit)
+                    .options(selectinload(UserSubreddit.entries))
+                    .filter_by(subreddit=rng.choice(subreddits))
+                )
+                (await session.execute(stmt)).scalars().all()
+            reads[0] += 1
+
+    watermark = [datetime.now(timezone.utc)]
+
+    async def write():
+        watermark[0] += timedelta(seconds=1)
+        async with session_factory() as session:
+            await session.execute(
+                update(EntryFilter),
+                [{'id': entry_id, 'last_check_at': watermark[0]} for entry_id in rng.sample(entry_ids, batch)]
+            )
+            await session.commit()
+
+    reader_tasks = [asyncio.create_task(reader()) for _ in range(readers)]
+    try:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        samples = await harness.time_async(write, repeat)
+        elapsed = loop.time() - started
+    finally:
+        stop.set()
+        await asyncio.gather(*reader_tasks)
+
+    return harness.summarize(
+        name, samples, items_per_sample=batch,
+        readers=readers, reads_per_s=round(reads[0] / elapsed, 1) if elapsed else None
+    )
+
+
+async def run_benchmarks(
+    scale_name: str,
+    repeat: int,
+    batch: int,
+    readers: int,
+    seed: int,
+    mysql_url: Optional[str]
+) -> List[Dict[str, Any]]:
+    scale = synthetic.SCALES[scale_name]
+    batch = min(batch, scale['filters'])
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engines = {
+            'sqlite_wal': storage.create_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'wal.db')}"),
+            'sqlite_default': create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'default.db')}"),
+        }
+        if mysql_url:
+            engines['mysql'] = storage.create_engine(mysql_url)
+        for name, engine in engines.items():
+            try:
+                results.append(await bench_writes(
+                    f"{scale_name}/commit_{name}", engine, scale, repeat, batch, readers, random.Random(seed)
+                ))
+            finally:
+                await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = harness.make_parser(__doc__, scale='realistic')
+    parser.add_argument('--repeat', type=int, default=200, help="Commit batches to time")
+    parser.add_argument('--batch', type=int, default=50, help="Watermarks per commit, RedditMonitor's commit_batch_size")
+    parser.add_argument('--readers', type=int, default=2, help="Concurrent match stage readers")
+    parser.add_argument('--mysql-url', help="Also benchmark this MySQL database (its tables are dropped and recreated)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(
+        args.scale, args.repeat, args.batch, args.readers, args.seed, args.mysql_url
+    ))
+    harness.record(results, args.results, suite='storage')
+
+
+if __name__ == '__main__':
+    main()
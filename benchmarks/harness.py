@@ -0,0 +1,161 @@
+"""Timing, memory and result-recording helpers shared by the benchmark scripts."""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from benchmarks.synthetic import SCALES
+
+DEFAULT_RESULTS = os.path.join('.benchmarks', 'results.jsonl')
+# Flag a benchmark whose p50 got this much slower than the previous commit's run
+REGRESSION_THRESHOLD = 0.10
+
+
+def make_parser(doc: str, scale: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Command line of a benchmark script: its docstring as the help text,
+    ``--seed``, ``--results``, and ``--scale`` defaulting to ``scale`` if given.
+    """
+    parser = argparse.ArgumentParser(
+        description=doc,
+        epilog=f"Results are appended to {DEFAULT_RESULTS} tagged with the current commit, "
+               "and timings are compared against the previous commit's run.",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    if scale is not None:
+        parser.add_argument('--scale', choices=sorted(SCALES), default=scale)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--results', default=DEFAULT_RESULTS)
+    return parser
+
+
+def prefix_names(results: List[Dict[str, Any]], prefix: str) -> List[Dict[str, Any]]:
+    """Qualify result names, e.g. with the scale, so runs at different settings aren't compared."""
+    for result in results:
+        result['name'] = f"{prefix}/{result['name']}"
+    return results
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 < pct <= 100)."""
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(name: str, samples: List[float], items_per_sample: int = 1,
+              peak_bytes: Optional[int] = None, **extra: Any) -> Dict[str, Any]:
+    """
+    Reduce raw per-sample durations to a result row.
+
+    Args:
+        name: Benchmark name
+        samples: Duration of each sample in seconds
+        items_per_sample: Units of work (posts, filters...) done per sample
+        peak_bytes: Peak traced memory, if measured
+    """
+    total = sum(samples)
+    return {
+        'name': name,
+        'samples': len(samples),
+        'throughput_per_s': round(items_per_sample * len(samples) / total, 1) if total else None,
+        'mean_ms': round(statistics.fmean(samples) * 1000, 4),
+        'p50_ms': round(percentile(samples, 50) * 1000, 4),
+        'p99_ms': round(percentile(samples, 99) * 1000, 4),
+        'peak_kib': round(peak_bytes / 1024, 1) if peak_bytes is not None else None,
+        **extra,
+    }
+
+
+def time_sync(fn: Callable[[], Any], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def time_async(fn: Callable[[], Awaitable[Any]], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def peak_memory_async(fn: Callable[[], Awaitable[Any]]) -> int:
+    """Run ``fn`` once under tracemalloc and return the peak traced bytes."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        await fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_previous(path: str, commit: str) -> Dict[str, Dict[str, Any]]:
+    """Latest result per benchmark name recorded at a commit other than ``commit``."""
+    previous: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return previous
+    with open(path) as f:
+        for line in f:
+            row = json.loads(line)
+            if row.get('commit') != commit:
+                previous[row['name']] = row
+    return previous
+
+
+def record(results: List[Dict[str, Any]], path: str = DEFAULT_RESULTS, suite: str = '') -> None:
+    """
+    Append results to a JSON-lines file and print a comparison with the last
+    run recorded at a different commit, so regressions show up between commits.
+    """
+    commit = git_commit()
+    previous = load_previous(path, commit)
+    meta = {
+        'suite': suite,
+        'commit': commit,
+        'recorded_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+    }
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as f:
+        for result in results:
+            f.write(json.dumps({**meta, **result}) + '\n')
+
+    for result in results:
+        if 'p50_ms' not in result:
+            # Counting benchmarks (e.g. bench_page_sizing) have no timings to compare
+            print(f"{result['name']:<40} " + ' '.join(f"{k}={v}" for k, v in result.items() if k != 'name'))
+            continue
+        line = (f"{result['name']:<40} p50={result['p50_ms']:>10.3f}ms p99={result['p99_ms']:>10.3f}ms "
+                f"throughput={result['throughput_per_s']}/s peak={result['peak_kib']}KiB")
+        before = previous.get(result['name'])
+        if before and before.get('p50_ms'):
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms']
+            flag = '  REGRESSION' if change > REGRESSION_THRESHOLD else ''
+            line += f"  ({change:+.1%} vs {before['commit']}){flag}"
+        print(line)
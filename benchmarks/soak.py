@@ -0,0 +1,167 @@
+"""
+Soak test: run thousands of monitor cycles and fail if memory keeps growing.
+
+Usage:
+    python -m benchmarks.soak --cycles 2000
+    python -m benchmarks.soak --cycles 10000 --scale realistic --max-growth 256
+
+Each cycle runs _process_all_filters against aiosqlite with fake Reddit and
+Discord clients and a fresh, newer listing for every subreddit. Between
+cycles a user adds and removes a filter and a never-seen subreddit's status
+is looked up, the way commands arrive in production. After ``--warmup``
+cycles tracemalloc snapshots are taken every ``--snapshot-every`` cycles;
+the slope of retained memory over those snapshots is the growth per cycle.
+
+Exits with status 1 if growth exceeds ``--max-growth`` bytes per cycle.
+The top allocation sites by growth since the first snapshot are printed
+either way, and cycle latency and growth are recorded.
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+from benchmarks import harness, synthetic
+
+# Frames from these files are bookkeeping (including this harness's own
+# per-cycle samples), not the bot's memory
+IGNORED_FILES = (
+    __file__, tracemalloc.__file__,
+    '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', '<unknown>',
+)
+
+
+def growth_per_cycle(points: List[Tuple[int, int]]) -> float:
+    """Least-squares slope of (cycle, retained bytes) points."""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def retained_snapshot() -> tracemalloc.Snapshot:
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, filename) for filename in IGNORED_FILES]
+    )
+
+
+def top_sites(first: tracemalloc.Snapshot, last: tracemalloc.Snapshot, limit: int) -> List[str]:
+    stats = last.compare_to(first, 'traceback')
+    lines = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+7d} blocks  {frame.filename}:{frame.lineno}")
+    return lines
+
+
+async def run_soak(
+    scale: Dict[str, int],
+    cycles: int,
+    warmup: int,
+    snapshot_every: int,
+    rng: random.Random
+) -> Dict[str, Any]:
+    engine, session_factory, subreddits = await synthetic.populated_database(scale, rng)
+    monitor = synthetic.make_monitor(session_factory, max_posts=scale['posts'])
+    # Every cycle probes a new subreddit; a small cap reaches the cache's
+    # steady state during warmup instead of after 10k cycles
+    monitor.subreddit_status_cache.max_size = max(warmup // 2, 1)
+    client = synthetic.FakeDiscordClient()
+    reddit = synthetic.FakeReddit({})
+
+    async def initialize_reddit():
+        return reddit
+    monitor.initialize_reddit = initialize_reddit
+
+    newest = time.time()
+    samples: List[float] = []
+    points: List[Tuple[int, int]] = []
+    first = last = None
+    try:
+        for cycle in range(1, cycles + 1):
+            newest += 3600
+            reddit.listings = {
+                name: synthetic.make_posts(name, scale['posts'], rng, newest_utc=newest)
+                for name in subreddits
+            }
+            started = time.perf_counter()
+            await monitor._process_all_filters(client, reddit)
+            samples.append(time.perf_counter() - started)
+
+            # Command traffic between cycles
+            user_id = f"user{cycle % scale['users']}"
+            await monitor.add_filter(user_id, user_id, subreddits[cycle % len(subreddits)], 'soak', ['soak'])
+            await monitor.remove_filter(user_id, subreddits[cycle % len(subreddits)], 'soak')
+            await monitor.subreddit_status(f"probe{cycle}")
+
+            if cycle >= warmup and (cycle - warmup) % snapshot_every == 0:
+                snapshot = retained_snapshot()
+                points.append((cycle, sum(stat.size for stat in snapshot.statistics('filename'))))
+                print(f"cycle {cycle}: {points[-1][1] / 1024:.1f} KiB retained, "
+                      f"last cycle {samples[-1] * 1000:.1f} ms", flush=True)
+                first = first or snapshot
+                last = snapshot
+    finally:
+        await engine.dispose()
+
+    return {
+        'samples': samples,
+        'points': points,
+        'first': first,
+        'last': last,
+        'messages_sent': client.messages_sent,
+    }
+
+
+def main() -> None:
+    parser = harness.make_parser(__doc__, scale='small')
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=200, help="Cycles before the first snapshot")
+    parser.add_argument('--snapshot-every', type=int, default=100)
+    parser.add_argument('--max-growth', type=float, default=512, help="Allowed retained bytes per cycle")
+    parser.add_argument('--top', type=int, default=10, help="Allocation sites to report")
+    parser.add_argument('--frames', type=int, default=1, help="Traceback depth tracemalloc keeps, deeper is slower")
+    args = parser.parse_args()
+    if args.cycles < args.warmup + 2 * args.snapshot_every:
+        parser.error("--cycles must leave room for at least three snapshots after --warmup")
+
+    scale = synthetic.SCALES[args.scale]
+    tracemalloc.start(args.frames)
+    try:
+        soak = asyncio.run(run_soak(scale, args.cycles, args.warmup, args.snapshot_every, random.Random(args.seed)))
+    finally:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    growth = growth_per_cycle(soak['points'])
+    print(f"Retained memory over {len(soak['points'])} snapshots: "
+          f"{soak['points'][0][1] / 1024:.1f} KiB -> {soak['points'][-1][1] / 1024:.1f} KiB, "
+          f"{growth:+.1f} B/cycle (limit {args.max_growth:.0f})")
+    print(f"Top {args.top} allocation sites by growth since cycle {soak['points'][0][0]}:")
+    for line in top_sites(soak['first'], soak['last'], args.top):
+        print('  ' + line)
+
+    result = harness.summarize(
+        f"{args.scale}/soak_cycle", soak['samples'], items_per_sample=scale['filters'], peak_bytes=peak,
+        cycles=args.cycles, growth_bytes_per_cycle=round(growth, 1), messages_sent=soak['messages_sent']
+    )
+    harness.record([result], args.results, suite='soak')
+
+    if growth > args.max_growth:
+        print(f"FAIL: retained memory grows {growth:.1f} B/cycle, above {args.max_growth:.0f}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""Synthetic posts, comments, subreddits, users and filters plus fake Reddit/Discord clients."""
+from __future__ import annotations
+
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from models import Base, EntryCommentTarget, EntryFilter, UserSubreddit
+from reddit_monitor import RedditMonitor
+
+# Marketplace-flavoured vocabulary so keyword hit rates look like the real thing
+VOCAB = [
+    "rtx", "3080", "3090", "4090", "gpu", "cpu", "ryzen", "5800x", "intel", "i7",
+    "ssd", "nvme", "ram", "ddr4", "ddr5", "monitor", "144hz", "keyboard", "mouse",
+    "psu", "case", "laptop", "macbook", "ipad", "switch", "ps5", "xbox", "headset",
+    "wts", "wtb", "local", "shipped", "paypal", "cash", "bnib", "used", "mint",
+    "airsoft", "gbbr", "aeg", "m4", "ak", "glock", "hpa", "optic", "plate", "carrier",
+]
+
+SCALES: Dict[str, Dict[str, int]] = {
+    'small': {'users': 50, 'subreddits': 5, 'filters': 200, 'posts': 25},
+    'realistic': {'users': 500, 'subreddits': 50, 'filters': 5_000, 'posts': 25},
+    'extreme': {'users': 20_000, 'subreddits': 500, 'filters': 100_000, 'posts': 100},
+}
+
+
+class FakePost:
+    """Stand-in for asyncpraw's Submission with the attributes the monitor reads."""
+
+    __slots__ = ('id', 'name', 'title', 'selftext', 'link_flair_text', 'domain',
+                 'author', 'created_utc', 'permalink')
+
+    def __init__(self, post_id: int, subreddit: str, title: str, created_utc: float):
+        self.id = format(post_id, 'x')
+        self.name = f"t3_{self.id}"
+        self.title = title
+        self.selftext = ''
+        self.link_flair_text = None
+        self.domain = f"self.{subreddit}"
+        self.author = 'synthetic_user'
+        self.created_utc = created_utc
+        self.permalink = f"/r/{subreddit}/comments/{self.id}/"
+
+
+class FakeComment:
+    """Stand-in for asyncpraw's Comment with the attributes CommentPost.from_comment reads."""
+
+    __slots__ = ('id', 'name', 'subreddit', 'body', 'author', 'created_utc', 'permalink', 'link_id', 'link_title')
+
+    def __init__(self, comment_id: int, subreddit: str, body: str, created_utc: float):
+        self.id = format(comment_id, 'x')
+        self.name = f"t1_{self.id}"
+        self.subreddit = subreddit
+        self.body = body
+        self.author = 'synthetic_user'
+        self.created_utc = created_utc
+        self.permalink = f"/r/{subreddit}/comments/thread/_/{self.id}/"
+        self.link_id = 't3_thread'
+        self.link_title = 'Daily thread'
+
+
+class FakeSubredditListing:
+    def __init__(self, posts: List[FakePost], comments: Optional[List[FakeComment]] = None):
+        self._posts = posts
+        self._comments = comments or []
+
+    async def comments(self, limit: Optional[int] = None, params: Optional[Dict[str, str]] = None):
+        for comment in self._comments[:limit]:
+            yield comment
+
+    async def new(self, limit: Optional[int] = None, params: Optional[Dict[str, str]] = None):
+        start = 0
+        after = (params or {}).get('after')
+        if after:
+            start = next((i + 1 for i, post in enumerate(self._posts) if post.name == after), len(self._posts))
+        for post in self._posts[start:start + limit if limit is not None else None]:
+            yield post
+
+
+class FakeReddit:
+    """In-process replacement for asyncpraw.Reddit serving pre-generated listings."""
+
+    def __init__(self, listings: Dict[str, List[FakePost]], comments: Optional[Dict[str, List[FakeComment]]] = None):
+        self.listings = listings
+        self.comments = comments or {}
+        self.calls = 0
+
+    async def subreddit(self, name: str, fetch: bool = False) -> FakeSubredditListing:
+        self.calls += 1
+        # "a+b" combines the subreddits' comments, newest first, like Reddit
+        comments = [comment for part in name.split('+') for comment in self.comments.get(part, [])]
+        comments.sort(key=lambda comment: int(comment.id, 16), reverse=True)
+        return FakeSubredditListing(self.listings.get(name, []), comments)
+
+    async def __aenter__(self) -> FakeReddit:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+
+class FakeUser:
+    def __init__(self, user_id: str):
+        self.id = user_id
+        self.sent = 0
+
+    async def send(self, content: str) -> None:
+        self.sent += 1
+
+
+class FakeDiscordClient:
+    """Replacement for discord.Client that counts fetches and DMs."""
+
+    def __init__(self):
+        self.users: Dict[str, FakeUser] = {}
+        self.fetches = 0
+
+    async def fetch_user(self, user_id) -> FakeUser:
+        self.fetches += 1
+        key = str(user_id)
+        if key not in self.users:
+            self.users[key] = FakeUser(key)
+        return self.users[key]
+
+    @property
+    def messages_sent(self) -> int:
+        return sum(user.sent for user in self.users.values())
+
+
+def subreddit_names(count: int) -> List[str]:
+    return [f"synthsub{i}" for i in range(count)]
+
+
+def make_title(rng: random.Random, words: int = 8) -> str:
+    return ' '.join(rng.choice(VOCAB) for _ in range(words))
+
+
+def make_posts(
+    subreddit: str,
+    count: int,
+    rng: random.Random,
+    newest_utc: Optional[float] = None,
+    spacing: float = 30.0
+) -> List[FakePost]:
+    """Posts newest first, ``spacing`` seconds apart, like a /new listing."""
+    newest_utc = newest_utc if newest_utc is not None else time.time()
+    return [
+        FakePost(rng.getrandbits(40), subreddit, make_title(rng), newest_utc - i * spacing)
+        for i in range(count)
+    ]
+
+
+def make_comments(
+    subreddit: str,
+    count: int,
+    rng: random.Random,
+    first_id: int,
+    newest_utc: Optional[float] = None,
+    spacing: float = 2.0
+) -> List[FakeComment]:
+    """Comments newest first with increasing ids from ``first_id``, like a /comments listing."""
+    newest_utc = newest_utc if newest_utc is not None else time.time()
+    return [
+        FakeComment(first_id + count - i, subreddit, make_title(rng, 16), newest_utc - i * spacing)
+        for i in range(count)
+    ]
+
+
+def make_keyword_sets(count: int, rng: random.Random, max_keywords: int = 3) -> List[List[str]]:
+    return [rng.sample(VOCAB, rng.randint(1, max_keywords)) for _ in range(count)]
+
+
+def make_listings(subreddits: List[str], posts_per_subreddit: int, rng: random.Random) -> Dict[str, List[FakePost]]:
+    return {name: make_posts(name, posts_per_subreddit, rng) for name in subreddits}
+
+
+def make_monitor(session_factory=None, max_posts: int = 100, **options: Any) -> RedditMonitor:
+    return RedditMonitor(
+        client_id='bench',
+        client_secret='bench',
+        user_agent='bench',
+        session_factory=session_factory,
+        max_posts=max_posts,
+        **options
+    )
+
+
+async def make_session_factory(url: str = 'sqlite+aiosqlite:///:memory:'):
+    """Create an engine with all tables and return (engine, session_factory)."""
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+async def populate_filters(
+    session_factory,
+    users: int,
+    subreddits: List[str],
+    filters: int,
+    rng: random.Random,
+    comment_share: float = 0.0
+) -> None:
+    """
+    Bulk insert ``filters`` entries spread across ``users`` and ``subreddits``,
+    ``comment_share`` of them comment filters.
+
+    Rows are inserted directly rather than through RedditMonitor.add_filter so
+    populating 100k filters takes seconds, not minutes.
+    """
+    keyword_sets = make_keyword_sets(filters, rng)
+    user_subs: Dict[tuple, UserSubreddit] = {}
+    entries: List[EntryFilter] = []
+
+    async with session_factory() as session:
+        for i, keywords in enumerate(keyword_sets):
+            key = (f"user{rng.randrange(users)}", rng.choice(subreddits))
+            user_sub = user_subs.get(key)
+            if user_sub is None:
+                user_sub = UserSubreddit(user_id=key[0], discord_name=key[0], subreddit=key[1])
+                user_subs[key] = user_sub
+            entry = EntryFilter(user_subreddit=user_sub, entry_name=f"entry{i}")
+            if comment_share and rng.random() < comment_share:
+                entry.comment_target = EntryCommentTarget(thread_ids='')
+            entry.set_keywords(keywords)
+            entries.append(entry)
+
+        session.add_all(user_subs.values())
+        session.add_all(entries)
+        await session.commit()
+
+
+async def populate_scale(session_factory, scale: Dict[str, int], rng: random.Random,
+                         comment_share: float = 0.0) -> List[str]:
+    """Populate the filters of a SCALES entry and return its subreddit names."""
+    subreddits = subreddit_names(scale['subreddits'])
+    await populate_filters(session_factory, scale['users'], subreddits, scale['filters'], rng, comment_share)
+    return subreddits
+
+
+async def populated_database(
+    scale: Dict[str, int],
+    rng: random.Random,
+    url: str = 'sqlite+aiosqlite:///:memory:',
+    comment_share: float = 0.0
+) -> Tuple[AsyncEngine, Any, List[str]]:
+    """A new database holding a SCALES entry's filters: (engine, session_factory, subreddits)."""
+    engine, session_factory = await make_session_factory(url)
+    try:
+        subreddits = await populate_scale(session_factory, scale, rng, comment_share)
+    except BaseException:
+        await engine.dispose()
+        raise
+    return engine, session_factory, subreddits
@@ -1,259 +1,343 @@
+import io
+import logging
+from typing import List, Optional
+
 import discord
-import os
-from dotenv import load_dotenv
+from discord import app_commands
 from discord.ext import commands
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-import asyncio
-
-import urllib.parse 
-from reddit_monitor import RedditMonitor
-from models import Base
-
-import logging
-from logging.handlers import RotatingFileHandler
 
+import metrics
 import responses
-load_dotenv()
-
-REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID') 
-REDDIT_SECRET = os.getenv('REDDIT_SECRET')
-USER_AGENT = os.getenv('USER_AGENT')
-CHECK_INTERVAL = int(os.getenv('PING_TIMER'))
-CHANNEL_ID = os.getenv('CHANNEL_ID')
-NEW_POSTS = int(os.getenv('NEW_POSTS'))
+from app import PROFILE_SIGNAL_CYCLES, App
+from config import Config
+from exceptions import RedditMonitorError
+from filter_io import (
+    MAX_COMMENT_THREADS, MAX_KEYWORD_LENGTH, SUBREDDIT_NAME, SUBREDDIT_OK, dump_filters, parse_filters,
+    parse_thread_id
+)
+from log_config import configure_logging, stop_listener
+from matching import FUZZY_FLAG, make_fuzzy
+from views import confirm, send_pages
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-
-# Create rotating file handler
-# Max size 10MB, keep 5 backup files
-handler = RotatingFileHandler(
-    'app.log',
-    maxBytes=10*1024*1024,  # 10 MB
-    backupCount=5
-)
-handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-
-# Add handler to logger
-logger.addHandler(handler)
- 
-# Test logging
-logging.info("Logging has been configured")
-
-
-#alchemy
-SCHEMA = os.getenv('DB_SCHEMA')
-HOST = os.getenv('DB_HOST')
-USER = os.getenv('DB_USER')
-PASSWORD = os.getenv('DB_PASSWORD')
-encoded_password = urllib.parse.quote_plus(PASSWORD) 
-PORT = 3306
-
-DATABASE_URL = f'mysql+aiomysql://{USER}:{encoded_password}@{HOST}:{PORT}/{SCHEMA}'
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,  # SQL logging
-    pool_pre_ping=True,  # Connection health checks
-    pool_size=10,  # Maximum number of connections
-    pool_timeout=30,  # Time to wait for a connection from the pool
-    max_overflow=20  # Maximum number of connections above pool_size
-)
 
-async_session_factory = sessionmaker(
-    engine,
-    class_=AsyncSession,  # This makes sessions async-capable
-    expire_on_commit=False,  # Keeps objects usable after commit
-    autoflush=False  # More explicit control over when SQL is executed
-)
+THREAD_FLAG = '--thread'
 
-# Create an async function to initialize tables
-async def init_db():
-    async with engine.begin() as conn:
-        # This creates tables asynchronously
-        await conn.run_sync(Base.metadata.create_all)
 
+class FilterCommands(commands.Cog):
+    """The bot's prefix commands."""
 
+    def __init__(self, app: App):
+        self.app = app
+        self.reddit_monitor = app.reddit_monitor
 
-# Bot Setup
-intents = discord.Intents.default()
-intents.message_content = True
-bot = commands.Bot(command_prefix='$', intents=intents)
+    @commands.command()
+    async def add(self, ctx, *arr):
+        logging.info(f"\nCommand 'add' invoked by {ctx.author}\n")
+        sum = 0
+        for elem in arr:
+            sum += int(elem)
+        await ctx.send(f"result = {sum}")
 
-# Initialize RedditMonitor with correct session factory
-reddit_monitor = RedditMonitor(
-    REDDIT_CLIENT_ID, 
-    REDDIT_SECRET, 
-    USER_AGENT, 
-    async_session_factory,  # Pass the correct session factory
-    max_posts= NEW_POSTS
-)
+    @commands.command(name='greet', help="greet then type 'who are you'")
+    async def greet(self, ctx, *args):
+        message = ' '.join(args).lower()
+        if message == 'who are you' or message == 'who are you?':  # Check if the argument is 'hello'
+            await ctx.send(responses.RAWLS_PASTA)
+        else:
+            await ctx.send("and you too")
 
-check_reddit_task = None
+    @commands.command(help="Adds a filter for a subreddit. Usage: $add_filter <subreddit> <entry_name> <keywords>. DO NOT INCLUDE the 'r/' in the subreddit name. Keywords match the title; prefix one with flair:, body:, domain: or author: to match that field instead, or fuzzy: to tolerate typos and spacing in the title. Add --fuzzy to make every title keyword fuzzy.")
+    async def add_filter(self, ctx, *args):
+        fuzzy = FUZZY_FLAG in args
+        await self._add_filter(ctx, 'add_filter', [arg for arg in args if arg != FUZZY_FLAG], fuzzy)
 
-@bot.event
-async def on_ready():
-    global check_reddit_task
-    
-    try:
-        await init_db()
-        print("Database initialized")
-        
-        print("Initialized")
-        logging.info("\n\n Initialized \n\n")
-        
-        channel_ids = os.getenv('CHANNEL_ID').split(',')
-        
-        for channel_id in channel_ids:
-            channel = bot.get_channel(int(channel_id.strip()))
-            if channel:
-                await channel.send("Initialized. Use \"help\" for documentation")
-            else:
-                logging.error(f"\nerror channel {channel_id} failed to initialize\n")
-        
-        if check_reddit_task is None or check_reddit_task.done():
-            check_reddit_task = bot.loop.create_task(
-                reddit_monitor.monitor_loop(bot, CHECK_INTERVAL)
-            )
-    except Exception as e:
-        logging.error(f"Initialization error: {e}")
-        # Consider appropriate error handling here
-
-@bot.command()
-async def add(ctx, *arr):
-    logging.info(f"\nCommand 'add' invoked by {ctx.author}\n")
-    sum = 0
-    for elem in arr:
-        sum += int(elem)
-    await ctx.send(f"result = {sum}")
-    
-@bot.command(name='greet', help="greet then type 'who are you'")
-async def greet(ctx, *args):
-    message = ' '.join(args).lower()
-    if message == 'who are you' or message == 'who are you?':  # Check if the argument is 'hello'
-        await ctx.send(responses.RAWLS_PASTA)
-    else:
-        await ctx.send("and you too")
-        
-
-@bot.command(help="Adds a filter for a subreddit. Usage: $add_filter <subreddit> <entry_name> <keywords>. DO NOT INCLUDE the 'r/' in the subreddit name.")
-async def add_filter(ctx, *args):
-    if len(args) < 3:
-        await ctx.send("Insufficient arguments. You need to provide a subreddit, entry name, and at least one keyword.")
-        return
-
-    subreddit, entry_name, *keywords = args
-    
-    if not subreddit.isalnum():
-            await ctx.send("Invalid subreddit name. Subreddit names should be alphanumeric.")
+    @commands.command(help="Adds a filter whose matches are posted in this channel. Usage: $add_channel_filter <subreddit> <entry_name> <keywords> [@role] [--fuzzy]. Mentions the role if given, otherwise you.")
+    async def add_channel_filter(self, ctx, *args):
+        if ctx.guild is None or str(ctx.channel.id) not in self.app.config.channel_ids:
+            await ctx.send("Channel filters can only be added in the bot's configured channels.")
             return
-    
-    logging.info(f"\nCommand 'add_filter' invoked by {ctx.author} with arguments: subreddit={subreddit}, entry_name={entry_name}, keywords={keywords}\n")
-    async def confirmation_check(message):
-        return message.author == ctx.author and message.content.lower() in ["yes", "no"]
 
+        role = ctx.message.role_mentions[0] if ctx.message.role_mentions else None
+        if role is not None and not (role.mentionable or ctx.author.guild_permissions.mention_everyone):
+            # Every match would ping the role, so only bind roles the author could ping themselves
+            await ctx.send(f"You can't mention {role.name}, so a filter can't ping it for you.")
+            return
+        fuzzy = FUZZY_FLAG in args
+        args = [arg for arg in args if arg != FUZZY_FLAG and not (role and arg == role.mention)]
+        await self._add_filter(
+            ctx, 'add_channel_filter', args, fuzzy,
+            f"\nPosted in: {ctx.channel.mention}, mentioning {role.name if role else 'you'}",
+            channel_id=str(ctx.channel.id), role_id=str(role.id) if role else None
+        )
+
+    @commands.command(help="Adds a filter that matches comments instead of posts. Usage: $add_comment_filter <subreddit> <entry_name> <keywords> [--thread <id or link>]... [--fuzzy]. Keywords match the comment text. Without --thread every comment in the subreddit is checked; with it only comments in those threads, e.g. a daily megathread.")
+    async def add_comment_filter(self, ctx, *args):
+        fuzzy = FUZZY_FLAG in args
+        args = [arg for arg in args if arg != FUZZY_FLAG]
+        rest, threads = [], []
+        try:
+            for i, arg in enumerate(args):
+                if arg == THREAD_FLAG:
+                    continue
+                if i and args[i - 1] == THREAD_FLAG:
+                    threads.append(parse_thread_id(arg))
+                else:
+                    rest.append(arg)
+        except ValueError as e:
+            await ctx.send(str(e))
+            return
+        threads = list(dict.fromkeys(threads))
+        if len(threads) > MAX_COMMENT_THREADS:
+            await ctx.send(f"A comment filter can watch at most {MAX_COMMENT_THREADS} threads.")
+            return
 
-    # Send back what the bot thinks the arguments are and ask for confirmation
-    confirmation_message = await ctx.send(f"Subreddit: {subreddit}\nEntry Name: {entry_name}\nKeywords: {', '.join(keywords)}. Are you sure you want to proceed? (Reply with 'yes' to confirm or 'no' to cancel)")
+        scope = f"comments in threads {', '.join(threads)}" if threads else "every comment"
+        await self._add_filter(ctx, 'add_comment_filter', rest, fuzzy, f"\nChecks: {scope}", comment_threads=threads)
+
+    async def _add_filter(self, ctx, command: str, args, fuzzy: bool, details: str = '', **options) -> None:
+        """
+        What every add_*filter command shares: validate ``args`` (subreddit,
+        entry name, keywords), check the subreddit can be read, confirm with
+        the author and add the filter with ``options`` passed to
+        RedditMonitor.add_filter. ``details`` is appended to the confirmation.
+        """
+        if len(args) < 3:
+            await ctx.send("Insufficient arguments. You need to provide a subreddit, entry name, and at least one keyword.")
+            return
 
-    try:
-        # Wait for the user's response
-        confirmation_response = await bot.wait_for('message', check=confirmation_check, timeout=30.0)  # 30 seconds to respond
+        subreddit, entry_name, *keywords = args
+        if fuzzy:
+            keywords = make_fuzzy(keywords)
 
-        # Check the user's response
-        if confirmation_response.content.lower() == "yes":
-            # Retrieve the Discord username
-            discord_username = ctx.author.name
+        if not SUBREDDIT_NAME.match(subreddit):
+            await ctx.send("Invalid subreddit name. Subreddit names should be 2-21 letters, numbers or underscores.")
+            return
 
-            # Call add_filter with the Discord username
-            response = await reddit_monitor.add_filter(str(ctx.author.id), discord_username, subreddit, entry_name, keywords)
-            await ctx.send(response)
-        else:
-            await ctx.send("Filter addition cancelled.")
+        if any(len(keyword) > MAX_KEYWORD_LENGTH for keyword in keywords):
+            await ctx.send(f"Keywords can be at most {MAX_KEYWORD_LENGTH} characters.")
+            return
 
-    except asyncio.TimeoutError:
-        # If the user does not respond in 30 seconds
-        await ctx.send("No response received. Filter addition cancelled.")
-        await confirmation_message.delete()
+        status = await self.reddit_monitor.subreddit_status(subreddit)
+        if status != SUBREDDIT_OK:
+            await ctx.send(f"r/{subreddit} can't be monitored: it looks {status.replace('_', ' ')}.")
+            return
 
+        logging.info(f"Command '{command}' invoked by {ctx.author}: subreddit={subreddit}, entry_name={entry_name}, keywords={keywords}, options={options}")
 
-@bot.command(help="Removes a filter from a subreddit. Usage: $remove_filter <subreddit> <entry_name>. DO NOT INCLUDE the 'r/' in the subreddit name.")
-async def remove_filter(ctx, subreddit, entry_name):
-    logging.info(f"\nCommand 'add_filter' invoked by {ctx.author} with arguments: subreddit={subreddit}, entry_name={entry_name}\n")
-    if not subreddit or not entry_name:
-        await ctx.send("You must provide both a subreddit and an entry name.")
-        return
+        # Send back what the bot thinks the arguments are and ask for confirmation
+        confirmed = await confirm(ctx, f"Subreddit: {subreddit}\nEntry Name: {entry_name}\nKeywords: {', '.join(keywords)}{details}. Are you sure you want to proceed?")
 
-    # Send back what the bot thinks the arguments are and ask for confirmation
-    confirmation_message = await ctx.send(f"Subreddit: {subreddit}\nEntry Name: {entry_name}. Are you sure you want to remove this filter? (Reply with 'yes' to confirm or 'no' to cancel)")
+        if confirmed:
+            response = await self.reddit_monitor.add_filter(
+                str(ctx.author.id), ctx.author.name, subreddit, entry_name, keywords, **options
+            )
+            await ctx.send(response)
+        elif confirmed is None:
+            # If the user does not respond in 30 seconds
+            await ctx.send("No response received. Filter addition cancelled.")
+        else:
+            await ctx.send("Filter addition cancelled.")
 
-    def confirmation_check(message):
-        return message.author == ctx.author and message.content.lower() in ["yes", "no"]
+    @commands.hybrid_command(
+        description="Removes one of your filters.",
+        help="Removes a filter from a subreddit. Usage: $remove_filter <subreddit> <entry_name>, or /remove_filter with autocomplete. DO NOT INCLUDE the 'r/' in the subreddit name."
+    )
+    @app_commands.describe(subreddit="One of your subreddits, without the r/", entry_name="The filter to remove")
+    async def remove_filter(self, ctx, subreddit: str, entry_name: str):
+        logging.info(f"\nCommand 'add_filter' invoked by {ctx.author} with arguments: subreddit={subreddit}, entry_name={entry_name}\n")
+        if not subreddit or not entry_name:
+            await ctx.send("You must provide both a subreddit and an entry name.")
+            return
 
-    try:
-        # Wait for the user's response
-        confirmation_response = await bot.wait_for('message', check=confirmation_check, timeout=30.0)  # 30 seconds to respond
+        # Send back what the bot thinks the arguments are and ask for confirmation
+        confirmed = await confirm(ctx, f"Subreddit: {subreddit}\nEntry Name: {entry_name}. Are you sure you want to remove this filter?")
 
-        # Check the user's response
-        if confirmation_response.content.lower() == "yes":
+        if confirmed:
             # Call remove_filter
-            response = await reddit_monitor.remove_filter(str(ctx.author.id), subreddit, entry_name)
+            response = await self.reddit_monitor.remove_filter(str(ctx.author.id), subreddit, entry_name)
             await ctx.send(response)
+        elif confirmed is None:
+            # If the user does not respond in 30 seconds
+            await ctx.send("No response received. Filter removal cancelled.")
         else:
             await ctx.send("Filter removal cancelled.")
 
-    except asyncio.TimeoutError:
-        # If the user does not respond in 30 seconds
-        await ctx.send("No response received. Filter removal cancelled.")
-        await confirmation_message.delete()
-
-    
-@bot.command()
-async def show_profile(ctx):
-    user_id = str(ctx.author.id)
-    profile_info = await reddit_monitor.get_user_profile(user_id)
-    await ctx.send(f"Your profile:\n{profile_info}")
-    
-@bot.command(name='shutdown')
-@commands.is_owner()
-async def shutdown(ctx):
-    """Shuts down the bot. Only the bot owner can use this command."""
-    global check_reddit_task
-    try:
-        await ctx.send("Shutting down...")
-        
-        # Cancel the check_reddit task
-        if check_reddit_task and not check_reddit_task.done():
-            check_reddit_task.cancel()
-            try:
-                await check_reddit_task
-            except asyncio.CancelledError:
-                logger.info("Background task cancelled successfully")
-            except Exception as e:
-                logger.error(f"Error cancelling background task: {e}")
-
-        # Close database connections
+    @remove_filter.autocomplete('subreddit')
+    async def _subreddit_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        names = await self.reddit_monitor.complete_subreddits(str(interaction.user.id), current)
+        return [app_commands.Choice(name=name, value=name) for name in names]
+
+    @remove_filter.autocomplete('entry_name')
+    async def _entry_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        subreddit = interaction.namespace.subreddit
+        if not subreddit:
+            return []
+        names = await self.reddit_monitor.complete_entries(str(interaction.user.id), subreddit, current)
+        return [app_commands.Choice(name=name, value=name) for name in names]
+
+    @commands.command(help="Imports filters from an attached .json or .csv file (see $export_filters for the format).")
+    async def import_filters(self, ctx):
+        if not ctx.message.attachments:
+            await ctx.send("Attach a .json or .csv file with your filters.")
+            return
+
+        attachment = ctx.message.attachments[0]
+        try:
+            specs = parse_filters(await attachment.read(), attachment.filename)
+            for spec in specs:
+                problem = self._channel_binding_problem(ctx, spec)
+                if problem:
+                    await ctx.send(f"Can't import {spec.subreddit}/{spec.entry_name}: {problem}")
+                    return
+            # The same check add_filter gets, once per subreddit; most answers come from the cache
+            unavailable = {}
+            for subreddit in dict.fromkeys(spec.subreddit for spec in specs):
+                status = await self.reddit_monitor.subreddit_status(subreddit)
+                if status != SUBREDDIT_OK:
+                    unavailable[subreddit] = status
+            specs = [spec for spec in specs if spec.subreddit not in unavailable]
+            count = await self.reddit_monitor.import_filters(str(ctx.author.id), ctx.author.name, specs)
+        except ValueError as e:
+            await ctx.send(f"Could not read {attachment.filename}: {e}")
+            return
+        except RedditMonitorError as e:
+            await ctx.send(str(e))
+            return
+
+        logging.info(f"Command 'import_filters' by {ctx.author}: {count} filters from {attachment.filename}, "
+                     f"skipped {list(unavailable)}")
+        response = f"Imported {count} filter(s) across {len({spec.subreddit for spec in specs})} subreddit(s)."
+        if unavailable:
+            response += " Skipped " + ', '.join(
+                f"r/{subreddit} ({status.replace('_', ' ')})" for subreddit, status in unavailable.items()
+            ) + ", which can't be monitored."
+        await ctx.send(response)
+
+    def _channel_binding_problem(self, ctx, spec) -> Optional[str]:
+        """Why an imported filter's channel and role couldn't be bound with add_channel_filter, if they couldn't."""
+        if not spec.channel_id:
+            return None
+        if spec.channel_id not in self.app.config.channel_ids:
+            return "its channel isn't one of the bot's configured channels."
+        if spec.role_id is None:
+            return None
+        role = ctx.guild.get_role(int(spec.role_id)) if ctx.guild is not None else None
+        if role is None:
+            return "its role isn't in this server."
+        if not (role.mentionable or ctx.author.guild_permissions.mention_everyone):
+            return f"you can't mention {role.name}, so a filter can't ping it for you."
+        return None
+
+    @commands.command(help="Exports your filters as a file. Usage: $export_filters [json|csv]")
+    async def export_filters(self, ctx, fmt: str = 'json'):
+        fmt = fmt.lower()
+        if fmt not in ('json', 'csv'):
+            await ctx.send("Format must be json or csv.")
+            return
+
+        specs = await self.reddit_monitor.export_filters(str(ctx.author.id))
+        if not specs:
+            await ctx.send("You have no filters to export.")
+            return
+        await ctx.send(file=discord.File(io.BytesIO(dump_filters(specs, fmt)), filename=f"filters.{fmt}"))
+
+    @commands.hybrid_command(description="Shows your filters.", help="Shows your filters, a page at a time.")
+    async def show_profile(self, ctx):
+        pages = await self.reddit_monitor.get_profile_pages(str(ctx.author.id))
+        if not pages:
+            await ctx.send("Your profile:\nNo filters set up yet.")
+            return
+        embeds = []
+        for number, page in enumerate(pages, 1):
+            embed = discord.Embed(title="Your active filters", description=page)
+            if len(pages) > 1:
+                embed.set_footer(text=f"Page {number}/{len(pages)}")
+            embeds.append(embed)
+        await send_pages(ctx, embeds)
+
+    @commands.command(name='profile', help="Profiles the next N monitor cycles. Usage: $profile <cycles>")
+    @commands.is_owner()
+    async def profile(self, ctx, cycles: int = PROFILE_SIGNAL_CYCLES):
+        self.reddit_monitor.profiler.request(cycles)
+        await ctx.send(f"Profiling the next {cycles} cycle(s), output in '{self.reddit_monitor.profiler.output_dir}/'.")
+
+    @commands.command(name='sync', help="Registers the bot's slash commands with Discord. Run once after they change.")
+    @commands.is_owner()
+    async def sync(self, ctx):
+        # Not done on every start: command registration is rate limited and rarely changes
+        synced = await ctx.bot.tree.sync()
+        await ctx.send(f"Synced {len(synced)} slash command(s).")
+
+    @commands.command(name='shutdown')
+    @commands.is_owner()
+    async def shutdown(self, ctx):
+        """Shuts down the bot. Only the bot owner can use this command."""
         try:
-            # Fix: Use engine instead of async_engine
-            await engine.dispose()
-            logger.info("Database connections closed successfully")
+            await ctx.send("Shutting down...")
+            # FilterBot.close stops the monitor, database, metrics and tracing
+            await ctx.bot.close()
+            logger.info("Bot shutdown completed")
         except Exception as e:
-            logger.error(f"Error closing database connections: {e}")
-        
-        # Close the bot
-        await bot.close()
-        logger.info("Bot shutdown completed")
-            
-    except Exception as e:
-        logger.error(f"Error during shutdown process: {e}")
-        await ctx.send("Error during shutdown. Check logs for details.")
+            logger.error(f"Error during shutdown process: {e}")
+            await ctx.send("Error during shutdown. Check logs for details.")
 
+    async def cog_command_error(self, ctx, error):
+        if isinstance(error, commands.CheckFailure):
+            await ctx.send("You do not have permission to use this command.")
 
-@shutdown.error
-async def shutdown_error(ctx, error):
-    if isinstance(error, commands.CheckFailure):
-        await ctx.send("You do not have permission to use this command.")
+
+class FilterBot(commands.Bot):
+    """The Discord client; services start once in setup_hook rather than on every on_ready."""
+
+    def __init__(self, app: App):
+        intents = discord.Intents.default()
+        intents.message_content = True
+        super().__init__(command_prefix='$', intents=intents)
+        self.app = app
+        self._announced = False
+
+    async def setup_hook(self) -> None:
+        # Runs once after login, before the gateway connects, so the first
+        # monitor cycle doesn't wait for READY
+        await self.add_cog(FilterCommands(self.app))
+        await self.app.start(self)
+        logging.info("\n\n Initialized \n\n")
+
+    async def on_ready(self):
+        # on_ready fires again after every reconnect; only announce once
+        if self._announced:
+            return
+        self._announced = True
+        for channel_id in self.app.config.channel_ids:
+            channel = self.get_channel(int(channel_id))
+            if channel:
+                await channel.send("Initialized. Use \"help\" for documentation")
+            else:
+                logging.error(f"\nerror channel {channel_id} failed to initialize\n")
+
+    async def close(self) -> None:
+        await self.app.stop()
+        await super().close()
+
+
+def create_bot(config: Config) -> FilterBot:
+    """Build the bot and its services without connecting to anything."""
+    return FilterBot(App(config))
+
+
+def main() -> None:
+    config = Config.from_env()
+    # Rotating app.log (10MB x 5) written from a background thread via a QueueHandler
+    log_listener = configure_logging(config.log_file, sql_echo=config.sql_echo)
+    metrics.install_discord_ratelimit_counter()
+    try:
+        # log_handler=None keeps discord.py from installing its own synchronous stderr handler;
+        # its records propagate to the root queue handler instead
+        create_bot(config).run(config.discord_token, log_handler=None)
+    finally:
+        stop_listener(log_listener)
 
 
-bot.run(os.getenv('DISCORD_TOKEN'))
\ No newline at end of file
+if __name__ == '__main__':
+    main()
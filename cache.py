@@ -4,11 +4,21 @@ from typing import Dict, Optional, Any
 class SubredditCache:
     """A time-based cache for storing subreddit posts."""
     
-    def __init__(self, timeout: int):
-        """Initialize cache with timeout in seconds."""
+    def __init__(self, timeout: int, max_size: Optional[int] = None):
+        """
+        Initialize cache with timeout in seconds.
+
+        Expired entries are only dropped when read, so keys that are never
+        read again would stay forever; with ``max_size`` a full cache first
+        drops expired entries, then the oldest ones.
+        """
         self._cache: Dict[str, Any] = {}
         self._timestamps: Dict[str, datetime] = {}
         self.timeout = timeout
+        self.max_size = max_size
+
+    def __len__(self) -> int:
+        return len(self._cache)
 
     def get(self, key: str) -> Optional[Any]:
         """
@@ -41,9 +51,36 @@ class SubredditCache:
             key: Cache key to set
             value: Value to cache
         """
+        if key in self._cache:
+            # Re-inserted below so insertion order stays oldest first
+            self._remove(key)
+        elif self.max_size is not None and len(self._cache) >= self.max_size:
+            self._evict()
         self._cache[key] = value
         # Store timezone-aware UTC timestamp
         self._timestamps[key] = datetime.now(timezone.utc)
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a key from the cache if present.
+
+        Args:
+            key: Cache key to remove
+        """
+        if key in self._cache:
+            self._remove(key)
+
+    def _evict(self) -> None:
+        """Drop expired entries, or the oldest one if none have expired."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.timeout)
+        # Timestamps are in insertion order, so expired entries are at the front
+        expired = []
+        for key, timestamp in self._timestamps.items():
+            if timestamp >= cutoff:
+                break
+            expired.append(key)
+        for key in expired or [next(iter(self._timestamps))]:
+            self._remove(key)
         
     def _remove(self, key: str) -> None:
         """
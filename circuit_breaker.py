@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional
+
+import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single subreddit.
+
+    Closed: requests flow. After ``failure_threshold`` consecutive transient
+    failures, or one permanent failure (private, banned, missing), it opens
+    and requests are skipped until the backoff expires. It then goes half-open
+    and lets one probe through: success closes it, failure reopens it with
+    the backoff doubled, up to ``max_backoff``.
+    """
+
+    def __init__(self, failure_threshold: int = 3, base_backoff: float = 300.0, max_backoff: float = 86400.0):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = CLOSED
+        self.failures = 0
+        # Consecutive times the breaker has opened, drives the exponential backoff
+        self.opens = 0
+        self.retry_at = 0.0
+        self.last_error: Optional[str] = None
+        self.permanent = False
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Return True if a request may be made now (a half-open probe counts)."""
+        if self.state == CLOSED:
+            return True
+        now = now if now is not None else time.monotonic()
+        if self.state == OPEN and now >= self.retry_at:
+            self.state = HALF_OPEN
+            return True
+        # Only the one probe is allowed while half-open
+        return False
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.permanent = False
+        self.last_error = None
+
+    def record_failure(self, error: str, permanent: bool = False, now: Optional[float] = None) -> bool:
+        """
+        Record a failed request.
+
+        Returns:
+            True if this failure opened the breaker from the closed state
+        """
+        self.failures += 1
+        self.last_error = error
+        self.permanent = permanent
+        was_closed = self.state == CLOSED
+        if self.state == HALF_OPEN or permanent or self.failures >= self.failure_threshold:
+            now = now if now is not None else time.monotonic()
+            self.opens += 1
+            self.state = OPEN
+            self.retry_at = now + self.backoff
+            return was_closed
+        return False
+
+    @property
+    def backoff(self) -> float:
+        return min(self.base_backoff * 2 ** max(self.opens - 1, 0), self.max_backoff)
+
+
+class SubredditBreakers:
+    """Lazily created circuit breakers keyed by lower-cased subreddit name."""
+
+    def __init__(self, failure_threshold: int = 3, base_backoff: float = 300.0, max_backoff: float = 86400.0):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, subreddit: str) -> CircuitBreaker:
+        key = subreddit.lower()
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.base_backoff, self.max_backoff)
+            self._breakers[key] = breaker
+        return breaker
+
+    def allow(self, subreddit: str) -> bool:
+        breaker = self._breakers.get(subreddit.lower())
+        return breaker is None or breaker.allow()
+
+    def record_success(self, subreddit: str) -> None:
+        # Healthy subreddits don't need a breaker, so only failing ones take memory
+        if self._breakers.pop(subreddit.lower(), None) is not None:
+            self._update_gauge()
+
+    def record_failure(self, subreddit: str, error: str, permanent: bool = False) -> bool:
+        opened = self.get(subreddit).record_failure(error, permanent)
+        self._update_gauge()
+        return opened
+
+    def _update_gauge(self) -> None:
+        metrics.OPEN_CIRCUITS.set(sum(1 for b in self._breakers.values() if b.state != CLOSED))
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+# Subreddits whose comments share one /r/a+b+c/comments request
+COMMENT_BATCH_SUBREDDITS = 20
+# Times the same comments are fetched again after failing before they are given up
+MAX_COMMENT_REWINDS = 3
+
+
+class CommentPost:
+    """
+    A comment from a comment listing, shaped like a submission so the
+    matcher and the notification path take it unchanged.
+
+    The body stands in for both the title and the selftext, so plain and
+    ``body:`` keywords match the comment text; comments have no flair or
+    domain. Only the fields the monitor reads are kept, instead of the
+    asyncpraw Comment with its lazy attributes.
+    """
+
+    __slots__ = ('id', 'name', 'title', 'selftext', 'author', 'created_utc', 'permalink',
+                 'link_id', 'link_title', 'subreddit')
+
+    link_flair_text = None
+    domain = None
+
+    def __init__(
+        self,
+        comment_id: str,
+        subreddit: str,
+        body: str,
+        author: Optional[str],
+        created_utc: float,
+        permalink: str,
+        link_id: str,
+        link_title: str = ''
+    ):
+        self.id = comment_id
+        self.name = f"t1_{comment_id}"
+        self.title = body
+        self.selftext = body
+        self.author = author
+        self.created_utc = created_utc
+        self.permalink = permalink
+        self.link_id = link_id
+        self.link_title = link_title
+        self.subreddit = subreddit
+
+    @classmethod
+    def from_comment(cls, comment) -> CommentPost:
+        return cls(
+            comment.id,
+            str(comment.subreddit),
+            comment.body or '',
+            str(comment.author) if comment.author else None,
+            comment.created_utc,
+            comment.permalink,
+            comment.link_id,
+            getattr(comment, 'link_title', ''),
+        )
+
+
+def comment_key(comment_id: str) -> int:
+    """Comment ids are base36 and increase with creation, so this orders them."""
+    return int(comment_id, 36)
+
+
+@lru_cache(maxsize=4096)
+def thread_fullnames(thread_ids: str) -> FrozenSet[str]:
+    """EntryCommentTarget.thread_ids as the link_id values of comments in those threads."""
+    return frozenset(f"t3_{thread_id}" for thread_id in thread_ids.split(',') if thread_id)
+
+
+def group_subreddits(subreddits: Iterable[str], size: int = COMMENT_BATCH_SUBREDDITS) -> List[Tuple[str, ...]]:
+    subreddits = list(subreddits)
+    return [tuple(subreddits[i:i + size]) for i in range(0, len(subreddits), size)]
+
+
+class CommentCursors:
+    """
+    The newest comment id seen per subreddit.
+
+    A combined listing is read newest first and stops at the oldest cursor
+    of the subreddits in it, so each poll downloads roughly the comments
+    posted since the last one instead of a fixed window. Cursors live in
+    memory; after a restart the first poll reads one page and the entries'
+    own watermarks keep old comments from being delivered again.
+    """
+
+    def __init__(self, max_rewinds: int = MAX_COMMENT_REWINDS):
+        self._newest: Dict[str, int] = {}
+        self.max_rewinds = max_rewinds
+        # Per subreddit: the cursor the last rewind went back to and how many
+        # rewinds in a row went back to it
+        self._rewinds: Dict[str, Tuple[int, int]] = {}
+
+    def floor(self, subreddits: Sequence[str]) -> Optional[int]:
+        """Where a listing over ``subreddits`` can stop, None if none of them has been read yet."""
+        known = [self._newest[name.lower()] for name in subreddits if name.lower() in self._newest]
+        return min(known) if known else None
+
+    def advance(self, subreddits: Sequence[str], comments: Sequence[CommentPost]) -> Dict[str, List[CommentPost]]:
+        """
+        Split a combined listing by subreddit and keep the comments past each
+        subreddit's cursor.
+
+        The listing covered every subreddit in it, so all their cursors move
+        to its newest comment, not just the cursors of subreddits that had
+        new comments; otherwise one quiet subreddit would hold the group's
+        floor back and every poll would re-read the busy ones.
+
+        Returns:
+            Comments newest first, keyed by the names as given in ``subreddits``
+        """
+        names = {name.lower(): name for name in subreddits}
+        fresh: Dict[str, List[CommentPost]] = {name: [] for name in subreddits}
+        newest = None
+        for comment in comments:
+            key = comment_key(comment.id)
+            newest = key if newest is None else max(newest, key)
+            name = names.get(comment.subreddit.lower())
+            if name is None:
+                continue
+            cursor = self._newest.get(name.lower())
+            if cursor is None or key > cursor:
+                fresh[name].append(comment)
+        if newest is not None:
+            for key in names:
+                self._newest[key] = max(newest, self._newest.get(key, newest))
+        return fresh
+
+    def rewind(self, subreddit: str, comments: Sequence[CommentPost]) -> bool:
+        """
+        Move the cursor back before ``comments`` so the next poll fetches them again.
+
+        A rewind re-reads the whole group's listing, so one that keeps
+        failing isn't retried forever: after ``max_rewinds`` rewinds in a row
+        back to the same comment, the cursor stays where it is.
+
+        Returns:
+            False if the comments were given up instead
+        """
+        key = subreddit.lower()
+        if key not in self._newest or not comments:
+            return True
+        target = min(comment_key(comment.id) for comment in comments) - 1
+        previous, count = self._rewinds.get(key, (None, 0))
+        count = count + 1 if previous == target else 1
+        if count > self.max_rewinds:
+            del self._rewinds[key]
+            return False
+        self._rewinds[key] = (target, count)
+        self._newest[key] = min(self._newest[key], target)
+        return True
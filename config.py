@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class Config:
+    """Bot settings, normally read from the environment (and .env) by ``from_env``."""
+
+    discord_token: Optional[str] = None
+    reddit_client_id: Optional[str] = None
+    reddit_secret: Optional[str] = None
+    user_agent: Optional[str] = None
+    database_url: str = 'sqlite+aiosqlite:///:memory:'
+    # Seconds between monitor cycles (PING_TIMER), and the most (NEW_POSTS) and fewest
+    # (NEW_POSTS_MIN) posts one poll asks a subreddit for, sized from its arrival rate
+    check_interval: int = 600
+    new_posts: int = 50
+    new_posts_min: int = 5
+    # Channels the bot announces itself in and accepts channel filters from
+    channel_ids: List[str] = field(default_factory=list)
+    # Optional overrides to point asyncpraw at a local fake server (see fake_reddit.py)
+    reddit_oauth_url: Optional[str] = None
+    reddit_url: Optional[str] = None
+    # Seconds per cycle spent starting new subreddits before the rest carry over (default 90% of the interval)
+    cycle_budget: Optional[float] = None
+    # Concurrent subreddit fetches and Discord deliveries within a cycle
+    fetch_concurrency: int = 4
+    notify_concurrency: int = 4
+    # Subreddits whose comments are fetched together in one combined listing
+    comment_batch_size: int = 20
+    # Seconds of history a brand-new filter is matched against on its first check
+    new_filter_backfill: float = 3600.0
+    # Port for the Prometheus /metrics endpoint, disabled when unset
+    metrics_port: Optional[int] = None
+    # Liveness fails when no monitor cycle has completed for this many seconds (default 3 intervals)
+    health_max_cycle_age: Optional[float] = None
+    # Profile the first N cycles after startup; SIGUSR1 or $profile arms it at runtime
+    profile_cycles: int = 0
+    # Fraction of posts traced end to end (0 disables tracing) and where spans are written
+    trace_sample_ratio: float = 0.0
+    trace_file: str = os.path.join('traces', 'spans.jsonl')
+    # SQL statement logging: off (default), 'debug' for every statement, or a sample rate like 0.01
+    sql_echo: str = ''
+    log_file: str = 'app.log'
+
+    def __post_init__(self):
+        if self.cycle_budget is None:
+            self.cycle_budget = self.check_interval * 0.9
+        if self.health_max_cycle_age is None:
+            self.health_max_cycle_age = self.check_interval * 3.0
+        self.new_posts_min = min(self.new_posts_min, self.new_posts)
+
+    @property
+    def reddit_kwargs(self) -> dict:
+        return {
+            key: value for key, value in
+            (('oauth_url', self.reddit_oauth_url), ('reddit_url', self.reddit_url)) if value
+        }
+
+    @classmethod
+    def from_env(cls) -> Config:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        env = os.environ
+        # DATABASE_URL selects another backend, e.g. sqlite+aiosqlite:///data/filters.db
+        database_url = env.get('DATABASE_URL')
+        if not database_url:
+            password = urllib.parse.quote_plus(env.get('DB_PASSWORD', ''))
+            database_url = (
+                f"mysql+aiomysql://{env.get('DB_USER')}:{password}@{env.get('DB_HOST')}:3306/{env.get('DB_SCHEMA')}"
+            )
+        check_interval = int(env.get('PING_TIMER', '600'))
+        return cls(
+            discord_token=env.get('DISCORD_TOKEN'),
+            reddit_client_id=env.get('REDDIT_CLIENT_ID'),
+            reddit_secret=env.get('REDDIT_SECRET'),
+            user_agent=env.get('USER_AGENT'),
+            database_url=database_url,
+            check_interval=check_interval,
+            new_posts=int(env.get('NEW_POSTS', '50')),
+            new_posts_min=int(env.get('NEW_POSTS_MIN', '5')),
+            channel_ids=[c.strip() for c in env.get('CHANNEL_ID', '').split(',') if c.strip()],
+            reddit_oauth_url=env.get('REDDIT_OAUTH_URL'),
+            reddit_url=env.get('REDDIT_URL'),
+            cycle_budget=float(env['CYCLE_BUDGET']) if env.get('CYCLE_BUDGET') else None,
+            fetch_concurrency=int(env.get('FETCH_CONCURRENCY', '4')),
+            notify_concurrency=int(env.get('NOTIFY_CONCURRENCY', '4')),
+            comment_batch_size=int(env.get('COMMENT_BATCH_SUBREDDITS', '20')),
+            new_filter_backfill=float(env.get('NEW_FILTER_BACKFILL', '3600')),
+            metrics_port=int(env['METRICS_PORT']) if env.get('METRICS_PORT') else None,
+            health_max_cycle_age=float(env['HEALTH_MAX_CYCLE_AGE']) if env.get('HEALTH_MAX_CYCLE_AGE') else None,
+            profile_cycles=int(env.get('PROFILE_CYCLES', '0')),
+            trace_sample_ratio=float(env.get('TRACE_SAMPLE_RATIO', '0')),
+            trace_file=env.get('TRACE_FILE', os.path.join('traces', 'spans.jsonl')),
+            sql_echo=env.get('SQL_ECHO', ''),
+        )
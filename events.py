@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import List, NamedTuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+FILTER_ADDED = 'added'
+FILTER_REMOVED = 'removed'
+
+EVENTS_DROPPED = metrics.REGISTRY.counter(
+    'reddit_monitor_events_dropped_total', "Filter change events dropped because a subscriber queue was full.")
+
+
+class FilterEvent(NamedTuple):
+    """A committed change to a user's filters."""
+
+    kind: str
+    user_id: str
+    subreddit: str
+    entry_name: str
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for filter changes.
+
+    Each subscriber gets its own bounded queue. ``publish`` never blocks the
+    command that made the change: if a subscriber has fallen behind, the
+    event is dropped and counted. Nothing is lost for good, since the
+    regular monitor cycle still picks up every filter.
+    """
+
+    def __init__(self, max_queue: int = 1000):
+        self.max_queue = max_queue
+        self._subscribers: List[asyncio.Queue] = []
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def publish(self, event: FilterEvent) -> None:
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                EVENTS_DROPPED.inc()
+                logger.warning("Dropped %s event for r/%s, subscriber is behind", event.kind, event.subreddit)
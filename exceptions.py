@@ -8,4 +8,12 @@ class CacheError(RedditMonitorError):
 
 class RedditAPIError(RedditMonitorError):
     """Raised when there's an error with Reddit API interactions."""
-    pass
\ No newline at end of file
+    pass
+
+class SubredditUnavailableError(RedditMonitorError):
+    """Raised when a subreddit is private, banned or does not exist."""
+
+    def __init__(self, subreddit: str, reason: str):
+        super().__init__(f"r/{subreddit} is unavailable ({reason})")
+        self.subreddit = subreddit
+        self.reason = reason
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Reddit never serves more than 1000 items from a listing
+MAX_LISTING = 1000
+MAX_PAGE = 100
+
+
+class FakeSubreddit:
+    """State for a single fake subreddit: its posts, comments and post arrival rate."""
+
+    def __init__(self, name: str, posts_per_minute: float = 0.0, status: int = 200):
+        self.name = name
+        self.posts_per_minute = posts_per_minute
+        # 200 for a normal subreddit, 403 for private, 404 for banned/missing
+        self.status = status
+        self.posts: Deque[Dict[str, Any]] = deque(maxlen=MAX_LISTING)  # newest first
+        self.comments: Deque[Dict[str, Any]] = deque(maxlen=MAX_LISTING)  # newest first
+        self._pending = 0.0
+        self._last_advance = time.time()
+
+
+class FakeRedditServer:
+    """
+    Local stand-in for the Reddit OAuth and listing endpoints.
+
+    Point asyncpraw at it with ``asyncpraw.Reddit(**server.reddit_kwargs(), ...)``
+    or by passing ``server.reddit_kwargs()`` as ``RedditMonitor(reddit_kwargs=...)``.
+    Latency, post arrival rate, rate-limit budget, 429s and 5xx errors are all
+    configurable so the monitor can be exercised end to end without network.
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        ratelimit_budget: int = 1000,
+        ratelimit_window: int = 600,
+        error_rate_429: float = 0.0,
+        error_rate_5xx: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind, 0 picks a free one
+            latency: Base delay in seconds added to every response
+            jitter: Extra uniform random delay in seconds on top of latency
+            ratelimit_budget: Requests allowed per rate-limit window
+            ratelimit_window: Length of the rate-limit window in seconds
+            error_rate_429: Probability of a random 429 on any API request
+            error_rate_5xx: Probability of a random 503 on any API request
+            seed: Seed for the random generator, for reproducible runs
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.ratelimit_budget = ratelimit_budget
+        self.ratelimit_window = ratelimit_window
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.random = random.Random(seed)
+
+        self.subreddits: Dict[str, FakeSubreddit] = {}
+        self.requests: Counter = Counter()
+        self._forced_errors: Deque[int] = deque()
+        self._window_start = time.time()
+        self._used = 0
+        self._next_id = 1
+        self._runner: Optional[web.AppRunner] = None
+
+    # Configuration
+
+    def add_subreddit(self, name: str, posts_per_minute: float = 0.0, status: int = 200) -> FakeSubreddit:
+        """Register a subreddit, optionally generating posts at a steady rate."""
+        sub = FakeSubreddit(name, posts_per_minute, status)
+        self.subreddits[name.lower()] = sub
+        return sub
+
+    def add_posts(
+        self,
+        subreddit: str,
+        titles: Iterable[str],
+        created_utc: Optional[float] = None,
+        **fields: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Add posts to a subreddit immediately, newest last in ``titles``.
+
+        Extra keyword arguments are copied into every post's data (e.g. selftext).
+        """
+        sub = self.subreddits.get(subreddit.lower()) or self.add_subreddit(subreddit)
+        now = created_utc if created_utc is not None else time.time()
+        added = []
+        for title in titles:
+            post = self._make_post(sub, title, now)
+            post.update(fields)
+            sub.posts.appendleft(post)
+            added.append(post)
+        return added
+
+    def add_comments(
+        self,
+        subreddit: str,
+        bodies: Iterable[str],
+        link_id: Optional[str] = None,
+        created_utc: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Add comments to a subreddit immediately, newest last in ``bodies``.
+
+        ``link_id`` is the t3_ fullname of the thread they are in, by default
+        the subreddit's newest post (one is created if it has none).
+        """
+        sub = self.subreddits.get(subreddit.lower()) or self.add_subreddit(subreddit)
+        if link_id is None:
+            if not sub.posts:
+                self.add_posts(subreddit, ["Discussion thread"])
+            link_id = sub.posts[0]['name']
+        link_title = next((p['title'] for p in sub.posts if p['name'] == link_id), '')
+        now = created_utc if created_utc is not None else time.time()
+        added = []
+        for body in bodies:
+            comment = self._make_comment(sub, body, link_id, link_title, now)
+            sub.comments.appendleft(comment)
+            added.append(comment)
+        return added
+
+    def fail_next(self, status: int, times: int = 1) -> None:
+        """Force the next ``times`` API requests to fail with ``status``."""
+        self._forced_errors.extend([status] * times)
+
+    # Lifecycle
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def reddit_kwargs(self) -> Dict[str, str]:
+        """Keyword arguments that point asyncpraw.Reddit at this server."""
+        return {'oauth_url': self.url, 'reddit_url': self.url}
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post('/api/v1/access_token', self._access_token)
+        app.router.add_get('/r/{subreddit}/new', self._listing_new)
+        app.router.add_get('/r/{subreddit}/comments', self._listing_comments)
+        app.router.add_get('/r/{subreddit}/comments/', self._listing_comments)
+        app.router.add_get('/r/{subreddit}/about', self._about)
+        app.router.add_get('/r/{subreddit}/about/', self._about)
+        return app
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Resolve the real port when 0 was requested
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info("Fake Reddit listening on %s", self.url)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> FakeRedditServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    # Request handling
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if request.path == '/api/v1/access_token':
+            self.requests['access_token'] += 1
+            return await handler(request)
+
+        self.requests[request.path] += 1
+        remaining, reset = self._consume_ratelimit()
+        headers = {
+            'x-ratelimit-remaining': str(float(remaining)),
+            'x-ratelimit-used': str(self._used),
+            'x-ratelimit-reset': str(reset),
+        }
+
+        status = self._injected_error()
+        if status is not None:
+            self.requests[f'error_{status}'] += 1
+            return web.json_response({'message': 'error', 'error': status}, status=status, headers=headers)
+
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    def _consume_ratelimit(self) -> Tuple[int, int]:
+        now = time.time()
+        if now - self._window_start >= self.ratelimit_window:
+            self._window_start = now
+            self._used = 0
+        self._used += 1
+        remaining = max(self.ratelimit_budget - self._used, 0)
+        reset = int(self.ratelimit_window - (now - self._window_start))
+        return remaining, reset
+
+    def _injected_error(self) -> Optional[int]:
+        if self._forced_errors:
+            return self._forced_errors.popleft()
+        if self._used > self.ratelimit_budget:
+            return 429
+        if self.error_rate_429 and self.random.random() < self.error_rate_429:
+            return 429
+        if self.error_rate_5xx and self.random.random() < self.error_rate_5xx:
+            return 503
+        return None
+
+    async def _access_token(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'access_token': 'fake-token',
+            'expires_in': 86400,
+            'scope': '*',
+            'token_type': 'bearer',
+        })
+
+    async def _about(self, request: web.Request) -> web.Response:
+        sub = self._get_subreddit(request)
+        if sub is None:
+            return web.json_response({'message': 'Not Found', 'error': 404}, status=404)
+        if sub.status != 200:
+            return web.json_response({'message': 'error', 'error': sub.status}, status=sub.status)
+        return web.json_response({
+            'kind': 't5',
+            'data': {'display_name': sub.name, 'name': f"t5_{sub.name.lower()}", 'subreddit_type': 'public'},
+        })
+
+    async def _listing_new(self, request: web.Request) -> web.Response:
+        sub = self._get_subreddit(request)
+        if sub is None:
+            return web.json_response({'message': 'Not Found', 'error': 404}, status=404)
+        if sub.status != 200:
+            return web.json_response({'message': 'error', 'error': sub.status}, status=sub.status)
+
+        self._advance(sub)
+        return self._listing(request, list(sub.posts), 't3')
+
+    async def _listing_comments(self, request: web.Request) -> web.Response:
+        """Newest comments of one subreddit or of several joined with '+', like Reddit's."""
+        comments = []
+        for name in request.match_info['subreddit'].split('+'):
+            sub = self.subreddits.get(name.lower())
+            if sub is None:
+                return web.json_response({'message': 'Not Found', 'error': 404}, status=404)
+            if sub.status != 200:
+                return web.json_response({'message': 'error', 'error': sub.status}, status=sub.status)
+            comments.extend(sub.comments)
+        comments.sort(key=lambda c: int(c['id'], 16), reverse=True)
+        return self._listing(request, comments, 't1')
+
+    def _listing(self, request: web.Request, items: List[Dict[str, Any]], kind: str) -> web.Response:
+        limit = min(int(request.query.get('limit', 25)), MAX_PAGE)
+        after = request.query.get('after')
+
+        start = 0
+        if after:
+            start = next((i + 1 for i, item in enumerate(items) if item['name'] == after), len(items))
+        page = items[start:start + limit]
+        has_more = start + limit < len(items)
+
+        return web.json_response({
+            'kind': 'Listing',
+            'data': {
+                'after': page[-1]['name'] if page and has_more else None,
+                'before': None,
+                'dist': len(page),
+                'children': [{'kind': kind, 'data': item} for item in page],
+            },
+        })
+
+    def _get_subreddit(self, request: web.Request) -> Optional[FakeSubreddit]:
+        return self.subreddits.get(request.match_info['subreddit'].lower())
+
+    def _advance(self, sub: FakeSubreddit) -> None:
+        """Generate posts that 'arrived' since the last request at the configured rate."""
+        now = time.time()
+        elapsed = now - sub._last_advance
+        sub._last_advance = now
+        if not sub.posts_per_minute:
+            return
+        sub._pending += sub.posts_per_minute * elapsed / 60
+        count = int(sub._pending)
+        sub._pending -= count
+        for i in range(count):
+            # Spread arrivals evenly across the elapsed window, oldest first
+            created = now - elapsed + elapsed * (i + 1) / count
+            sub.posts.appendleft(self._make_post(sub, f"Generated post {self._next_id}", created))
+
+    def _make_comment(
+        self,
+        sub: FakeSubreddit,
+        body: str,
+        link_id: str,
+        link_title: str,
+        created_utc: float
+    ) -> Dict[str, Any]:
+        comment_id = format(self._next_id, 'x')
+        self._next_id += 1
+        thread_id = link_id.split('_', 1)[1]
+        return {
+            'id': comment_id,
+            'name': f"t1_{comment_id}",
+            'body': body,
+            'author': 'fake_user',
+            'subreddit': sub.name,
+            'created_utc': created_utc,
+            'link_id': link_id,
+            'link_title': link_title,
+            'parent_id': link_id,
+            'permalink': f"/r/{sub.name}/comments/{thread_id}/_/{comment_id}/",
+        }
+
+    def _make_post(self, sub: FakeSubreddit, title: str, created_utc: float) -> Dict[str, Any]:
+        post_id = format(self._next_id, 'x')
+        self._next_id += 1
+        return {
+            'id': post_id,
+            'name': f"t3_{post_id}",
+            'title': title,
+            'selftext': '',
+            'link_flair_text': None,
+            'domain': f"self.{sub.name}",
+            'author': 'fake_user',
+            'subreddit': sub.name,
+            'created_utc': created_utc,
+            'permalink': f"/r/{sub.name}/comments/{post_id}/",
+            'url': f"https://www.reddit.com/r/{sub.name}/comments/{post_id}/",
+            'is_self': True,
+        }
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = FakeRedditServer(
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        ratelimit_budget=args.ratelimit_budget,
+        error_rate_429=args.error_rate_429,
+        error_rate_5xx=args.error_rate_5xx,
+        seed=args.seed
+    )
+    for name in args.subreddits:
+        server.add_subreddit(name, posts_per_minute=args.posts_per_minute)
+    await server.start()
+    print(f"Fake Reddit running at {server.url} (set REDDIT_OAUTH_URL and REDDIT_URL to it)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run a local fake Reddit API server.")
+    parser.add_argument('subreddits', nargs='+', help="Subreddit names to serve")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--posts-per-minute', type=float, default=1.0)
+    parser.add_argument('--ratelimit-budget', type=int, default=1000)
+    parser.add_argument('--error-rate-429', type=float, default=0.0)
+    parser.add_argument('--error-rate-5xx', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    asyncio.run(_serve(parser.parse_args()))
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cache import SubredditCache
+from events import FILTER_ADDED, FilterEvent
+
+# Discord shows at most 25 autocomplete choices
+AUTOCOMPLETE_LIMIT = 25
+# Characters per profile page, under the 4096 an embed description holds
+PROFILE_PAGE_CHARS = 4000
+
+
+class PrefixIndex:
+    """Names kept sorted by their lowercase form, so a prefix lookup is a bisect."""
+
+    __slots__ = ('_keys',)
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._keys: List[Tuple[str, str]] = sorted({(name.lower(), name) for name in names})
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self):
+        return (name for _, name in self._keys)
+
+    def add(self, name: str) -> None:
+        key = (name.lower(), name)
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            insort(self._keys, key)
+
+    def discard(self, name: str) -> None:
+        key = (name.lower(), name)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def complete(self, prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[str]:
+        """Up to ``limit`` names starting with ``prefix``, ignoring case, in order."""
+        prefix = prefix.lower()
+        names = []
+        for i in range(bisect_left(self._keys, (prefix, '')), len(self._keys)):
+            lowered, name = self._keys[i]
+            if not lowered.startswith(prefix) or len(names) == limit:
+                break
+            names.append(name)
+        return names
+
+
+class UserFilters:
+    """
+    One user's filters as the bot lists them: subreddit and entry names for
+    autocomplete, and the rendered profile lines, None once a change has made
+    them stale.
+    """
+
+    __slots__ = ('subreddits', 'entries', 'lines')
+
+    def __init__(self, entries: Dict[str, List[str]], lines: Optional[List[str]]):
+        self.subreddits = PrefixIndex(entries)
+        self.entries = {subreddit: PrefixIndex(names) for subreddit, names in entries.items()}
+        self.lines = lines
+
+    def add(self, subreddit: str, entry_name: str) -> None:
+        if subreddit not in self.entries:
+            self.subreddits.add(subreddit)
+            self.entries[subreddit] = PrefixIndex()
+        self.entries[subreddit].add(entry_name)
+
+    def remove(self, subreddit: str, entry_name: str) -> None:
+        names = self.entries.get(subreddit)
+        if names is None:
+            return
+        names.discard(entry_name)
+        if not names:
+            # remove_filter deletes the UserSubreddit with its last entry
+            del self.entries[subreddit]
+            self.subreddits.discard(subreddit)
+
+
+class FilterIndex:
+    """
+    Per-user filter listings held in memory for show_profile and slash
+    command autocomplete.
+
+    A user's listing is loaded with one query the first time it is needed.
+    Filter changes then update the names in place, so autocomplete never
+    goes back to the database, and drop the rendered profile so the next
+    show_profile re-renders it. Listings also expire after ``timeout``
+    seconds, which bounds how long a change made outside the bot (a manual
+    database edit) stays invisible.
+    """
+
+    def __init__(self, timeout: int = 3600, max_users: int = 10_000):
+        self._users = SubredditCache(timeout=timeout, max_size=max_users)
+        # Bumped by every change; a listing loaded across a change is not stored
+        self.generation = 0
+
+    def get(self, user_id: str) -> Optional[UserFilters]:
+        return self._users.get(user_id)
+
+    def store(self, user_id: str, filters: UserFilters, generation: int) -> bool:
+        """Keep a listing loaded at ``generation``, unless a change has happened since."""
+        if generation != self.generation:
+            return False
+        self._users.set(user_id, filters)
+        return True
+
+    def apply(self, event: FilterEvent) -> None:
+        """Fold a committed add or remove into the user's cached listing."""
+        self.generation += 1
+        filters = self._users.get(event.user_id)
+        if filters is None:
+            return
+        if event.kind == FILTER_ADDED:
+            filters.add(event.subreddit, event.entry_name)
+        else:
+            filters.remove(event.subreddit, event.entry_name)
+        filters.lines = None
+
+    def clear(self) -> None:
+        self._users.clear()
+        self.generation += 1
+
+
+def paginate_lines(lines: List[str], page_chars: int = PROFILE_PAGE_CHARS) -> List[str]:
+    """
+    Join lines into pages of at most ``page_chars`` characters, breaking only
+    between lines; a single longer line is cut short with an ellipsis and
+    blank lines at a page break are dropped.
+    """
+    pages: List[str] = []
+    page: List[str] = []
+    size = 0
+    for line in lines:
+        if len(line) > page_chars:
+            line = line[:page_chars - 1] + '…'
+        if page and size + 1 + len(line) > page_chars:
+            pages.append('\n'.join(page).rstrip('\n'))
+            page, size = [], 0
+        if not line and not page:
+            continue
+        size += len(line) + (1 if page else 0)
+        page.append(line)
+    if page:
+        pages.append('\n'.join(page).rstrip('\n'))
+    return pages
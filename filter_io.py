@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+# Reddit's own rule for subreddit names
+SUBREDDIT_NAME = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_]{1,20}$')
+# RedditMonitor.subreddit_status() result for a readable subreddit
+SUBREDDIT_OK = 'ok'
+MAX_IMPORT_FILTERS = 1000
+MAX_IMPORT_BYTES = 1024 * 1024
+# Length of models.EntryKeyword.keyword
+MAX_KEYWORD_LENGTH = 255
+CSV_FIELDS = ('subreddit', 'entry_name', 'keywords')
+# Columns a file may leave out: comment filters and channel bindings
+OPTIONAL_FIELDS = ('target', 'threads', 'channel', 'role')
+TARGET_POSTS = 'posts'
+TARGET_COMMENTS = 'comments'
+# A Discord id, as models.EntryChannel stores it
+SNOWFLAKE = re.compile(r'^[0-9]{1,32}$')
+# A submission id, bare, as a t3_ fullname or inside a reddit.com/.../comments/<id>/ link
+MAX_THREAD_ID_LENGTH = 12
+THREAD_ID = re.compile(
+    rf'^(?:t3_)?([a-z0-9]{{1,{MAX_THREAD_ID_LENGTH}}})$|/comments/([a-z0-9]{{1,{MAX_THREAD_ID_LENGTH}}})(?:/|$)',
+    re.IGNORECASE
+)
+# Length of models.EntryCommentTarget.thread_ids, a filter's thread ids joined by commas
+MAX_THREAD_IDS_LENGTH = 255
+# Threads one comment filter can watch: this many of the longest ids still fit the column
+MAX_COMMENT_THREADS = (MAX_THREAD_IDS_LENGTH + 1) // (MAX_THREAD_ID_LENGTH + 1)
+
+
+class FilterSpec(NamedTuple):
+    """One filter as it appears in an import or export file."""
+
+    subreddit: str
+    entry_name: str
+    keywords: List[str]
+    # As RedditMonitor.add_filter takes them: thread ids for a comment filter
+    # (empty for every comment), the channel its matches are posted in and
+    # the role mentioned there
+    comment_threads: Optional[List[str]] = None
+    channel_id: Optional[str] = None
+    role_id: Optional[str] = None
+
+
+def _clean(subreddit, entry_name, keywords, where: str, target=None, threads=None,
+           channel=None, role=None) -> FilterSpec:
+    if isinstance(keywords, str):
+        keywords = keywords.split(',')
+    if not isinstance(keywords, list):
+        raise ValueError(f"{where}: keywords must be a list or a comma separated string")
+    keywords = [str(k).strip() for k in keywords if str(k).strip()]
+    subreddit = str(subreddit or '').strip()
+    entry_name = str(entry_name or '').strip()
+
+    if not SUBREDDIT_NAME.match(subreddit):
+        raise ValueError(f"{where}: invalid subreddit name '{subreddit}'")
+    if not entry_name or len(entry_name) > 255:
+        raise ValueError(f"{where}: entry name must be 1-255 characters")
+    if not keywords:
+        raise ValueError(f"{where}: at least one keyword is required")
+    if any(len(k) > MAX_KEYWORD_LENGTH for k in keywords):
+        raise ValueError(f"{where}: keywords must be at most {MAX_KEYWORD_LENGTH} characters")
+
+    target = str(target or TARGET_POSTS).strip().lower()
+    if isinstance(threads, str):
+        threads = threads.split(',')
+    if not isinstance(threads, (list, type(None))):
+        raise ValueError(f"{where}: threads must be a list or a comma separated string")
+    threads = [str(t).strip() for t in threads or [] if str(t).strip()]
+    if target == TARGET_POSTS:
+        if threads:
+            raise ValueError(f"{where}: threads are only for target '{TARGET_COMMENTS}'")
+        comment_threads = None
+    elif target == TARGET_COMMENTS:
+        try:
+            comment_threads = list(dict.fromkeys(parse_thread_id(t) for t in threads))
+        except ValueError as e:
+            raise ValueError(f"{where}: {e}")
+        if len(comment_threads) > MAX_COMMENT_THREADS:
+            raise ValueError(f"{where}: at most {MAX_COMMENT_THREADS} threads")
+    else:
+        raise ValueError(f"{where}: target must be '{TARGET_POSTS}' or '{TARGET_COMMENTS}'")
+
+    channel = str(channel or '').strip() or None
+    role = str(role or '').strip() or None
+    if channel is not None and not SNOWFLAKE.match(channel):
+        raise ValueError(f"{where}: invalid channel id '{channel}'")
+    if role is not None and (channel is None or not SNOWFLAKE.match(role)):
+        raise ValueError(f"{where}: role must be a role id, with a channel")
+    return FilterSpec(subreddit, entry_name, keywords, comment_threads, channel, role)
+
+
+def parse_thread_id(text: str) -> str:
+    """
+    The base36 submission id in a thread id, fullname or link.
+
+    Raises:
+        ValueError: If ``text`` doesn't identify a submission
+    """
+    match = THREAD_ID.search(text.strip())
+    if not match:
+        raise ValueError(f"'{text}' is not a Reddit thread id or link")
+    return (match.group(1) or match.group(2)).lower()
+
+
+def parse_filters(data: bytes, filename: str) -> List[FilterSpec]:
+    """
+    Parse an uploaded filter file, JSON or CSV depending on its extension.
+
+    JSON is a list of ``{"subreddit", "entry_name", "keywords"}`` objects;
+    CSV has a ``subreddit,entry_name,keywords`` header with the keywords
+    comma separated in one quoted field. Both may add ``target`` ("posts",
+    the default, or "comments"), ``threads`` for a comment filter, and the
+    ``channel`` and ``role`` ids of a channel filter. A later row for the
+    same subreddit and entry name replaces an earlier one.
+
+    Raises:
+        ValueError: If the file is too large, malformed or has an invalid row
+    """
+    if len(data) > MAX_IMPORT_BYTES:
+        raise ValueError(f"File is larger than {MAX_IMPORT_BYTES // 1024} KiB")
+    text = data.decode('utf-8-sig')
+
+    if filename.lower().endswith('.json'):
+        try:
+            rows = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("JSON must be a list of filter objects")
+        specs = [
+            _clean(row.get('subreddit'), row.get('entry_name'), row.get('keywords', []), f"Item {i}",
+                   **{field: row.get(field) for field in OPTIONAL_FIELDS})
+            for i, row in enumerate(rows, start=1)
+        ]
+    elif filename.lower().endswith('.csv'):
+        reader = csv.DictReader(io.StringIO(text))
+        if reader.fieldnames is None or not set(CSV_FIELDS) <= set(reader.fieldnames):
+            raise ValueError(f"CSV header must be {','.join(CSV_FIELDS)}")
+        specs = [
+            _clean(row['subreddit'], row['entry_name'], row['keywords'] or '', f"Line {reader.line_num}",
+                   **{field: row.get(field) for field in OPTIONAL_FIELDS})
+            for row in reader
+        ]
+    else:
+        raise ValueError("Attach a .json or .csv file")
+
+    # Collapse duplicates so one upsert statement never touches the same row twice
+    unique: Dict[tuple, FilterSpec] = {}
+    for spec in specs:
+        unique[(spec.subreddit, spec.entry_name)] = spec
+    if len(unique) > MAX_IMPORT_FILTERS:
+        raise ValueError(f"At most {MAX_IMPORT_FILTERS} filters can be imported at once")
+    return list(unique.values())
+
+
+def _row(spec: FilterSpec) -> dict:
+    row = {'subreddit': spec.subreddit, 'entry_name': spec.entry_name, 'keywords': spec.keywords,
+           'target': TARGET_POSTS if spec.comment_threads is None else TARGET_COMMENTS}
+    if spec.comment_threads is not None:
+        row['threads'] = spec.comment_threads
+    if spec.channel_id:
+        row['channel'] = spec.channel_id
+        if spec.role_id:
+            row['role'] = spec.role_id
+    return row
+
+
+def dump_filters(specs: List[FilterSpec], fmt: str = 'json') -> bytes:
+    """Serialize filters in the format ``parse_filters`` reads back."""
+    rows = [_row(spec) for spec in specs]
+    if fmt == 'csv':
+        out = io.StringIO()
+        writer = csv.DictWriter(out, CSV_FIELDS + OPTIONAL_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, 'keywords': ','.join(row['keywords']),
+                             'threads': ','.join(row.get('threads', []))})
+        return out.getvalue().encode()
+    return json.dumps(rows, indent=2).encode()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Watchdog:
+    """
+    In-process health monitor for the event loop and the monitor task.
+
+    An asyncio task samples event-loop lag by measuring how late a periodic
+    sleep wakes up. A separate thread watches that task's heartbeat; when the
+    loop stops ticking for longer than ``slow_threshold`` it logs the loop
+    thread's current stack, which points at the blocking callback.
+
+    Liveness fails when the loop is stalled, the monitor task has died, or no
+    monitor cycle has completed within ``max_cycle_age`` seconds. Readiness
+    additionally requires at least one completed cycle.
+    """
+
+    def __init__(
+        self,
+        monitor=None,
+        interval: float = 0.5,
+        slow_threshold: float = 1.0,
+        max_cycle_age: float = 1800.0,
+        stall_threshold: float = 30.0
+    ):
+        """
+        Args:
+            monitor: RedditMonitor whose ``last_cycle_completed_at`` is tracked
+            interval: Seconds between loop lag samples
+            slow_threshold: Loop block in seconds that triggers a stack dump
+            max_cycle_age: Seconds without a completed cycle before liveness fails
+            stall_threshold: Seconds without a loop heartbeat before liveness fails
+        """
+        self.monitor = monitor
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.max_cycle_age = max_cycle_age
+        self.stall_threshold = stall_threshold
+
+        self.last_lag = 0.0
+        self.started_at = time.monotonic()
+        self._heartbeat = self.started_at
+        self._reported_heartbeat: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watched_task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start sampling; must be called from the running event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self.started_at = self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample_lag())
+        self._thread = threading.Thread(target=self._watch_stalls, name='loop-watchdog', daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    def watch_task(self, task: asyncio.Task) -> None:
+        """Track the monitor loop task so its death fails liveness."""
+        self._watched_task = task
+
+    async def _sample_lag(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.last_lag = max(now - expected, 0.0)
+            self._heartbeat = now
+            metrics.LOOP_LAG.observe(self.last_lag)
+            metrics.LAST_CYCLE_AGE.set(self.cycle_age())
+
+    def _watch_stalls(self) -> None:
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.slow_threshold or self._reported_heartbeat == heartbeat:
+                continue
+            # Report each stall once, while it is still happening
+            self._reported_heartbeat = heartbeat
+            metrics.SLOW_CALLBACKS.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '<unavailable>'
+            logger.warning("Event loop blocked for %.2fs, current stack:\n%s", blocked_for, stack)
+
+    def cycle_age(self) -> float:
+        """Seconds since the last completed monitor cycle, or since start if none yet."""
+        last = getattr(self.monitor, 'last_cycle_completed_at', None)
+        return time.monotonic() - (last if last is not None else self.started_at)
+
+    def status(self) -> Dict[str, Any]:
+        heartbeat_age = time.monotonic() - self._heartbeat
+        task_alive = self._watched_task is None or not self._watched_task.done()
+        cycle_age = self.cycle_age()
+        has_cycled = getattr(self.monitor, 'last_cycle_completed_at', None) is not None
+
+        live = heartbeat_age < self.stall_threshold and task_alive and cycle_age < self.max_cycle_age
+        return {
+            'live': live,
+            'ready': live and has_cycled,
+            'loop_lag_seconds': round(self.last_lag, 4),
+            'heartbeat_age_seconds': round(heartbeat_age, 2),
+            'monitor_task_alive': task_alive,
+            'last_cycle_age_seconds': round(cycle_age, 2),
+        }
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class SampleFilter(logging.Filter):
+    """Lets through roughly ``rate`` of the records it sees."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return random.random() < self.rate
+
+
+def stop_listener(listener: QueueListener) -> None:
+    """Drain and stop a listener; safe to call more than once."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def configure_sql_echo(mode: Optional[str]) -> None:
+    """
+    Route SQLAlchemy statement logging through the normal logging pipeline.
+
+    Args:
+        mode: '' or 'off' disables it, 'on' or 'debug' logs every statement,
+            and a number between 0 and 1 logs that fraction of statements.
+    """
+    sql_logger = logging.getLogger('sqlalchemy.engine.Engine')
+    mode = (mode or '').strip().lower()
+    if mode in ('', 'off', '0', 'false'):
+        sql_logger.setLevel(logging.WARNING)
+        return
+
+    sql_logger.setLevel(logging.INFO)
+    if mode not in ('on', 'debug', '1', 'true'):
+        sql_logger.addFilter(SampleFilter(float(mode)))
+
+
+def configure_logging(
+    path: str = 'app.log',
+    level: int = logging.INFO,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    sql_echo: Optional[str] = None
+) -> QueueListener:
+    """
+    Send all log records through a queue to a background listener thread.
+
+    Handlers on the event loop thread only enqueue records; formatting for the
+    file and the disk write itself happen on the listener thread, so log I/O
+    never blocks the loop. Returns the listener, which is also stopped (and
+    drained) at interpreter exit.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_listener, listener)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+
+    configure_sql_echo(sql_echo)
+    return listener
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Keyword prefixes selecting the post field to match; unprefixed keywords match
+# the title. fuzzy: also matches the title, tolerating typos and spacing.
+FIELDS = ('title', 'flair', 'domain', 'author', 'fuzzy', 'body')
+FUZZY_FLAG = '--fuzzy'
+
+_NOT_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+class CompiledKeywords(NamedTuple):
+    """An entry's keywords lower-cased and split by the post field they target."""
+
+    title: Tuple[str, ...]
+    flair: Tuple[str, ...]
+    domain: Tuple[str, ...]
+    author: Tuple[str, ...]
+    fuzzy: Tuple[str, ...]
+    body: Tuple[str, ...]
+
+
+def normalize_keywords(keywords: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Parse ``field:value`` keywords, e.g. ``flair:selling`` or ``body:16gb``,
+    into distinct ``(field, lower-cased value)`` pairs.
+
+    A prefix that is not a known field is kept as part of a title keyword,
+    so "rtx:3080" still matches titles containing it. These pairs are what
+    the entry_keywords table stores.
+    """
+    pairs: Dict[Tuple[str, str], None] = {}
+    for keyword in keywords:
+        field, sep, value = keyword.partition(':')
+        field = field.strip().lower()
+        if sep and field in FIELDS and value.strip():
+            pairs[(field, value.strip().lower())] = None
+        else:
+            pairs[('title', keyword.lower())] = None
+    return list(pairs)
+
+
+@lru_cache(maxsize=65536)
+def compile_pairs(pairs: Tuple[Tuple[str, str], ...]) -> CompiledKeywords:
+    """Group normalized pairs by field; entries with the same keywords share one result."""
+    fields: Dict[str, list] = {field: [] for field in FIELDS}
+    for field, value in pairs:
+        fields[field].append(value)
+    return CompiledKeywords(**{field: tuple(values) for field, values in fields.items()})
+
+
+@lru_cache(maxsize=65536)
+def compile_keywords(keywords: Tuple[str, ...]) -> CompiledKeywords:
+    """Normalize and compile keywords as typed, see ``normalize_keywords``."""
+    return compile_pairs(tuple(normalize_keywords(keywords)))
+
+
+def make_fuzzy(keywords: Sequence[str]) -> List[str]:
+    """Turn an entry's unprefixed (title) keywords into fuzzy: ones, for the --fuzzy flag."""
+    return [
+        keyword if keyword.partition(':')[0].strip().lower() in FIELDS else f"fuzzy:{keyword}"
+        for keyword in keywords
+    ]
+
+
+def compact(text: str) -> str:
+    """Lower-case with everything but letters and digits removed, so "RTX 3080" and "rtx-3080" compare equal."""
+    return _NOT_ALNUM.sub('', text.lower())
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def edit_limit(length: int) -> int:
+    """Typos tolerated in a compacted keyword of this length."""
+    if length <= 3:
+        return 0
+    if length <= 7:
+        return 1
+    return 2
+
+
+def fuzzy_contains(pattern: str, text: str, limit: int) -> bool:
+    """
+    True if some substring of ``text`` is within ``limit`` edits of ``pattern``.
+
+    Edits are insertions, deletions, substitutions and swaps of adjacent
+    characters (optimal string alignment), computed column by column over
+    ``text`` so the pattern may start anywhere in it.
+    """
+    if pattern in text:
+        return True
+    if limit == 0:
+        return False
+    m = len(pattern)
+    before = None
+    previous = list(range(m + 1))
+    for j, char in enumerate(text, 1):
+        current = [0] * (m + 1)
+        for i in range(1, m + 1):
+            cost = 0 if pattern[i - 1] == char else 1
+            value = min(previous[i] + 1, current[i - 1] + 1, previous[i - 1] + cost)
+            if i > 1 and j > 1 and pattern[i - 1] == text[j - 2] and pattern[i - 2] == char:
+                value = min(value, before[i - 2] + 1)
+            current[i] = value
+        if current[m] <= limit:
+            return True
+        before, previous = previous, current
+    return False
+
+
+class FuzzyIndex:
+    """
+    Trigram index over the fuzzy keywords of every entry checked against a batch of posts.
+
+    A title only reaches the edit distance check for keywords that share
+    enough trigrams with it: one edit changes at most three trigrams of a
+    compacted keyword (four for a swap), so a keyword with ``n`` trigrams
+    needs ``n - 4 * limit`` of them, and at least one. Keywords too short to
+    have a trigram are matched exactly. The keywords a post matched are
+    computed once and shared by every entry, like ``body_cache``.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        # Compacted form -> the keyword values that compact to it
+        self._values: Dict[str, List[str]] = defaultdict(list)
+        for keyword in set(keywords):
+            key = compact(keyword)
+            if key:
+                self._values[key].append(keyword)
+        self._postings: Dict[str, List[str]] = defaultdict(list)
+        self._required: Dict[str, int] = {}
+        self._short: List[str] = []
+        for key in self._values:
+            grams = trigrams(key)
+            if not grams:
+                self._short.append(key)
+                continue
+            for gram in grams:
+                self._postings[gram].append(key)
+            self._required[key] = max(len(grams) - 4 * edit_limit(len(key)), 1)
+        self._hits: Dict[str, FrozenSet[str]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._values)
+
+    def hits(self, post) -> FrozenSet[str]:
+        """Fuzzy keyword values found in the post's title."""
+        found = self._hits.get(post.name)
+        if found is None:
+            found = self._hits[post.name] = self._search(compact(post.title))
+        return found
+
+    def _search(self, title: str) -> FrozenSet[str]:
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in trigrams(title):
+            for key in self._postings.get(gram, ()):
+                shared[key] += 1
+        matched = [
+            key for key, count in shared.items()
+            if count >= self._required[key] and fuzzy_contains(key, title, edit_limit(len(key)))
+        ]
+        matched.extend(key for key in self._short if key in title)
+        return frozenset(value for key in matched for value in self._values[key])
+
+
+def post_matches(
+    post,
+    compiled: CompiledKeywords,
+    body_cache: Optional[Dict[str, str]] = None,
+    fuzzy_index: Optional[FuzzyIndex] = None
+) -> bool:
+    """
+    Check a post against every keyword, cheapest fields first.
+
+    Title, flair, domain and author are short, so they are checked before
+    fuzzy keywords and the selftext. The selftext is only lowered once some
+    entry's other keywords have all matched, and ``body_cache`` shares that
+    lowered copy between the entries checked against the same post.
+    ``fuzzy_index`` should cover the fuzzy keywords of every entry checked
+    against the post; without one a single-entry index is built. Everything
+    comes from the listing payload, so no extra API call is made.
+    """
+    if compiled.title:
+        title = post.title.lower()
+        if not all(keyword in title for keyword in compiled.title):
+            return False
+    if compiled.flair:
+        flair = (post.link_flair_text or '').lower()
+        if not all(keyword in flair for keyword in compiled.flair):
+            return False
+    if compiled.domain:
+        domain = (post.domain or '').lower()
+        if not all(domain == keyword or domain.endswith('.' + keyword) for keyword in compiled.domain):
+            return False
+    if compiled.author:
+        # Deleted accounts come back as None
+        author = str(post.author or '').lower()
+        if not all(author == keyword for keyword in compiled.author):
+            return False
+    if compiled.fuzzy:
+        hits = (fuzzy_index if fuzzy_index is not None else FuzzyIndex(compiled.fuzzy)).hits(post)
+        if not all(keyword in hits for keyword in compiled.fuzzy):
+            return False
+    if compiled.body:
+        body = body_cache.get(post.name) if body_cache is not None else None
+        if body is None:
+            body = (post.selftext or '').lower()
+            if body_cache is not None:
+                body_cache[post.name] = body
+        if not all(keyword in body for keyword in compiled.body):
+            return False
+    return True
+
+
+def matches_keywords(post, keywords: Sequence[str], body_cache: Optional[Dict[str, str]] = None) -> bool:
+    return post_matches(post, compile_keywords(tuple(keywords)), body_cache)
@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + '}'
+
+
+class _Metric:
+    """Base for all metric types: a name, help text and children keyed by label values."""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], _Metric] = {}
+        self._is_child = False
+
+    def labels(self, *values) -> _Metric:
+        """Return the child for the given label values, creating it on first use."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            child = self._new_child()
+            child._is_child = True
+            self._children[key] = child
+        return child
+
+    def _new_child(self) -> _Metric:
+        return type(self)(self.name, self.documentation)
+
+    def _self_child(self) -> _Metric:
+        # Unlabelled metrics record into a single () child so rendering is uniform
+        if self._is_child:
+            return self
+        if self.labelnames:
+            raise ValueError(f"{self.name} is labelled, call labels() first")
+        return self.labels()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child._samples(self.labelnames, key))
+        return lines
+
+    def _samples(self, names: Sequence[str], values: Sequence[str]) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._self_child().value += amount
+
+    def _samples(self, names, values):
+        return [f"{self.name}{_format_labels(names, values)} {self.value}"]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self._self_child().value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._self_child().value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._self_child().value -= amount
+
+    def _samples(self, names, values):
+        return [f"{self.name}{_format_labels(names, values)} {self.value}"]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket plus +Inf; counts are per-bucket, made cumulative on render
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def _new_child(self) -> Histogram:
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        child = self._self_child()
+        child.counts[bisect.bisect_left(child.buckets, value)] += 1
+        child.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall time spent inside the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    @property
+    def count(self) -> int:
+        return sum(self._self_child().counts)
+
+    def _samples(self, names, values):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f"{self.name}_bucket{_format_labels(names + ('le',), tuple(values) + (le,))} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(names, values)} {self.sum}")
+        lines.append(f"{self.name}_count{_format_labels(names, values)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# Monitor cycle
+CYCLE_DURATION = REGISTRY.histogram(
+    'reddit_monitor_cycle_duration_seconds', "Duration of a full monitor cycle.")
+FETCH_LATENCY = REGISTRY.histogram(
+    'reddit_monitor_fetch_seconds', "Latency of fetching one subreddit listing.", ['subreddit'])
+POSTS_FETCHED = REGISTRY.counter(
+    'reddit_monitor_posts_fetched_total', "Posts fetched from Reddit listings.", ['subreddit'])
+LISTING_LIMIT = REGISTRY.histogram(
+    'reddit_monitor_listing_limit', "Posts requested by each subreddit fetch, sized from its arrival rate.",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000))
+LISTING_TRUNCATIONS = REGISTRY.counter(
+    'reddit_monitor_listing_truncations_total', "Extra pages fetched because a listing ended above the watermark.",
+    ['subreddit'])
+COMMENT_FETCH_LATENCY = REGISTRY.histogram(
+    'reddit_monitor_comment_fetch_seconds', "Latency of fetching one combined comment listing.")
+COMMENTS_FETCHED = REGISTRY.counter(
+    'reddit_monitor_comments_fetched_total', "New comments fetched from comment listings.", ['subreddit'])
+FETCH_ERRORS = REGISTRY.counter(
+    'reddit_monitor_fetch_errors_total', "Failed subreddit fetches.", ['subreddit'])
+MATCHES = REGISTRY.counter(
+    'reddit_monitor_matches_total', "Posts that matched an entry's keywords.")
+NOTIFICATIONS = REGISTRY.counter(
+    'reddit_monitor_notifications_total', "Discord notifications by outcome.", ['status'])
+OPEN_CIRCUITS = REGISTRY.gauge(
+    'reddit_monitor_open_circuits', "Subreddits whose circuit breaker is open or half-open.")
+FETCHES_SKIPPED = REGISTRY.counter(
+    'reddit_monitor_fetches_skipped_total', "Subreddit fetches skipped by an open circuit breaker.")
+CYCLE_OVERRUNS = REGISTRY.counter(
+    'reddit_monitor_cycle_overruns_total', "Cycles that ran past the next scheduled tick.")
+SUBREDDITS_DEFERRED = REGISTRY.counter(
+    'reddit_monitor_subreddits_deferred_total', "Subreddits carried over to the next cycle by the deadline.")
+QUEUE_DEPTH = REGISTRY.gauge(
+    'reddit_monitor_queue_depth', "Items waiting in each monitor queue.", ['queue'])
+STAGE_BUSY = REGISTRY.gauge(
+    'reddit_monitor_stage_busy', "Workers currently processing an item in each pipeline stage.", ['stage'])
+
+# Rate-limit budgets
+REDDIT_RATELIMIT_REMAINING = REGISTRY.gauge(
+    'reddit_ratelimit_remaining', "Requests left in the current Reddit rate-limit window.")
+REDDIT_RATELIMIT_USED = REGISTRY.gauge(
+    'reddit_ratelimit_used', "Requests used in the current Reddit rate-limit window.")
+REDDIT_RATELIMIT_RESET = REGISTRY.gauge(
+    'reddit_ratelimit_reset_timestamp', "Unix time at which the Reddit rate-limit window resets.")
+DISCORD_RATELIMITED = REGISTRY.counter(
+    'discord_ratelimited_total', "Times discord.py reported being rate limited.")
+
+# Event loop health
+LOOP_LAG = REGISTRY.histogram(
+    'event_loop_lag_seconds', "Delay between a scheduled loop wake-up and when it actually ran.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+LAST_CYCLE_AGE = REGISTRY.gauge(
+    'reddit_monitor_last_cycle_age_seconds', "Seconds since the last completed monitor cycle.")
+SLOW_CALLBACKS = REGISTRY.counter(
+    'event_loop_slow_callbacks_total', "Times the event loop was blocked past the slow-callback threshold.")
+
+# Database
+DB_QUERY_DURATION = REGISTRY.histogram(
+    'db_query_seconds', "Database statement execution time.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+FILTER_INDEX_LOADS = REGISTRY.counter(
+    'reddit_monitor_filter_index_loads_total',
+    "User filter listings loaded from the database for show_profile or autocomplete, i.e. cache misses.")
+
+
+def record_reddit_limits(reddit) -> None:
+    """Copy asyncpraw's rate-limit state into the Reddit budget gauges."""
+    limits = getattr(getattr(reddit, 'auth', None), 'limits', None)
+    if not limits:
+        return
+    if limits.get('remaining') is not None:
+        REDDIT_RATELIMIT_REMAINING.set(limits['remaining'])
+    if limits.get('used') is not None:
+        REDDIT_RATELIMIT_USED.set(limits['used'])
+    if limits.get('reset_timestamp') is not None:
+        REDDIT_RATELIMIT_RESET.set(limits['reset_timestamp'])
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement run through a (sync or async) SQLAlchemy engine."""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, 'sync_engine', engine)
+
+    # A connection runs one statement at a time, so one start time per
+    # connection is enough; a statement that raises never reaches
+    # after_cursor_execute and its start is simply overwritten by the next
+    @event.listens_for(sync_engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info['query_start'] = time.perf_counter()
+
+    @event.listens_for(sync_engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('query_start', None)
+        if started is not None:
+            DB_QUERY_DURATION.observe(time.perf_counter() - started)
+
+
+class DiscordRateLimitCounter(logging.Handler):
+    """
+    Counts discord.py's rate-limit warnings.
+
+    discord.py waits out 429s internally and only logs them, so the log stream
+    is the cheapest place to observe how often we hit Discord's limits.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if 'rate limit' in record.getMessage().lower():
+            DISCORD_RATELIMITED.inc()
+
+
+def install_discord_ratelimit_counter() -> None:
+    logging.getLogger('discord.http').addHandler(DiscordRateLimitCounter(logging.WARNING))
+
+
+class MetricsServer:
+    """
+    Small aiohttp server exposing the registry at /metrics.
+
+    When given a watchdog it also serves /healthz (liveness) and /readyz
+    (readiness), answering 200 or 503 from the watchdog's status.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry = REGISTRY,
+        host: str = '0.0.0.0',
+        port: int = 9100,
+        watchdog=None
+    ):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.watchdog = watchdog
+        self.app = web.Application()
+        self.app.router.add_get('/metrics', self._metrics)
+        if watchdog is not None:
+            self.app.router.add_get('/healthz', self._healthz)
+            self.app.router.add_get('/readyz', self._readyz)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.registry.render(), content_type='text/plain', charset='utf-8')
+
+    async def _healthz(self, request: web.Request) -> web.Response:
+        status = self.watchdog.status()
+        return web.json_response(status, status=200 if status['live'] else 503)
+
+    async def _readyz(self, request: web.Request) -> web.Response:
+        status = self.watchdog.status()
+        return web.json_response(status, status=200 if status['ready'] else 503)
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info("Metrics server listening on %s:%s", self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
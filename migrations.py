@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection
+
+from filter_io import MAX_KEYWORD_LENGTH
+from matching import normalize_keywords
+from models import EntryFilter, EntryKeyword
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_entry_keywords(conn: Connection, batch_size: int = 1000) -> int:
+    """
+    Fill entry_keywords from the comma separated entry_filters.keywords column.
+
+    Runs inside App.ensure_schema's transaction right after the table is
+    created, reading entries in id order ``batch_size`` at a time so memory
+    stays flat on large tables. Keywords longer than the keyword column,
+    which the old column allowed, are cut to fit (strict MySQL would reject
+    the insert) and the affected entries logged.
+
+    Returns:
+        Number of entries backfilled
+    """
+    last_id = 0
+    entries = 0
+    while True:
+        rows = conn.execute(
+            select(EntryFilter.id, EntryFilter.keywords)
+            .where(EntryFilter.id > last_id)
+            .order_by(EntryFilter.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        keyword_rows = []
+        for entry_id, keywords in rows:
+            pairs = normalize_keywords(k.strip() for k in keywords.split(',') if k.strip())
+            if any(len(keyword) > MAX_KEYWORD_LENGTH for _, keyword in pairs):
+                logger.warning("Entry %d has keywords over %d characters, truncating them",
+                               entry_id, MAX_KEYWORD_LENGTH)
+                # Two long keywords may share a prefix; uix_entry_keyword allows it once
+                pairs = list(dict.fromkeys((field, keyword[:MAX_KEYWORD_LENGTH]) for field, keyword in pairs))
+            keyword_rows.extend(
+                {'entry_filter_id': entry_id, 'field': field, 'keyword': keyword} for field, keyword in pairs
+            )
+        if keyword_rows:
+            conn.execute(insert(EntryKeyword), keyword_rows)
+        entries += len(rows)
+        last_id = rows[-1].id
+    logger.info("Backfilled entry_keywords for %d entries", entries)
+    return entries
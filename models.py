@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship, declarative_base, Mapped, mapped_column
 
+from matching import CompiledKeywords, compile_keywords, compile_pairs, normalize_keywords
+
 Base = declarative_base()
 
 class UserSubreddit(Base):
@@ -75,6 +77,35 @@ class EntryFilter(Base):
         back_populates="entries",
         lazy="selectin"  # Changed from default lazy loading
     )
+    channel = relationship(
+        "EntryChannel",
+        back_populates="entry",
+        uselist=False,
+        lazy="selectin",
+        cascade="all, delete-orphan"
+    )
+
+    # Set when the entry matches the subreddit's comments instead of its posts
+    comment_target = relationship(
+        "EntryCommentTarget",
+        back_populates="entry",
+        uselist=False,
+        lazy="selectin",
+        cascade="all, delete-orphan"
+    )
+
+    # Normalized copy of ``keywords``, what the matcher reads. Only loaded when
+    # asked for (add_filter, which rewrites them); the match stage reads the
+    # table directly and everything else uses ``keywords``. Deletes don't load
+    # them either, so whoever deletes an entry deletes its rows.
+    keyword_rows = relationship(
+        "EntryKeyword",
+        back_populates="entry",
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="EntryKeyword.id"
+    )
 
     def __repr__(self) -> str:
         return f"EntryFilter(id={self.id}, entry_name={self.entry_name})"
@@ -83,3 +114,83 @@ class EntryFilter(Base):
     def keyword_list(self) -> List[str]:
         """Returns the keywords as a list of strings."""
         return [k.strip() for k in self.keywords.split(',') if k.strip()]
+
+    def set_keywords(self, keywords: Sequence[str]) -> None:
+        """Store the keywords as typed and bring keyword_rows in line with them."""
+        self.keywords = ','.join(keywords)
+        pairs = normalize_keywords(self.keyword_list)
+        wanted = set(pairs)
+        # Unchanged rows are kept rather than deleted and re-inserted, which
+        # would trip uix_entry_keyword since the ORM inserts before it deletes
+        kept = [row for row in self.keyword_rows if (row.field, row.keyword) in wanted]
+        have = {(row.field, row.keyword) for row in kept}
+        self.keyword_rows = kept + [
+            EntryKeyword(field=field, keyword=keyword) for field, keyword in pairs if (field, keyword) not in have
+        ]
+
+    @property
+    def compiled_keywords(self) -> CompiledKeywords:
+        """
+        Keywords grouped by post field, from keyword_rows if they were loaded.
+
+        Otherwise the keywords column is compiled instead, giving the same
+        result without a lazy load (which an async session can't do).
+        """
+        rows = self.__dict__.get('keyword_rows')
+        if rows:
+            return compile_pairs(tuple((row.field, row.keyword) for row in rows))
+        return compile_keywords(tuple(self.keyword_list))
+
+
+class EntryKeyword(Base):
+    """One keyword of an entry, normalized: the post field it targets and its lower-cased value."""
+    __tablename__ = 'entry_keywords'
+    __table_args__ = (
+        UniqueConstraint('entry_filter_id', 'field', 'keyword', name='uix_entry_keyword'),
+        # "Which entries use keyword X"; join through entry_filters for the subreddit
+        Index('ix_entry_keywords_keyword', 'keyword', 'field'),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    entry_filter_id: Mapped[int] = mapped_column(ForeignKey('entry_filters.id'), nullable=False, index=True)
+    # One of matching.FIELDS
+    field: Mapped[str] = mapped_column(String(16), nullable=False)
+    keyword: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    entry = relationship("EntryFilter", back_populates="keyword_rows")
+
+    def __repr__(self) -> str:
+        return f"EntryKeyword(entry_filter_id={self.entry_filter_id}, field={self.field}, keyword={self.keyword})"
+
+
+class EntryChannel(Base):
+    """Binds a filter to a guild channel, so its matches are posted there instead of sent as DMs."""
+    __tablename__ = 'entry_channels'
+
+    entry_filter_id: Mapped[int] = mapped_column(ForeignKey('entry_filters.id'), primary_key=True)
+    channel_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    # Mentioned instead of the filter's owner when set
+    role_id: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+
+    entry = relationship("EntryFilter", back_populates="channel")
+
+    def __repr__(self) -> str:
+        return f"EntryChannel(entry_filter_id={self.entry_filter_id}, channel_id={self.channel_id})"
+
+
+class EntryCommentTarget(Base):
+    """Points a filter at comments: every comment in its subreddit, or only those in ``thread_ids``."""
+    __tablename__ = 'entry_comment_targets'
+
+    entry_filter_id: Mapped[int] = mapped_column(ForeignKey('entry_filters.id'), primary_key=True)
+    # Comma separated submission ids (base36, without t3_); empty for the whole subreddit
+    thread_ids: Mapped[str] = mapped_column(String(255), nullable=False, default='')
+
+    entry = relationship("EntryFilter", back_populates="comment_target")
+
+    def __repr__(self) -> str:
+        return f"EntryCommentTarget(entry_filter_id={self.entry_filter_id}, thread_ids={self.thread_ids})"
+
+    @property
+    def thread_list(self) -> List[str]:
+        return [t for t in self.thread_ids.split(',') if t]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+# Reddit returns at most 100 posts per listing request and pages through at
+# most 1000 posts of a listing
+PAGE_SIZE = 100
+LISTING_CAP = 1000
+
+
+class ArrivalRate:
+    """What a subreddit's earlier polls revealed about how fast posts arrive."""
+
+    __slots__ = ('rate', 'last_poll', 'newest')
+
+    def __init__(self):
+        # Smoothed posts per second, None until the first poll
+        self.rate: Optional[float] = None
+        self.last_poll = 0.0
+        # created_utc of the newest post seen, the subreddit's fetch watermark
+        self.newest: Optional[float] = None
+
+
+class ListingSizer:
+    """
+    Per-subreddit /new listing sizes from observed post arrival rates.
+
+    A subreddit's next fetch asks for the posts expected since its last poll,
+    ``rate * elapsed * headroom``, clamped to [min_posts, max_posts]. Its
+    first poll asks for ``max_posts``. Busy subreddits get bigger pages as
+    their rate climbs, quiet ones drop to ``min_posts`` instead of
+    re-downloading the same stale posts every cycle.
+
+    The rate is an exponentially weighted average of the posts newer than the
+    watermark per second between polls, or of the listing's own spacing on
+    the first poll.
+    """
+
+    def __init__(
+        self,
+        min_posts: int,
+        max_posts: int,
+        headroom: float = 1.5,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.time
+    ):
+        if not 0 < min_posts <= max_posts:
+            raise ValueError(f"need 0 < min_posts <= max_posts, got {min_posts} and {max_posts}")
+        self.min_posts = min_posts
+        self.max_posts = max_posts
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.clock = clock
+        self._rates: Dict[str, ArrivalRate] = {}
+
+    def get(self, subreddit: str) -> Optional[ArrivalRate]:
+        return self._rates.get(subreddit.lower())
+
+    def limit(self, subreddit: str) -> int:
+        """Posts to request from the subreddit's listing now."""
+        state = self._rates.get(subreddit.lower())
+        if state is None or state.rate is None:
+            return self.max_posts
+        expected = state.rate * max(self.clock() - state.last_poll, 0.0) * self.headroom
+        return min(max(math.ceil(expected), self.min_posts), self.max_posts)
+
+    def watermark(self, subreddit: str) -> Optional[float]:
+        state = self._rates.get(subreddit.lower())
+        return state.newest if state is not None else None
+
+    def is_truncated(self, subreddit: str, page: Sequence, requested: int, floor: Optional[float] = None) -> bool:
+        """
+        True if ``page`` (newest first) may have cut off posts newer than the
+        watermark: it came back full and even its oldest post is new.
+
+        ``floor`` is the oldest post time someone still needs, e.g. the
+        subreddit's oldest entry watermark; the check uses whichever of it and
+        the fetch watermark is older, so posts a failed delivery left behind
+        are paged back to as well.
+        """
+        watermark = self.watermark(subreddit)
+        if floor is not None:
+            watermark = floor if watermark is None else min(watermark, floor)
+        if watermark is None or not page or len(page) < requested:
+            return False
+        return page[-1].created_utc > watermark
+
+    def observe(self, subreddit: str, posts: Sequence) -> None:
+        """Update the subreddit's rate and watermark from a completed fetch."""
+        now = self.clock()
+        key = subreddit.lower()
+        state = self._rates.get(key)
+        if state is None:
+            state = self._rates[key] = ArrivalRate()
+
+        elapsed = now - state.last_poll
+        if state.rate is None:
+            state.rate = self._listing_rate(posts)
+        elif elapsed > 0:
+            fresh = len(posts) if state.newest is None else sum(1 for p in posts if p.created_utc > state.newest)
+            state.rate += self.smoothing * (fresh / elapsed - state.rate)
+        state.last_poll = now
+        if posts:
+            newest = max(post.created_utc for post in posts)
+            state.newest = newest if state.newest is None else max(state.newest, newest)
+
+    @staticmethod
+    def _listing_rate(posts: Sequence) -> float:
+        """Posts per second implied by the spacing of one listing."""
+        if len(posts) < 2:
+            return 0.0
+        times = [post.created_utc for post in posts]
+        span = max(times) - min(times)
+        return (len(posts) - 1) / span if span > 0 else 0.0
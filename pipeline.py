@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# A stage handler takes one item (or a list of items for batched stages) and
+# returns the items to pass downstream, or None for nothing.
+StageHandler = Callable[[Any], Awaitable[Optional[Iterable[Any]]]]
+
+
+class Stage:
+    """One step of a pipeline: a bounded input queue drained by ``concurrency`` workers."""
+
+    def __init__(
+        self,
+        name: str,
+        handler: StageHandler,
+        concurrency: int = 1,
+        queue_size: int = 0,
+        batch_size: int = 1
+    ):
+        """
+        Args:
+            name: Stage name, used for metrics and logs
+            handler: Coroutine function processing one item (or a batch)
+            concurrency: Number of workers draining the input queue
+            queue_size: Capacity of the input queue, defaults to twice the concurrency
+            batch_size: When above 1 the handler receives a list of up to this
+                many items already waiting in the queue
+        """
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(concurrency, 1)
+        self.queue_size = queue_size or self.concurrency * 2
+        self.batch_size = batch_size
+        self.queue: Optional[asyncio.Queue] = None
+        self._depth = metrics.QUEUE_DEPTH.labels(name)
+        self._busy = metrics.STAGE_BUSY.labels(name)
+        # This stage's share of the depth gauge
+        self._reported_depth = 0
+
+    def _report_depth(self) -> None:
+        """
+        Move the depth gauge by this queue's change only. Pipelines running
+        at once (a cycle and a targeted check) share the gauge's label, so
+        setting it outright would overwrite the other pipeline's share.
+        """
+        depth = self.queue.qsize() if self.queue is not None else 0
+        self._depth.inc(depth - self._reported_depth)
+        self._reported_depth = depth
+
+
+class Pipeline:
+    """
+    Chain of asyncio stages connected by bounded queues.
+
+    Each worker blocks on ``put`` when the next stage's queue is full, so a
+    slow stage (e.g. Discord delivery) pushes back on everything upstream
+    instead of letting work pile up in memory. Queue depth and busy workers
+    per stage are exported as the reddit_monitor_queue_depth and
+    reddit_monitor_stage_busy gauges, summed over the pipelines running.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+
+    async def run(
+        self,
+        items: Iterable[Any],
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> List[Any]:
+        """
+        Feed ``items`` through every stage and wait until all work has drained.
+
+        Args:
+            items: Inputs for the first stage
+            should_stop: Checked before feeding each item; once it returns True
+                no further items are fed
+
+        Returns:
+            The items that were not fed because ``should_stop`` fired
+        """
+        for stage in self.stages:
+            stage.queue = asyncio.Queue(maxsize=stage.queue_size)
+
+        workers = [
+            [asyncio.create_task(self._worker(index)) for _ in range(stage.concurrency)]
+            for index, stage in enumerate(self.stages)
+        ]
+        first = self.stages[0]
+        remaining = list(items)
+        try:
+            fed = 0
+            for item in remaining:
+                if should_stop is not None and should_stop():
+                    break
+                await first.queue.put(item)
+                first._report_depth()
+                fed += 1
+            unfed = remaining[fed:]
+
+            # Items only move forward, so draining the stages in order drains everything
+            for stage, stage_workers in zip(self.stages, workers):
+                await stage.queue.join()
+                for task in stage_workers:
+                    task.cancel()
+            return unfed
+        finally:
+            for stage_workers in workers:
+                for task in stage_workers:
+                    task.cancel()
+            await asyncio.gather(*(task for stage_workers in workers for task in stage_workers),
+                                 return_exceptions=True)
+            # Cancelled workers already gave back their busy count
+            for stage in self.stages:
+                stage.queue = None
+                stage._report_depth()
+
+    async def _worker(self, index: int) -> None:
+        stage = self.stages[index]
+        downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            batch = [await stage.queue.get()]
+            while len(batch) < stage.batch_size and not stage.queue.empty():
+                batch.append(stage.queue.get_nowait())
+            stage._report_depth()
+
+            stage._busy.inc()
+            try:
+                outputs = await stage.handler(batch if stage.batch_size > 1 else batch[0])
+                if outputs and downstream is not None:
+                    for output in outputs:
+                        await downstream.queue.put(output)
+                        downstream._report_depth()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Handlers deal with expected failures; never let one kill the worker
+                logger.exception("Unhandled error in pipeline stage %s: %s", stage.name, e)
+            finally:
+                stage._busy.dec()
+                for _ in batch:
+                    stage.queue.task_done()
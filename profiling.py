@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import ContextManager, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_NULL = nullcontext()
+# Stages open in the current task, innermost last: (name, start, time spent in nested stages).
+# A ContextVar keeps concurrent pipeline workers from seeing each other's nesting.
+_STAGE_STACK: ContextVar[tuple] = ContextVar('profiler_stage_stack', default=())
+
+
+class CycleProfiler:
+    """
+    Profiles the next N monitor cycles on demand.
+
+    While armed, each cycle runs under cProfile and the monitor's stage
+    annotations (fetch, match, notify, db) accumulate exclusive wall time, so
+    a nested stage is not double counted in its parent. Stages running in
+    concurrent workers add up, so they can exceed the cycle's wall time.
+    Each profiled cycle writes ``<stamp>.prof`` (load with pstats or snakeviz)
+    and ``<stamp>.json`` with the stage breakdown to ``output_dir``.
+
+    When not armed, ``cycle()`` and ``stage()`` return a shared nullcontext,
+    so the hooks cost one attribute check.
+    """
+
+    def __init__(self, output_dir: str = 'profiles', top: int = 25):
+        self.output_dir = output_dir
+        self.top = top
+        self.remaining = 0
+        self._profile: Optional[cProfile.Profile] = None
+        self._stages: Dict[str, float] = {}
+
+    def request(self, cycles: int) -> None:
+        """Arm the profiler for the next ``cycles`` monitor cycles."""
+        self.remaining = max(cycles, 0)
+        logger.info("Profiling armed for the next %d cycle(s)", self.remaining)
+
+    @property
+    def active(self) -> bool:
+        return self._profile is not None
+
+    def cycle(self) -> ContextManager[None]:
+        if not self.remaining:
+            return _NULL
+        return self._profile_cycle()
+
+    def stage(self, name: str) -> ContextManager[None]:
+        if self._profile is None:
+            return _NULL
+        return self._time_stage(name)
+
+    @contextmanager
+    def _profile_cycle(self) -> Iterator[None]:
+        self._stages = {}
+        self._profile = cProfile.Profile()
+        started = time.perf_counter()
+        self._profile.enable()
+        try:
+            yield
+        finally:
+            self._profile.disable()
+            duration = time.perf_counter() - started
+            profile, self._profile = self._profile, None
+            self.remaining -= 1
+            try:
+                self._write(profile, duration)
+            except OSError as e:
+                logger.error(f"Failed to write cycle profile: {e}")
+
+    @contextmanager
+    def _time_stage(self, name: str) -> Iterator[None]:
+        frame = [name, time.perf_counter(), 0.0]
+        token = _STAGE_STACK.set(_STAGE_STACK.get() + (frame,))
+        try:
+            yield
+        finally:
+            _STAGE_STACK.reset(token)
+            elapsed = time.perf_counter() - frame[1]
+            self._stages[name] = self._stages.get(name, 0.0) + elapsed - frame[2]
+            parents = _STAGE_STACK.get()
+            if parents:
+                parents[-1][2] += elapsed
+
+    def _write(self, profile: cProfile.Profile, duration: float) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('cycle-%Y%m%dT%H%M%S.%fZ')
+        base = os.path.join(self.output_dir, stamp)
+        profile.dump_stats(f"{base}.prof")
+
+        stats = pstats.Stats(profile)
+        top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top]
+        stages = {name: round(seconds, 6) for name, seconds in self._stages.items()}
+        stages['other'] = round(max(duration - sum(self._stages.values()), 0.0), 6)
+        summary = {
+            'cycle_seconds': round(duration, 6),
+            'stages': stages,
+            'top_cumulative': [
+                {'function': f"{path}:{line}({func})", 'calls': calls, 'cumtime': round(cumtime, 6)}
+                for (path, line, func), (_, calls, _, cumtime, _) in top
+            ],
+        }
+        with open(f"{base}.json", 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        logger.info(
+            "Profiled cycle in %.2fs %s -> %s.prof (%d more queued)",
+            duration, stages, base, self.remaining
+        )
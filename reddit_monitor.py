@@ -1,26 +1,157 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
+import time
 from datetime import datetime, timezone, timedelta  
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Sequence, Tuple
 
-import asyncpraw
-import asyncprawcore
 import discord
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy import select
+from sqlalchemy.orm import defer, selectinload
+from sqlalchemy import case, delete, func, insert, select, update
 
-from models import UserSubreddit, EntryFilter
-from exceptions import RedditMonitorError
+from models import UserSubreddit, EntryFilter, EntryChannel, EntryCommentTarget, EntryKeyword
+from exceptions import RedditMonitorError, SubredditUnavailableError
+from cache import SubredditCache
+from comment_stream import (
+    COMMENT_BATCH_SUBREDDITS, CommentCursors, CommentPost, comment_key, group_subreddits, thread_fullnames
+)
+from circuit_breaker import SubredditBreakers
+from page_sizing import LISTING_CAP, PAGE_SIZE, ListingSizer
+from events import FILTER_ADDED, FILTER_REMOVED, EventBus, FilterEvent
+from filter_index import AUTOCOMPLETE_LIMIT, FilterIndex, UserFilters, paginate_lines
+from filter_io import MAX_THREAD_IDS_LENGTH, SUBREDDIT_OK, FilterSpec
+from matching import CompiledKeywords, FuzzyIndex, compile_pairs, matches_keywords, normalize_keywords, post_matches
+import metrics
+from profiling import CycleProfiler
+from tracing import SPAN_KIND_CLIENT, Span, Tracer
+from pipeline import Pipeline, Stage
 
 logger = logging.getLogger(__name__)
 from typing import Callable, Awaitable
 
+if TYPE_CHECKING:
+    # asyncpraw is imported on first use, it accounts for a large share of startup time
+    import asyncpraw
+
 
 AsyncSessionFactory = Callable[[], Awaitable[AsyncSession]]
 
+DISCORD_MESSAGE_LIMIT = 2000
+# Reddit's title limit; longer headlines (comment bodies) are cut to it
+HEADLINE_LIMIT = 300
+CHANNEL_MENTIONS = discord.AllowedMentions(everyone=False, users=True, roles=True)
+# Delivery errors that retrying won't fix: missing permissions or closed DMs,
+# and deleted users or channels. Matches hit by them count as delivered.
+UNDELIVERABLE_ERRORS = (discord.Forbidden, discord.NotFound)
+
+
+@functools.lru_cache(maxsize=None)
+def _unavailable_errors() -> Dict[type, str]:
+    """Errors meaning a subreddit can't be read at all, as opposed to a transient failure."""
+    import asyncprawcore
+
+    return {
+        asyncprawcore.Forbidden: 'private',
+        asyncprawcore.NotFound: 'banned',
+        asyncprawcore.UnavailableForLegalReasons: 'banned',
+        asyncprawcore.Redirect: 'not_found',
+    }
+
+
+class _NoLock:
+    """Stands in for the database lock where reads don't need serializing."""
+
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _CycleStats:
+    """Counters for one monitor cycle, logged as a summary when it ends."""
+
+    def __init__(self):
+        self.posts_fetched = 0
+        self.comments_fetched = 0
+        self.entries_updated = 0
+        self.matches = 0
+        self.errors = 0
+        self.deferred: List[str] = []
+        self.skipped = 0
+        # (subreddit, reason) for breakers opened this cycle by a permanent failure
+        self.unavailable: List[tuple] = []
+
+
+class _CommentGroup:
+    """Subreddits whose new comments are fetched together in one combined listing."""
+
+    __slots__ = ('subreddits',)
+
+    def __init__(self, subreddits: Sequence[str]):
+        self.subreddits = list(subreddits)
+
+
+class _SubredditBatch:
+    """One subreddit's fetched posts (or comments) as they move through the cycle pipeline."""
+
+    __slots__ = ('subreddit', 'posts', 'post_times', 'latest', 'spans', 'outstanding', 'comments')
+
+    def __init__(self, subreddit: str, posts: list, post_times: List[datetime], spans: Dict[str, Span],
+                 comments: bool = False):
+        self.subreddit = subreddit
+        self.posts = posts
+        # CommentPosts for the subreddit's comment filters rather than submissions
+        self.comments = comments
+        self.post_times = post_times
+        self.latest = max(post_times)
+        self.spans = spans
+        # Entry jobs still in flight; traces close when this reaches zero
+        self.outstanding = 0
+
+
+class _EntryJob:
+    """An entry's share of a subreddit batch: the posts it matched and the watermark to commit."""
+
+    __slots__ = ('batch', 'user_sub', 'entry', 'compiled', 'fuzzy_index', 'cutoff', 'matched', 'match_count')
+
+    def __init__(self, batch: _SubredditBatch, user_sub: UserSubreddit, entry: EntryFilter,
+                 compiled: CompiledKeywords, fuzzy_index: FuzzyIndex, cutoff: datetime, matched: list):
+        self.batch = batch
+        self.user_sub = user_sub
+        self.entry = entry
+        # From the entry's keyword rows; its keywords column isn't loaded
+        self.compiled = compiled
+        # The batch's index, which already holds each post's fuzzy hits
+        self.fuzzy_index = fuzzy_index
+        self.cutoff = cutoff
+        self.matched = matched
+        self.match_count = 0
+
+
+class _ChannelJob:
+    """All entries bound to one channel that matched posts in a subreddit batch, delivered together."""
+
+    __slots__ = ('batch', 'channel_id', 'jobs', 'mentions')
+
+    def __init__(self, batch: _SubredditBatch, channel_id: str):
+        self.batch = batch
+        self.channel_id = channel_id
+        self.jobs: List[_EntryJob] = []
+        # post fullname -> (post, mentions), so a post matched by many entries is sent once
+        self.mentions: Dict[str, tuple] = {}
+
+    def add(self, job: _EntryJob) -> None:
+        self.jobs.append(job)
+        binding = job.entry.channel
+        mention = f"<@&{binding.role_id}>" if binding.role_id else f"<@{job.user_sub.user_id}>"
+        for post in job.matched:
+            self.mentions.setdefault(post.name, (post, {}))[1][mention] = None
+
+
 class RedditMonitor:
     """Monitors Reddit subreddits for matching posts based on user filters."""
     
@@ -30,20 +161,82 @@ class RedditMonitor:
         client_secret: str,
         user_agent: str,
         session_factory: AsyncSessionFactory,
-        max_posts: int = 50
+        max_posts: int = 50,
+        min_posts: Optional[int] = None,
+        reddit_kwargs: Optional[Dict[str, Any]] = None,
+        tracer: Optional[Tracer] = None,
+        fetch_concurrency: int = 4,
+        notify_concurrency: int = 4,
+        commit_batch_size: int = 50,
+        event_bus: Optional[EventBus] = None,
+        new_filter_backfill: float = 3600.0,
+        event_debounce: float = 1.0,
+        concurrent_reads: bool = False,
+        comment_batch_size: int = COMMENT_BATCH_SUBREDDITS
     ):
         self.client_id = client_id
         self.client_secret = client_secret
         self.user_agent = user_agent
         self.session_factory = session_factory
         self.max_posts = max_posts
+        # Listing size per subreddit between min_posts and max_posts, from its
+        # arrival rate; min_posts=None keeps every fetch at max_posts
+        self.listing_sizer = ListingSizer(min_posts or max_posts, max_posts)
+        # Extra asyncpraw.Reddit settings, e.g. oauth_url/reddit_url for a local fake server
+        self.reddit_kwargs = reddit_kwargs or {}
+        # time.monotonic() of the last cycle that ran to completion, read by the health watchdog
+        self.last_cycle_completed_at: Optional[float] = None
+        # On-demand profiler for slow cycles, idle unless armed via request()
+        self.profiler = CycleProfiler()
+        # Per-post tracing, disabled unless given a tracer with an exporter and sample ratio
+        self.tracer = tracer or Tracer()
+        # Root spans of sampled posts in flight, keyed by fullname
+        self._post_spans: Dict[str, Span] = {}
+        # Oldest post time (epoch seconds) some post entry of each subreddit still
+        # needs, from _plan_fetches; the listing pages back to it, since the
+        # sizer's own watermark moves at fetch time, before delivery succeeds
+        self._entry_floors: Dict[str, float] = {}
+        # Subreddits a cycle ran out of budget for, checked first on the next tick
+        self._carryover: List[str] = []
+        # Cycle pipeline settings: concurrent listing fetches, concurrent deliveries
+        # and how many watermark updates share one commit
+        self.fetch_concurrency = fetch_concurrency
+        self.notify_concurrency = notify_concurrency
+        self.commit_batch_size = commit_batch_size
+        # Subreddits per combined comment listing, and where each subreddit's last one ended
+        self.comment_batch_size = comment_batch_size
+        self.comment_cursors = CommentCursors()
+        # Per-subreddit circuit breakers so dead subreddits stop costing quota every cycle
+        self.breakers = SubredditBreakers()
+        # subreddit_status() results, positive and negative
+        self.subreddit_status_cache = SubredditCache(timeout=3600, max_size=10_000)
+        # Filter changes published by add_filter/remove_filter; monitor_loop
+        # answers new filters with a targeted check instead of waiting for the next tick
+        self.events = event_bus or EventBus()
+        # Users' filter names and rendered profiles, for show_profile and autocomplete
+        self.filter_index = FilterIndex()
+        # Seconds of history a never-checked entry matches against, instead of the whole listing
+        self.new_filter_backfill = new_filter_backfill
+        # Pause after the first event so a burst of commands shares one check
+        self.event_debounce = event_debounce
+        # Serializes database writes across regular cycles and targeted checks, so
+        # there is a single writer even on SQLite. Reads take it too unless the
+        # backend serves concurrent readers (MySQL, SQLite in WAL mode); an
+        # in-memory SQLite database shares one connection and cannot.
+        self._db_lock = asyncio.Lock()
+        self._read_lock = _NoLock() if concurrent_reads else self._db_lock
+        # Entry ids with a job in some pipeline, so overlapping runs never deliver twice
+        self._claimed_entries: set = set()
         
     async def initialize_reddit(self) -> asyncpraw.Reddit:
         """Initialize Reddit API client."""
+        import asyncpraw
+
         return asyncpraw.Reddit(
             client_id=self.client_id,
             client_secret=self.client_secret,
-            user_agent=self.user_agent
+            user_agent=self.user_agent,
+            **self.reddit_kwargs
         )
 
     async def add_filter(
@@ -52,10 +245,25 @@ class RedditMonitor:
         discord_name: str, 
         subreddit: str, 
         entry_name: str, 
-        keywords: List[str]
+        keywords: List[str],
+        channel_id: Optional[str] = None,
+        role_id: Optional[str] = None,
+        comment_threads: Optional[Sequence[str]] = None
     ) -> str:
-        """Add or update a filter for a user."""
-        async with self.session_factory() as session:
+        """
+        Add or update a filter for a user.
+
+        With ``channel_id`` the filter's matches are posted to that channel,
+        mentioning ``role_id`` if given or else the user, instead of DMed.
+        With ``comment_threads`` the filter matches comments instead of posts:
+        an empty list for every comment in the subreddit, or submission ids
+        to watch only those threads.
+        """
+        if comment_threads and len(','.join(comment_threads)) > MAX_THREAD_IDS_LENGTH:
+            raise RedditMonitorError(
+                f"Failed to add filter: thread ids take more than {MAX_THREAD_IDS_LENGTH} characters"
+            )
+        async with self._db_lock, self.session_factory() as session:
             async with session.begin():  # Proper transaction management
                 try:
                     user_sub = await self._get_or_create_user_subreddit(
@@ -63,21 +271,29 @@ class RedditMonitor:
                     )
                     
                     entry = await self._get_or_create_entry_filter(
-                        session, user_sub.id, entry_name, keywords
+                        session, user_sub.id, entry_name, keywords, channel_id, role_id, comment_threads
                     )
                     
-                    return (f"Filter '{entry_name}' added/updated for subreddit '{subreddit}' "
-                           f"with keywords: {', '.join(entry.keyword_list)}")
+                    response = (f"Filter '{entry_name}' added/updated for subreddit '{subreddit}' "
+                                f"with keywords: {', '.join(entry.keyword_list)}")
+                    if comment_threads:
+                        response += f" (comments in threads {', '.join(comment_threads)})"
+                    elif comment_threads is not None:
+                        response += " (comments)"
                     
                 except Exception as e:
                     logger.error(f"Error adding filter: {e}")
                     await session.rollback()
                     raise RedditMonitorError(f"Failed to add filter: {str(e)}")
+
+        # Published after the commit so the monitor can already see the entry
+        self._publish(FilterEvent(FILTER_ADDED, user_id, subreddit, entry_name))
+        return response
                 
-                
+
     async def remove_filter(self, user_id: str, subreddit: str, entry_name: str) -> str:
         """Remove a filter for a user."""
-        async with self.session_factory() as session:
+        async with self._db_lock, self.session_factory() as session:
             async with session.begin():
                 try:
                     # Load UserSubreddit with entries eagerly
@@ -100,6 +316,8 @@ class RedditMonitor:
                     if not entry:
                         return f"Filter '{entry_name}' not found"
 
+                    # keyword_rows aren't loaded, so the ORM cascade doesn't reach them
+                    await session.execute(delete(EntryKeyword).where(EntryKeyword.entry_filter_id == entry.id))
                     # Case 1: Delete the entire UserSubreddit if it has only this entry
                     if len(user_sub.entries) == 1:
                         await session.delete(user_sub)  # This will cascade delete the entry
@@ -107,110 +325,548 @@ class RedditMonitor:
                         # Case 2: Delete only the entry
                         await session.delete(entry)
 
-                    return f"Filter '{entry_name}' removed from subreddit '{subreddit}'"
-
                 except Exception as e:
                     await session.rollback()
                     raise RedditMonitorError(f"Failed to remove filter: {str(e)}")
 
+        self._publish(FilterEvent(FILTER_REMOVED, user_id, subreddit, entry_name))
+        return f"Filter '{entry_name}' removed from subreddit '{subreddit}'"
+
+    async def import_filters(self, user_id: str, discord_name: str, specs: List[FilterSpec]) -> int:
+        """
+        Add or update many filters for a user in one transaction.
+
+        Uses one upsert for the user's subreddits and one for their entries,
+        instead of the two lookups and a flush per filter that add_filter does.
+
+        Returns:
+            Number of filters imported
+        """
+        if not specs:
+            return 0
+        now = datetime.now(timezone.utc)
+        subreddits = list(dict.fromkeys(spec.subreddit for spec in specs))
+        async with self._db_lock, self.session_factory() as session:
+            async with session.begin():
+                try:
+                    dialect = (await session.connection()).dialect.name
+                    await session.execute(
+                        self._upsert(dialect, UserSubreddit.__table__, ['user_id', 'subreddit'],
+                                     ['discord_name', 'updated_at']),
+                        [
+                            {'user_id': user_id, 'discord_name': discord_name, 'subreddit': subreddit,
+                             'updated_at': now}
+                            for subreddit in subreddits
+                        ]
+                    )
+                    result = await session.execute(
+                        select(UserSubreddit.subreddit, UserSubreddit.id)
+                        .where(UserSubreddit.user_id == user_id, UserSubreddit.subreddit.in_(subreddits))
+                    )
+                    ids = dict(result.all())
+                    await session.execute(
+                        self._upsert(dialect, EntryFilter.__table__, ['user_subreddit_id', 'entry_name'],
+                                     ['keywords', 'updated_at']),
+                        [
+                            {'user_subreddit_id': ids[spec.subreddit], 'entry_name': spec.entry_name,
+                             'keywords': ','.join(spec.keywords), 'updated_at': now}
+                            for spec in specs
+                        ]
+                    )
+                    # Replace the imported entries' normalized keywords
+                    result = await session.execute(
+                        select(EntryFilter.id, EntryFilter.user_subreddit_id, EntryFilter.entry_name)
+                        .where(EntryFilter.user_subreddit_id.in_(ids.values()))
+                    )
+                    entry_ids = {(row.user_subreddit_id, row.entry_name): row.id for row in result}
+                    imported = [entry_ids[(ids[spec.subreddit], spec.entry_name)] for spec in specs]
+                    await session.execute(delete(EntryKeyword).where(EntryKeyword.entry_filter_id.in_(imported)))
+                    await session.execute(
+                        insert(EntryKeyword),
+                        [
+                            {'entry_filter_id': entry_id, 'field': field, 'keyword': keyword}
+                            for entry_id, spec in zip(imported, specs)
+                            for field, keyword in normalize_keywords(spec.keywords)
+                        ]
+                    )
+                    # And their comment targets and channel bindings, as add_filter would set them
+                    for model in (EntryCommentTarget, EntryChannel):
+                        await session.execute(delete(model).where(model.entry_filter_id.in_(imported)))
+                    targets = [
+                        {'entry_filter_id': entry_id, 'thread_ids': ','.join(spec.comment_threads)}
+                        for entry_id, spec in zip(imported, specs) if spec.comment_threads is not None
+                    ]
+                    if targets:
+                        await session.execute(insert(EntryCommentTarget), targets)
+                    channels = [
+                        {'entry_filter_id': entry_id, 'channel_id': spec.channel_id, 'role_id': spec.role_id}
+                        for entry_id, spec in zip(imported, specs) if spec.channel_id
+                    ]
+                    if channels:
+                        await session.execute(insert(EntryChannel), channels)
+                except Exception as e:
+                    logger.error(f"Error importing filters: {e}")
+                    await session.rollback()
+                    raise RedditMonitorError(f"Failed to import filters: {str(e)}")
+
+        for spec in specs:
+            self._publish(FilterEvent(FILTER_ADDED, user_id, spec.subreddit, spec.entry_name))
+        return len(specs)
+
+    async def export_filters(self, user_id: str) -> List[FilterSpec]:
+        """Return all of a user's filters, ready for filter_io.dump_filters."""
+        async with self.session_factory() as session:
+            stmt = (
+                select(UserSubreddit)
+                .options(selectinload(UserSubreddit.entries))
+                .filter_by(user_id=user_id)
+                .order_by(UserSubreddit.subreddit)
+            )
+            result = await session.execute(stmt)
+            return [
+                FilterSpec(
+                    user_sub.subreddit, entry.entry_name, entry.keyword_list,
+                    entry.comment_target.thread_list if entry.comment_target is not None else None,
+                    entry.channel.channel_id if entry.channel is not None else None,
+                    entry.channel.role_id if entry.channel is not None else None
+                )
+                for user_sub in result.scalars().all()
+                for entry in sorted(user_sub.entries, key=lambda e: e.entry_name)
+            ]
+
+    async def find_entries_with_keyword(
+        self,
+        keyword: str,
+        subreddit: Optional[str] = None
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Entries using a keyword, optionally limited to one subreddit.
+
+        ``keyword`` is normalized like a filter keyword, so "RTX" and
+        "flair:Selling" find entries with "rtx" and "flair:selling".
+
+        Returns:
+            (user_id, subreddit, entry_name) tuples
+        """
+        field, value = normalize_keywords([keyword.strip()])[0]
+        stmt = (
+            select(UserSubreddit.user_id, UserSubreddit.subreddit, EntryFilter.entry_name)
+            .join(EntryFilter, EntryFilter.user_subreddit_id == UserSubreddit.id)
+            .join(EntryKeyword, EntryKeyword.entry_filter_id == EntryFilter.id)
+            .where(EntryKeyword.keyword == value, EntryKeyword.field == field)
+            .order_by(UserSubreddit.subreddit, UserSubreddit.user_id, EntryFilter.entry_name)
+        )
+        if subreddit is not None:
+            stmt = stmt.where(UserSubreddit.subreddit == subreddit)
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            return [tuple(row) for row in result]
+
     async def get_user_profile(self, user_id: str) -> str:
         """Get user's profile showing all their filters."""
+        filters = await self._user_filters(user_id, rendered=True)
+        if not filters.lines:
+            return "No filters set up yet."
+        return "Your active filters:\n\n" + "\n".join(filters.lines)
+
+    async def get_profile_pages(self, user_id: str) -> List[str]:
+        """
+        The user's profile split into pages that each fit an embed, empty if
+        they have no filters. Rendered once and served from memory until
+        their filters change.
+        """
+        filters = await self._user_filters(user_id, rendered=True)
+        return paginate_lines(filters.lines)
+
+    async def complete_subreddits(self, user_id: str, prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[str]:
+        """The user's subreddits starting with ``prefix``, for autocomplete."""
+        filters = await self._user_filters(user_id)
+        return filters.subreddits.complete(prefix, limit)
+
+    async def complete_entries(
+        self,
+        user_id: str,
+        subreddit: str,
+        prefix: str,
+        limit: int = AUTOCOMPLETE_LIMIT
+    ) -> List[str]:
+        """The user's entry names in ``subreddit`` starting with ``prefix``, for autocomplete."""
+        filters = await self._user_filters(user_id)
+        names = filters.entries.get(subreddit)
+        return names.complete(prefix, limit) if names is not None else []
+
+    async def _user_filters(self, user_id: str, rendered: bool = False) -> UserFilters:
+        """
+        The user's filter listing from the index, loading it with one query
+        if it isn't there or, with ``rendered``, if its profile is stale.
+        """
+        filters = self.filter_index.get(user_id)
+        if filters is not None and (filters.lines is not None or not rendered):
+            return filters
+
+        metrics.FILTER_INDEX_LOADS.inc()
+        generation = self.filter_index.generation
         async with self.session_factory() as session:
             try:
-                # Add selectinload here too
-                stmt = select(UserSubreddit).options(
-                    selectinload(UserSubreddit.entries)
-                ).filter_by(user_id=user_id)
-                
+                stmt = (
+                    select(UserSubreddit)
+                    .options(selectinload(UserSubreddit.entries))
+                    .filter_by(user_id=user_id)
+                    .order_by(UserSubreddit.subreddit)
+                )
                 result = await session.execute(stmt)
                 user_subs = result.scalars().all()
-                
-                if not user_subs:
-                    return "No filters set up yet."
-                
-                profile = ["Your active filters:"]
-                for user_sub in user_subs:
-                    profile.append(f"\nSubreddit: r/{user_sub.subreddit}")
-                    # Now we can safely access entries since they're eager loaded
-                    for entry in user_sub.entries:
-                        keywords = entry.keyword_list
-                        profile.append(f"  - {entry.entry_name}: {', '.join(keywords)}")
-                
-                return "\n".join(profile)
-                
             except Exception as e:
                 logger.error(f"Error getting user profile: {e}")
                 raise RedditMonitorError(f"Failed to get profile: {str(e)}")
 
-    async def check_subreddit(self, reddit: asyncpraw.Reddit, subreddit_name: str) -> List[asyncpraw.models.Submission]:
-        """Fetch new posts from a subreddit."""    
+        lines = []
+        for user_sub in user_subs:
+            if lines:
+                lines.append("")
+            lines.append(f"Subreddit: r/{user_sub.subreddit}")
+            for entry in sorted(user_sub.entries, key=lambda e: e.entry_name):
+                target = entry.comment_target
+                if target is None:
+                    scope = ''
+                elif target.thread_ids:
+                    scope = f" (comments in threads {', '.join(target.thread_list)})"
+                else:
+                    scope = " (comments)"
+                lines.append(f"  - {entry.entry_name}: {', '.join(entry.keyword_list)}{scope}")
+
+        filters = UserFilters(
+            {user_sub.subreddit: [entry.entry_name for entry in user_sub.entries] for user_sub in user_subs},
+            lines
+        )
+        # A filter change committed while this query ran may be missing from
+        # it; the listing is still right for this call, just not kept
+        self.filter_index.store(user_id, filters, generation)
+        return filters
+
+    def _publish(self, event: FilterEvent) -> None:
+        """Announce a committed filter change to the index and to monitor_loop."""
+        self.filter_index.apply(event)
+        self.events.publish(event)
+
+    async def check_subreddit(
+        self,
+        reddit: asyncpraw.Reddit,
+        subreddit_name: str,
+        floor: Optional[float] = None
+    ) -> List[asyncpraw.models.Submission]:
+        """
+        Fetch new posts from a subreddit, as many as listing_sizer expects since
+        the last poll, paging further back while the listing is still newer
+        than the watermark or ``floor`` (the oldest post time an entry needs).
+        """
+        from asyncpraw.exceptions import RedditAPIException
+
         try:
             subreddit = await reddit.subreddit(subreddit_name)
             posts = []
             try:
-                async for post in subreddit.new(limit=self.max_posts):
-                    posts.append(post)
-            except asyncpraw.exceptions.RedditAPIException as e:
+                with metrics.FETCH_LATENCY.labels(subreddit_name).time():
+                    limit = self.listing_sizer.limit(subreddit_name)
+                    metrics.LISTING_LIMIT.observe(limit)
+                    async for post in subreddit.new(limit=limit):
+                        posts.append(post)
+                    page = posts
+                    # A full page that is all newer than the watermark may have
+                    # cut posts off, keep paging until it reaches seen posts.
+                    # Follow-up pages are full: a request costs the same at any size
+                    while (self.listing_sizer.is_truncated(subreddit_name, page, limit, floor)
+                           and len(posts) < LISTING_CAP):
+                        metrics.LISTING_TRUNCATIONS.labels(subreddit_name).inc()
+                        limit = min(PAGE_SIZE, LISTING_CAP - len(posts))
+                        page = [post async for post in subreddit.new(limit=limit, params={'after': posts[-1].name})]
+                        posts.extend(page)
+            except RedditAPIException as e:
                 # Check if the error is a rate limit
                 if "RATELIMIT" in str(e).upper():
-                    logger.warning(f"Rate limit hit for subreddit {subreddit_name}: {e}")
+                    logger.warning("Rate limit hit for subreddit %s: %s", subreddit_name, e)
                     await asyncio.sleep(60)  # Wait before retrying
                 else:
                     raise  # Re-raise non-rate-limit errors
 
-                
+            self.listing_sizer.observe(subreddit_name, posts)
+            metrics.POSTS_FETCHED.labels(subreddit_name).inc(len(posts))
             return posts
         except Exception as e:
-            logger.error(f"Error checking subreddit {subreddit_name}: {e}")
+            metrics.FETCH_ERRORS.labels(subreddit_name).inc()
+            logger.error("Error checking subreddit %s: %s", subreddit_name, e)
+            reason = self._unavailable_reason(e)
+            if reason:
+                raise SubredditUnavailableError(subreddit_name, reason) from e
             raise RedditMonitorError(f"Failed to fetch posts: {str(e)}")
 
+    async def check_comments(
+        self,
+        reddit: asyncpraw.Reddit,
+        subreddit_names: Sequence[str]
+    ) -> Dict[str, List[CommentPost]]:
+        """
+        Fetch the comments posted since the last call in several subreddits
+        with one combined /r/a+b+c/comments listing.
+
+        The listing is read newest first until it reaches the oldest cursor
+        of the group (a single page if none of them has been read before),
+        then split by subreddit and cut at each one's own cursor.
+
+        Returns:
+            New comments newest first, keyed by subreddit name
+        """
+        from asyncpraw.exceptions import RedditAPIException
+
+        try:
+            multireddit = await reddit.subreddit('+'.join(subreddit_names))
+            floor = self.comment_cursors.floor(subreddit_names)
+            comments = []
+            try:
+                with metrics.COMMENT_FETCH_LATENCY.time():
+                    async for comment in multireddit.comments(limit=PAGE_SIZE if floor is None else LISTING_CAP):
+                        if floor is not None and comment_key(comment.id) <= floor:
+                            break
+                        comments.append(CommentPost.from_comment(comment))
+            except RedditAPIException as e:
+                if "RATELIMIT" in str(e).upper():
+                    logger.warning("Rate limit hit for comments of %s: %s", '+'.join(subreddit_names), e)
+                    await asyncio.sleep(60)
+                else:
+                    raise
+
+            fresh = self.comment_cursors.advance(subreddit_names, comments)
+            for subreddit_name, items in fresh.items():
+                metrics.COMMENTS_FETCHED.labels(subreddit_name).inc(len(items))
+            return fresh
+        except Exception as e:
+            for subreddit_name in subreddit_names:
+                metrics.FETCH_ERRORS.labels(subreddit_name).inc()
+            logger.error("Error checking comments of %s: %s", '+'.join(subreddit_names), e)
+            reason = self._unavailable_reason(e)
+            if reason:
+                raise SubredditUnavailableError('+'.join(subreddit_names), reason) from e
+            raise RedditMonitorError(f"Failed to fetch comments: {str(e)}")
+
+    async def subreddit_status(self, subreddit_name: str) -> str:
+        """
+        Check whether a subreddit can be read, caching the answer for an hour.
+
+        Returns:
+            SUBREDDIT_OK, or 'private', 'banned' or 'not_found'. Transient
+            errors are not cached and report SUBREDDIT_OK, so they never
+            block adding a filter.
+        """
+        key = subreddit_name.lower()
+        status = self.subreddit_status_cache.get(key)
+        if status is not None:
+            return status
+        try:
+            reddit = await self.initialize_reddit()
+            async with reddit:
+                await reddit.subreddit(subreddit_name, fetch=True)
+            status = SUBREDDIT_OK
+        except Exception as e:
+            status = self._unavailable_reason(e)
+            if status is None:
+                logger.warning("Could not verify subreddit %s: %s", subreddit_name, e)
+                return SUBREDDIT_OK
+        self.subreddit_status_cache.set(key, status)
+        return status
+
+    @staticmethod
+    def _unavailable_reason(error: Exception) -> Optional[str]:
+        for error_type, reason in _unavailable_errors().items():
+            if isinstance(error, error_type):
+                return reason
+        return None
+
     async def process_matches(
         self, 
         discord_client: discord.Client,
         posts: List[asyncpraw.models.Submission],
         user_sub: UserSubreddit,
-        entry: EntryFilter
+        entry: EntryFilter,
+        compiled: Optional[CompiledKeywords] = None,
+        fuzzy_index: Optional[FuzzyIndex] = None
     ) -> int:
-        """Process matching posts and send notifications."""
+        """
+        Process matching posts and send notifications.
+
+        Posts are checked against ``compiled`` if given, else the entry's
+        keywords, and ``fuzzy_index`` if given, else one built for the entry.
+        """
         sent_count = 0
+        post_spans = self._post_spans
         try:
-            user = await discord_client.fetch_user(user_sub.user_id)
+            fetch_start = time.time_ns()
+            with self.profiler.stage('notify'):
+                user = await discord_client.fetch_user(user_sub.user_id)
+            fetch_end = time.time_ns()
             
+            if compiled is None:
+                compiled = entry.compiled_keywords
+            if fuzzy_index is None and compiled.fuzzy:
+                fuzzy_index = FuzzyIndex(compiled.fuzzy)
             for post in posts:
-                if self._post_matches_filter(post, entry.keyword_list):
-                    await self._send_notification(user, post)
+                span = post_spans.get(post.name) if post_spans else None
+                match_start = time.time_ns() if span else 0
+                if post_matches(post, compiled, fuzzy_index=fuzzy_index):
+                    metrics.MATCHES.inc()
+                    if span:
+                        self._trace_match(span, entry, match_start, fetch_start, fetch_end)
+                    send_start = time.time_ns() if span else 0
+                    with self.profiler.stage('notify'):
+                        await self._send_notification(user, post)
+                    if span:
+                        span.child(
+                            'discord.send', {'entry_id': entry.id, 'user_id': user_sub.user_id},
+                            start_ns=send_start, kind=SPAN_KIND_CLIENT
+                        ).end()
+                    metrics.NOTIFICATIONS.labels('sent').inc()
                     sent_count += 1
                     
             return sent_count
-            
+
+        except UNDELIVERABLE_ERRORS as e:
+            # Closed DMs or a deleted account won't heal by retrying, and a
+            # retry would hold the subreddit's listing floor back for good
+            metrics.NOTIFICATIONS.labels('undeliverable').inc()
+            logger.warning("User %s can't be messaged, dropping their matches: %s", user_sub.user_id, e)
+            return sent_count
+
         except discord.HTTPException as e:
-            logger.error(f"Discord error for user {user_sub.user_id}: {e}")
+            metrics.NOTIFICATIONS.labels('failed').inc()
+            logger.error("Discord error for user %s: %s", user_sub.user_id, e)
             raise RedditMonitorError(f"Failed to send notifications: {str(e)}")
 
+    async def process_channel_matches(self, discord_client: discord.Client, job: _ChannelJob) -> int:
+        """
+        Post each matched post once to the job's channel, mentioning every user
+        (or role) whose entries matched it.
+
+        Returns:
+            Number of messages sent
+        """
+        sent_count = 0
+        try:
+            channel = discord_client.get_channel(int(job.channel_id))
+            if channel is None:
+                with self.profiler.stage('notify'):
+                    channel = await discord_client.fetch_channel(int(job.channel_id))
+            metrics.MATCHES.inc(sum(len(entry_job.matched) for entry_job in job.jobs))
+
+            for post, mentions in job.mentions.values():
+                with self.profiler.stage('notify'):
+                    sent_count += await self._send_channel_notification(channel, post, list(mentions))
+            metrics.NOTIFICATIONS.labels('sent').inc(sent_count)
+            return sent_count
+
+        except UNDELIVERABLE_ERRORS as e:
+            metrics.NOTIFICATIONS.labels('sent').inc(sent_count)
+            metrics.NOTIFICATIONS.labels('undeliverable').inc()
+            logger.warning("Channel %s can't be posted to, dropping its matches: %s", job.channel_id, e)
+            return sent_count
+
+        except discord.HTTPException as e:
+            metrics.NOTIFICATIONS.labels('failed').inc()
+            logger.error("Discord error for channel %s: %s", job.channel_id, e)
+            raise RedditMonitorError(f"Failed to send channel notifications: {str(e)}")
+
     async def monitor_loop(
         self, 
         discord_client: discord.Client, 
-        interval: int
+        interval: int,
+        budget: Optional[float] = None
     ) -> None:
         """
-        Main monitoring loop that checks Reddit at specified intervals.
+        Main monitoring loop that checks Reddit at a fixed rate.
+
+        Cycles start every ``interval`` seconds regardless of how long the
+        previous one took. Each cycle gets a deadline ``budget`` seconds after
+        its tick; subreddits not reached by then are carried over and checked
+        first on the next tick. A cycle that runs past the next tick is
+        counted as an overrun and the missed ticks are skipped. Between ticks,
+        subreddits with newly added filters get a targeted check within
+        ``event_debounce`` seconds.
         
         Args:
             discord_client: Discord bot client
-            interval: Time in seconds between Reddit checks
+            interval: Time in seconds between cycle starts
+            budget: Seconds a cycle may spend starting new subreddits,
+                defaults to 90% of the interval
         """
+        budget = budget if budget is not None else interval * 0.9
+        next_tick = time.monotonic()
+        events = self.events.subscribe()
+        consumer = asyncio.create_task(self._consume_filter_events(discord_client, events))
+        try:
+            while True:
+                try:
+                    # Properly await the coroutine first
+                    reddit = await self.initialize_reddit()
+                    # Then use the async context manager
+                    async with reddit:
+                        await self._process_all_filters(discord_client, reddit, deadline=next_tick + budget)
+                    self.last_cycle_completed_at = time.monotonic()
+                except Exception as e:
+                    logger.error("Error in monitor loop: %s", e)
+                finally:
+                    next_tick = self._next_tick(next_tick, interval)
+                    await asyncio.sleep(max(next_tick - time.monotonic(), 0))
+        finally:
+            consumer.cancel()
+            self.events.unsubscribe(events)
+
+    async def check_subreddits_now(self, discord_client: discord.Client, subreddits: List[str]) -> None:
+        """Run the cycle pipeline for just these subreddits, outside the regular schedule."""
+        started = time.perf_counter()
+        stats = _CycleStats()
+        post_subreddits, comment_groups = await self._plan_fetches(subreddits)
+        reddit = await self.initialize_reddit()
+        async with reddit:
+            await self._run_pipeline(discord_client, reddit, post_subreddits + comment_groups, stats)
+        logger.info(
+            "Targeted check of %s finished in %.2fs | Posts: %d | Comments: %d | Entries updated: %d | "
+            "Matches: %d | Errors: %d",
+            ', '.join(subreddits), time.perf_counter() - started, stats.posts_fetched, stats.comments_fetched,
+            stats.entries_updated, stats.matches, stats.errors
+        )
+
+    async def _consume_filter_events(self, discord_client: discord.Client, events: asyncio.Queue) -> None:
+        """Turn filter change events into targeted checks of the affected subreddits."""
         while True:
+            batch = [await events.get()]
+            await asyncio.sleep(self.event_debounce)
+            while not events.empty():
+                batch.append(events.get_nowait())
+
+            # Filters added and not removed again within the batch, in arrival order
+            added: Dict[tuple, str] = {}
+            for event in batch:
+                key = (event.user_id, event.subreddit, event.entry_name)
+                if event.kind == FILTER_ADDED:
+                    added[key] = event.subreddit
+                elif event.kind == FILTER_REMOVED:
+                    added.pop(key, None)
+            subreddits = list(dict.fromkeys(added.values()))
+            if not subreddits:
+                continue
             try:
-                # Properly await the coroutine first
-                reddit = await self.initialize_reddit()
-                # Then use the async context manager
-                async with reddit:
-                    await self._process_all_filters(discord_client, reddit)
+                await self.check_subreddits_now(discord_client, subreddits)
             except Exception as e:
-                logger.error(f"Error in monitor loop: {e}")
-            finally:
-                # Always wait the interval before next check
-                await asyncio.sleep(interval)
+                logger.error("Targeted check of %s failed: %s", ', '.join(subreddits), e)
+
+    def _next_tick(self, tick: float, interval: float) -> float:
+        """Advance to the next fixed-rate tick, skipping (and reporting) any the cycle overran."""
+        tick += interval
+        now = time.monotonic()
+        if now > tick:
+            missed = int((now - tick) // interval) + 1
+            metrics.CYCLE_OVERRUNS.inc()
+            logger.warning("Cycle overran its interval by %.1fs, skipping %d tick(s)", now - tick, missed)
+            tick += missed * interval
+        return tick
 
     # Private helper methods
     async def _get_or_create_user_subreddit(
@@ -236,16 +892,30 @@ class RedditMonitor:
             
         return user_sub
 
+    @staticmethod
+    def _upsert(dialect: str, table, conflict_columns: List[str], update_columns: List[str]):
+        """Build an INSERT that updates ``update_columns`` when the unique key already exists."""
+        from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+        if dialect == 'mysql':
+            stmt = mysql.insert(table)
+            return stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in update_columns})
+        if dialect in ('sqlite', 'postgresql'):
+            stmt = (sqlite if dialect == 'sqlite' else postgresql).insert(table)
+            return stmt.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={col: stmt.excluded[col] for col in update_columns}
+            )
+        raise RedditMonitorError(f"Bulk import is not supported on {dialect}")
+
     def _post_matches_filter(
         self, 
         post: asyncpraw.models.Submission,
-        keywords: List[str]
+        keywords: List[str],
+        body_cache: Optional[Dict[str, str]] = None
     ) -> bool:
-        """Check if a post matches the filter keywords."""
-        return all(
-            keyword.lower() in post.title.lower() 
-            for keyword in keywords
-        )
+        """Check if a post matches the filter keywords (see matching.compile_keywords for field prefixes)."""
+        return matches_keywords(post, keywords, body_cache)
 
     async def _send_notification(
         self,
@@ -254,7 +924,34 @@ class RedditMonitor:
     ) -> None:
         """Send a notification to a user about a matching post."""
         post_url = f"https://reddit.com{post.permalink}"
-        await user.send(f"Match found: {post.title}\n{post_url}")
+        await user.send(f"Match found: {self._headline(post)}\n{post_url}")
+
+    @staticmethod
+    def _headline(post) -> str:
+        """A post's title, or a comment's body cut to HEADLINE_LIMIT with the title of its thread."""
+        if not isinstance(post, CommentPost):
+            return post.title
+        body = post.title if len(post.title) <= HEADLINE_LIMIT else post.title[:HEADLINE_LIMIT - 1] + '…'
+        return f"{body} (comment in: {post.link_title[:HEADLINE_LIMIT]})"
+
+    async def _send_channel_notification(
+        self,
+        channel: discord.abc.Messageable,
+        post: asyncpraw.models.Submission,
+        mentions: List[str]
+    ) -> int:
+        """Send one post to a channel, splitting the mentions over messages that fit Discord's limit."""
+        content = f"Match found: {self._headline(post)}\nhttps://reddit.com{post.permalink}\n"
+        messages = 0
+        while mentions:
+            # Headlines are at most two HEADLINE_LIMITs long, so the first mention always fits
+            line = mentions.pop(0)
+            while mentions and len(content) + len(line) + len(mentions[0]) + 1 <= DISCORD_MESSAGE_LIMIT:
+                line += ' ' + mentions.pop(0)
+            await channel.send(content + line, allowed_mentions=CHANNEL_MENTIONS)
+            messages += 1
+            content = ''
+        return messages
     
 
     async def _get_or_create_entry_filter(
@@ -262,100 +959,605 @@ class RedditMonitor:
         session: AsyncSession,
         user_subreddit_id: int,
         entry_name: str,
-        keywords: List[str]
+        keywords: List[str],
+        channel_id: Optional[str] = None,
+        role_id: Optional[str] = None,
+        comment_threads: Optional[Sequence[str]] = None
     ) -> EntryFilter:
-        """Get or create an EntryFilter."""
-        stmt = select(EntryFilter).filter_by(
+        """
+        Get or create an EntryFilter, binding it to ``channel_id`` or back to
+        DMs, and to comments (``comment_threads``) or back to posts.
+        """
+        stmt = select(EntryFilter).options(selectinload(EntryFilter.keyword_rows)).filter_by(
             user_subreddit_id=user_subreddit_id,
             entry_name=entry_name
         )
         result = await session.execute(stmt)
         entry = result.scalar_one_or_none()
         
+        channel = EntryChannel(channel_id=channel_id, role_id=role_id) if channel_id else None
+        thread_ids = ','.join(comment_threads) if comment_threads is not None else None
         if not entry:
             entry = EntryFilter(
                 user_subreddit_id=user_subreddit_id,
                 entry_name=entry_name,
-                keywords=','.join(keywords)
+                channel=channel,
+                comment_target=EntryCommentTarget(thread_ids=thread_ids) if thread_ids is not None else None
             )
+            entry.set_keywords(keywords)
             session.add(entry)
             await session.flush()
         else:
-            entry.keywords = ','.join(keywords)
+            entry.set_keywords(keywords)
             entry.updated_at = datetime.now(timezone.utc)
+            if entry.channel is None or channel is None:
+                entry.channel = channel
+            else:
+                entry.channel.channel_id = channel_id
+                entry.channel.role_id = role_id
+            if thread_ids is None:
+                entry.comment_target = None
+            elif entry.comment_target is None:
+                entry.comment_target = EntryCommentTarget(thread_ids=thread_ids)
+            else:
+                entry.comment_target.thread_ids = thread_ids
         
         return entry
 
     async def _process_all_filters(
         self,
         discord_client: discord.Client,
-        reddit: asyncpraw.Reddit
+        reddit: asyncpraw.Reddit,
+        deadline: Optional[float] = None
     ) -> None:
-        """Process all filters and send notifications for matches."""
-        async with self.session_factory() as session:
-            stmt = select(UserSubreddit.subreddit).distinct()
-            result = await session.execute(stmt)
-            subreddits = [row[0] for row in result]
-            
-            for subreddit_name in subreddits:
-                try:
-                    posts = await self.check_subreddit(reddit, subreddit_name)
-                    if not posts:
-                        continue
-                    
-                    #get latest time of new subreddit posts datetime
-                    latest_post_time = max(
-                        self._get_post_datetime(post) 
-                        for post in posts
-                    )
+        """
+        Process all filters and send notifications for matches.
 
-                    stmt = (
-                        select(UserSubreddit)
-                        .options(selectinload(UserSubreddit.entries))
-                        .filter_by(subreddit=subreddit_name)
-                    )
+        Args:
+            discord_client: Discord bot client
+            reddit: Reddit API client
+            deadline: time.monotonic() after which no new subreddit is started;
+                the rest are carried over to the next cycle
+        """
+        with metrics.CYCLE_DURATION.time(), self.profiler.cycle():
+            await self._run_cycle(discord_client, reddit, deadline)
+
+    async def _run_cycle(
+        self,
+        discord_client: discord.Client,
+        reddit: asyncpraw.Reddit,
+        deadline: Optional[float] = None
+    ) -> None:
+        """
+        Run one cycle as a staged pipeline: fetch -> normalize -> match -> notify -> commit.
+
+        Stages are connected by bounded queues, so fetching the next subreddits
+        overlaps with delivering the previous ones, and a Discord backlog
+        pushes back on fetching instead of growing memory. All database access
+        goes through short-lived sessions; watermark writes are batched by the
+        commit stage and serialized by one lock.
+        """
+        started = time.perf_counter()
+        stats = _CycleStats()
+        post_subreddits, comment_groups = await self._plan_fetches()
+        subreddits = self._prioritize_carryover(post_subreddits)
+
+        past_deadline = (lambda: time.monotonic() >= deadline) if deadline is not None else None
+        unfed = await self._run_pipeline(discord_client, reddit, subreddits + comment_groups, stats, past_deadline)
+
+        # Comment groups cut off by the deadline need no carryover, their cursors pick up where they stopped
+        self._carryover = stats.deferred + [item for item in unfed if isinstance(item, str)]
+        if self._carryover:
+            metrics.SUBREDDITS_DEFERRED.inc(len(self._carryover))
+            logger.warning("Cycle deadline reached, carrying over %d subreddit(s)", len(self._carryover))
+
+        logger.info(
+            "Cycle finished in %.2fs | Subreddits: %d | Deferred: %d | Skipped: %d | Posts: %d | Comments: %d | "
+            "Entries updated: %d | Matches: %d | Errors: %d",
+            time.perf_counter() - started, len(subreddits), len(self._carryover), stats.skipped,
+            stats.posts_fetched, stats.comments_fetched, stats.entries_updated, stats.matches, stats.errors
+        )
+
+    async def _plan_fetches(self, only: Optional[List[str]] = None) -> Tuple[List[str], List[_CommentGroup]]:
+        """
+        Split the monitored subreddits (or just ``only``) into those whose
+        posts are fetched and groups whose comments are fetched together.
+
+        A subreddit is in the first list if it has a post filter (or no
+        filters at all) and in a comment group if it has a comment filter.
+        Post subreddits' oldest entry cutoffs go to ``_entry_floors``.
+        """
+        is_comment = EntryCommentTarget.entry_filter_id.is_not(None)
+        stmt = (
+            select(
+                UserSubreddit.subreddit,
+                is_comment,
+                func.min(EntryFilter.last_check_at),
+                func.min(case((EntryFilter.last_check_at.is_(None), EntryFilter.created_at))),
+                func.count(EntryFilter.id) - func.count(EntryFilter.last_check_at),
+            )
+            .outerjoin(EntryFilter, EntryFilter.user_subreddit_id == UserSubreddit.id)
+            .outerjoin(EntryCommentTarget, EntryCommentTarget.entry_filter_id == EntryFilter.id)
+            .group_by(UserSubreddit.subreddit, is_comment)
+        )
+        if only is not None:
+            stmt = stmt.where(UserSubreddit.subreddit.in_(only))
+        async with self._read_lock:
+            async with self.session_factory() as session:
+                with self.profiler.stage('db'):
+                    rows = (await session.execute(stmt)).all()
+        post_subreddits: Dict[str, None] = {}
+        comment_subreddits: Dict[str, None] = {}
+        for subreddit, comments, oldest_check, oldest_unchecked, unchecked in rows:
+            (comment_subreddits if comments else post_subreddits)[subreddit] = None
+            if comments:
+                continue
+            cutoffs = []
+            if oldest_check is not None:
+                cutoffs.append(oldest_check.replace(tzinfo=timezone.utc).timestamp())
+            if unchecked:
+                # Same bound as _entry_cutoff for an entry never checked
+                cutoffs.append(
+                    oldest_unchecked.replace(tzinfo=timezone.utc).timestamp() - self.new_filter_backfill
+                    if oldest_unchecked is not None else 0.0
+                )
+            if cutoffs:
+                # Never further back than a new filter's backfill, so an entry
+                # that is far behind (or stuck) can't make every poll page
+                # through the whole listing
+                self._entry_floors[subreddit] = max(min(cutoffs), time.time() - self.new_filter_backfill)
+            else:
+                self._entry_floors.pop(subreddit, None)
+        return list(post_subreddits), [
+            _CommentGroup(group) for group in group_subreddits(comment_subreddits, self.comment_batch_size)
+        ]
+
+    async def _run_pipeline(
+        self,
+        discord_client: discord.Client,
+        reddit: asyncpraw.Reddit,
+        subreddits: List[Any],
+        stats: _CycleStats,
+        past_deadline: Optional[Callable[[], bool]] = None
+    ) -> List[Any]:
+        """
+        Push subreddits (and _CommentGroups) through the cycle pipeline,
+        returning those not started before the deadline.
+        """
+        db_lock = self._db_lock
+        pipeline = Pipeline([
+            Stage('fetch', functools.partial(self._fetch_stage, reddit, stats, past_deadline),
+                  concurrency=self.fetch_concurrency),
+            Stage('normalize', self._normalize_stage),
+            Stage('match', functools.partial(self._match_stage, self._read_lock)),
+            Stage('notify', functools.partial(self._notify_stage, discord_client, stats),
+                  concurrency=self.notify_concurrency),
+            Stage('commit', functools.partial(self._commit_stage, db_lock, stats),
+                  queue_size=self.commit_batch_size * 2, batch_size=self.commit_batch_size),
+        ])
+        unfed = await pipeline.run(subreddits, should_stop=past_deadline)
+
+        for subreddit_name, reason in stats.unavailable:
+            await self._notify_subreddit_unavailable(discord_client, subreddit_name, reason)
+        return unfed
+
+    async def _notify_subreddit_unavailable(
+        self,
+        discord_client: discord.Client,
+        subreddit_name: str,
+        reason: str
+    ) -> None:
+        """DM everyone with a filter on a subreddit that just became unreadable."""
+        async with self._read_lock:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(UserSubreddit.user_id).filter_by(subreddit=subreddit_name).distinct()
+                )
+                user_ids = [row[0] for row in result]
+
+        for user_id in user_ids:
+            try:
+                user = await discord_client.fetch_user(user_id)
+                await user.send(
+                    f"r/{subreddit_name} looks {reason.replace('_', ' ')}, so your filters on it are paused. "
+                    f"I'll keep checking with increasing delays and resume automatically if it comes back."
+                )
+            except discord.HTTPException as e:
+                logger.warning("Could not tell user %s about r/%s: %s", user_id, subreddit_name, e)
+
+    async def _fetch_stage(
+        self,
+        reddit: asyncpraw.Reddit,
+        stats: _CycleStats,
+        past_deadline: Optional[Callable[[], bool]],
+        subreddit_name: Any
+    ) -> Optional[List[tuple]]:
+        """Fetch a subreddit's listing, or a comment group's combined listing."""
+        if isinstance(subreddit_name, _CommentGroup):
+            return await self._fetch_comments(reddit, stats, past_deadline, subreddit_name)
+        if past_deadline is not None and past_deadline():
+            # Queued before the deadline but not started in time
+            stats.deferred.append(subreddit_name)
+            return None
+        if not self.breakers.allow(subreddit_name):
+            stats.skipped += 1
+            metrics.FETCHES_SKIPPED.inc()
+            return None
+        try:
+            fetch_start = time.time_ns()
+            with self.profiler.stage('fetch'):
+                posts = await self.check_subreddit(reddit, subreddit_name, self._entry_floors.get(subreddit_name))
+            fetch_end = time.time_ns()
+        except RedditMonitorError as e:
+            self._record_fetch_error(stats, subreddit_name, e)
+            return None
+
+        self._record_fetch_success(subreddit_name)
+
+        metrics.record_reddit_limits(reddit)
+        stats.posts_fetched += len(posts)
+        if not posts:
+            return None
+        return [(subreddit_name, posts, fetch_start, fetch_end, False)]
+
+    async def _fetch_comments(
+        self,
+        reddit: asyncpraw.Reddit,
+        stats: _CycleStats,
+        past_deadline: Optional[Callable[[], bool]],
+        group: _CommentGroup
+    ) -> Optional[List[tuple]]:
+        """Fetch a comment group's new comments, one output per subreddit that has any."""
+        if past_deadline is not None and past_deadline():
+            return None
+        subreddits = [name for name in group.subreddits if self.breakers.allow(name)]
+        skipped = len(group.subreddits) - len(subreddits)
+        if skipped:
+            stats.skipped += skipped
+            metrics.FETCHES_SKIPPED.inc(skipped)
+        if not subreddits:
+            return None
+        return await self._fetch_comment_listing(reddit, stats, subreddits)
+
+    async def _fetch_comment_listing(
+        self,
+        reddit: asyncpraw.Reddit,
+        stats: _CycleStats,
+        subreddits: List[str]
+    ) -> Optional[List[tuple]]:
+        """
+        _fetch_comments past the breaker gate: ``subreddits`` have already
+        been allowed, which for a half-open breaker used up its one probe.
+        """
+        try:
+            fetch_start = time.time_ns()
+            with self.profiler.stage('fetch'):
+                fresh = await self.check_comments(reddit, subreddits)
+            fetch_end = time.time_ns()
+        except SubredditUnavailableError as e:
+            if len(subreddits) > 1:
+                # One private or banned subreddit fails the whole combined listing;
+                # fetching the group one by one pins the failure on it alone
+                logger.warning("Comments of %s failed together, retrying one by one: %s", '+'.join(subreddits), e)
+                outputs = []
+                for name in subreddits:
+                    outputs.extend(await self._fetch_comment_listing(reddit, stats, [name]) or [])
+                return outputs or None
+            self._record_fetch_error(stats, subreddits[0], e)
+            return None
+        except RedditMonitorError as e:
+            for name in subreddits:
+                self._record_fetch_error(stats, name, e)
+            return None
+
+        for name in subreddits:
+            self._record_fetch_success(name)
+        metrics.record_reddit_limits(reddit)
+        outputs = []
+        for name, comments in fresh.items():
+            stats.comments_fetched += len(comments)
+            if comments:
+                outputs.append((name, comments, fetch_start, fetch_end, True))
+        return outputs or None
+
+    def _record_fetch_success(self, subreddit_name: str) -> None:
+        """Close the subreddit's breaker and forget a private/banned status an earlier failure cached."""
+        self.breakers.record_success(subreddit_name)
+        key = subreddit_name.lower()
+        if self.subreddit_status_cache.get(key) not in (None, SUBREDDIT_OK):
+            self.subreddit_status_cache.delete(key)
+
+    def _record_fetch_error(self, stats: _CycleStats, subreddit_name: str, error: RedditMonitorError) -> None:
+        """Trip the subreddit's breaker: at once if it is unavailable, after repeats if transient."""
+        stats.errors += 1
+        if isinstance(error, SubredditUnavailableError):
+            self.subreddit_status_cache.set(subreddit_name.lower(), error.reason)
+            if self.breakers.record_failure(subreddit_name, str(error), permanent=True):
+                stats.unavailable.append((subreddit_name, error.reason))
+            logger.warning(
+                "Subreddit %s is %s, retrying in %.0fs",
+                subreddit_name, error.reason, self.breakers.get(subreddit_name).backoff
+            )
+        else:
+            self.breakers.record_failure(subreddit_name, str(error))
+            logger.error("Subreddit %s error: %s", subreddit_name, error)
+
+    async def _normalize_stage(self, fetched: tuple) -> List[_SubredditBatch]:
+        """Convert post timestamps once per post and open traces for sampled posts."""
+        subreddit_name, posts, fetch_start, fetch_end, comments = fetched
+        post_times = [self._get_post_datetime(post) for post in posts]
+        spans = {}
+        if self.tracer.enabled:
+            spans = self._start_post_traces(subreddit_name, posts, fetch_start, fetch_end)
+            self._post_spans.update(spans)
+        return [_SubredditBatch(subreddit_name, posts, post_times, spans, comments)]
+
+    async def _match_stage(self, read_lock, batch: _SubredditBatch) -> List[_EntryJob]:
+        """Load the subreddit's entries and work out which new posts match each one."""
+        # The keywords column isn't needed: keyword_rows, read below, are what the matcher uses
+        stmt = (
+            select(UserSubreddit)
+            .options(selectinload(UserSubreddit.entries).options(defer(EntryFilter.keywords)))
+            .filter_by(subreddit=batch.subreddit)
+        )
+        # Normalized keywords as plain tuples, much cheaper than EntryKeyword objects
+        keywords_stmt = (
+            select(EntryKeyword.entry_filter_id, EntryKeyword.field, EntryKeyword.keyword)
+            .join(EntryFilter, EntryKeyword.entry_filter_id == EntryFilter.id)
+            .join(UserSubreddit, EntryFilter.user_subreddit_id == UserSubreddit.id)
+            .where(UserSubreddit.subreddit == batch.subreddit)
+            .order_by(EntryKeyword.id)
+        )
+        async with read_lock:
+            async with self.session_factory() as session:
+                with self.profiler.stage('db'):
                     result = await session.execute(stmt)
                     user_subs = result.scalars().all()
-                    
-                    for user_sub in user_subs:
-                        for entry in user_sub.entries:
-                            try:
-                                #get time the entry was last checked at
-                                cutoff = (
-                                    entry.last_check_at.replace(tzinfo=timezone.utc) 
-                                    if entry.last_check_at 
-                                    else datetime.min.replace(tzinfo=timezone.utc)
-                                )
-                                
-                                #filter to make sure new post datetime > entry check time
-                                #returns new posts
-                                relevant_posts = [
-                                    post for post in posts
-                                    if self._get_post_datetime(post) > cutoff
-                                ]
-                                
-                                if relevant_posts:
-                                    match_count = await self.process_matches(
-                                        discord_client, relevant_posts, user_sub, entry
-                                    )
-                                    
-                                    # Update ONLY if there were relevant posts
-                                    entry.last_check_at = latest_post_time
-                                    await session.commit()
-                                    
-                                    logger.info(
-                                        f"Updated {entry.entry_name} | "
-                                        f"Matches: {match_count} | "
-                                        f"New cutoff: {latest_post_time}"
-                                    )
-                                    
-                            except Exception as e:
-                                logger.error(f"Entry {entry.entry_name} failed: {e}")
-                                await session.rollback()
-                                continue  # Continue with next entry
-
-                except RedditMonitorError as e:
-                    logger.error(f"Subreddit {subreddit_name} error: {e}")
+                    keyword_rows = (await session.execute(keywords_stmt)).all()
+        pairs: Dict[int, list] = {}
+        for entry_id, field, keyword in keyword_rows:
+            pairs.setdefault(entry_id, []).append((field, keyword))
+        # Post batches go to post filters, comment batches to comment filters
+        compiled_entries = {
+            entry.id: compile_pairs(tuple(pairs.get(entry.id, ())))
+            for user_sub in user_subs for entry in user_sub.entries
+            if (entry.comment_target is not None) == batch.comments
+        }
+
+        jobs = []
+        rewound = False
+        # Lowered selftext shared by every entry checked against the same post
+        body_cache: Dict[str, str] = {}
+        with self.profiler.stage('match'):
+            # One trigram index over every fuzzy keyword in the subreddit
+            fuzzy_index = FuzzyIndex(
+                keyword for compiled in compiled_entries.values() for keyword in compiled.fuzzy
+            )
+            for user_sub in user_subs:
+                for entry in user_sub.entries:
+                    if entry.id not in compiled_entries:
+                        continue
+                    if entry.id in self._claimed_entries:
+                        # Already being handled by an overlapping cycle or targeted check.
+                        # A comment batch is gone once read, so fetch it again for this entry
+                        if batch.comments and not rewound:
+                            self._retry_batch(batch)
+                            rewound = True
+                        continue
+                    cutoff = self._entry_cutoff(entry)
+
+                    #filter to make sure new post datetime > entry check time
+                    relevant_posts = [
+                        post for post, post_time in zip(batch.posts, batch.post_times)
+                        if post_time > cutoff
+                    ]
+                    target = entry.comment_target
+                    if target is not None and target.thread_ids:
+                        threads = thread_fullnames(target.thread_ids)
+                        relevant_posts = [post for post in relevant_posts if post.link_id in threads]
+                    if not relevant_posts:
+                        continue
+
+                    # Only matching posts go on to delivery; process_matches re-checks just those
+                    compiled = compiled_entries[entry.id]
+                    matched = [
+                        post for post in relevant_posts if post_matches(post, compiled, body_cache, fuzzy_index)
+                    ]
+                    jobs.append(_EntryJob(batch, user_sub, entry, compiled, fuzzy_index, cutoff, matched))
+                    self._claimed_entries.add(entry.id)
+
+        batch.outstanding = len(jobs)
+        if not jobs:
+            self._finish_batch(batch)
+            return jobs
+
+        # Channel-bound entries are grouped so each channel gets one message per post
+        outputs: List[Any] = []
+        channel_jobs: Dict[str, _ChannelJob] = {}
+        for job in jobs:
+            if job.entry.channel is None:
+                outputs.append(job)
+                continue
+            channel_job = channel_jobs.get(job.entry.channel.channel_id)
+            if channel_job is None:
+                channel_job = channel_jobs[job.entry.channel.channel_id] = _ChannelJob(batch, job.entry.channel.channel_id)
+                outputs.append(channel_job)
+            channel_job.add(job)
+        return outputs
+
+    async def _notify_stage(
+        self,
+        discord_client: discord.Client,
+        stats: _CycleStats,
+        job: Any
+    ) -> Optional[List[_EntryJob]]:
+        """Deliver an entry's matches; its watermark only advances if delivery succeeded."""
+        if isinstance(job, _ChannelJob):
+            return await self._notify_channel(discord_client, stats, job)
+        if job.matched:
+            try:
+                job.match_count = await self.process_matches(
+                    discord_client, job.matched, job.user_sub, job.entry,
+                    compiled=job.compiled, fuzzy_index=job.fuzzy_index
+                )
+            except Exception as e:
+                stats.errors += 1
+                logger.error("Entry %s failed: %s", job.entry.entry_name, e)
+                self._retry_batch(job.batch)
+                self._job_done(job)
+                return None
+        return [job]
+
+    async def _notify_channel(
+        self,
+        discord_client: discord.Client,
+        stats: _CycleStats,
+        job: _ChannelJob
+    ) -> Optional[List[_EntryJob]]:
+        if job.mentions:
+            try:
+                await self.process_channel_matches(discord_client, job)
+            except Exception as e:
+                stats.errors += 1
+                logger.error("Channel %s failed: %s", job.channel_id, e)
+                self._retry_batch(job.batch)
+                for entry_job in job.jobs:
+                    self._job_done(entry_job)
+                return None
+        for entry_job in job.jobs:
+            entry_job.match_count = len(entry_job.matched)
+        return job.jobs
+
+    async def _commit_stage(self, db_lock: asyncio.Lock, stats: _CycleStats, jobs: List[_EntryJob]) -> None:
+        """Advance the watermark of a batch of delivered entries in one transaction."""
+        commit_start = time.time_ns()
+        try:
+            async with db_lock:
+                async with self.session_factory() as session:
+                    with self.profiler.stage('db'):
+                        await session.execute(
+                            update(EntryFilter),
+                            [{'id': job.entry.id, 'last_check_at': job.batch.latest} for job in jobs]
+                        )
+                        await session.commit()
+        except Exception as e:
+            stats.errors += len(jobs)
+            logger.error("Watermark commit for %d entries failed: %s", len(jobs), e)
+            for job in jobs:
+                self._retry_batch(job.batch)
+        else:
+            for job in jobs:
+                stats.entries_updated += 1
+                stats.matches += job.match_count
+                logger.debug(
+                    "Updated %s | Matches: %d | New cutoff: %s",
+                    job.entry.entry_name, job.match_count, job.batch.latest
+                )
+                if job.batch.spans:
+                    self._trace_commit(job.batch.spans, job.entry, job.cutoff, commit_start)
+        finally:
+            for job in jobs:
+                self._job_done(job)
+
+    def _entry_cutoff(self, entry: EntryFilter) -> datetime:
+        """Posts newer than this are new to the entry: its watermark, or a bounded backfill if never checked."""
+        if entry.last_check_at:
+            return entry.last_check_at.replace(tzinfo=timezone.utc)
+        if entry.created_at:
+            return entry.created_at.replace(tzinfo=timezone.utc) - timedelta(seconds=self.new_filter_backfill)
+        return datetime.min.replace(tzinfo=timezone.utc)
+
+    def _retry_batch(self, batch: _SubredditBatch) -> None:
+        """
+        After a failed delivery or commit, or an entry skipped because it was
+        claimed, make the next poll fetch a comment batch again. Post listings need nothing here: the entry keeps its old
+        watermark, and the next poll pages back to the subreddit's oldest one
+        (``_entry_floors``). Entries that did advance skip the repeats.
+        """
+        if batch.comments and not self.comment_cursors.rewind(batch.subreddit, batch.posts):
+            logger.warning(
+                "Giving up on %d comments in %s after %d retries",
+                len(batch.posts), batch.subreddit, self.comment_cursors.max_rewinds
+            )
+
+    def _job_done(self, job: _EntryJob) -> None:
+        self._claimed_entries.discard(job.entry.id)
+        job.batch.outstanding -= 1
+        if job.batch.outstanding <= 0:
+            self._finish_batch(job.batch)
+
+    def _finish_batch(self, batch: _SubredditBatch) -> None:
+        """Close the traces of a subreddit batch once all its entries are handled."""
+        for fullname, span in batch.spans.items():
+            span.end()
+            self._post_spans.pop(fullname, None)
+
+    def _prioritize_carryover(self, subreddits: List[str]) -> List[str]:
+        """Order subreddits so those deferred by the last cycle's deadline go first."""
+        if not self._carryover:
+            return subreddits
+        present = set(subreddits)
+        first = [name for name in self._carryover if name in present]
+        self._carryover = []
+        first_set = set(first)
+        return first + [name for name in subreddits if name not in first_set]
+
+    def _start_post_traces(
+        self,
+        subreddit_name: str,
+        posts: List[asyncpraw.models.Submission],
+        fetch_start: int,
+        fetch_end: int
+    ) -> Dict[str, Span]:
+        """Open a root span for every sampled post, starting at its listing fetch."""
+        spans = {}
+        for post in posts:
+            if not self.tracer.should_sample(post.name):
+                continue
+            root = self.tracer.start_trace('reddit_monitor.post', {
+                'subreddit': subreddit_name,
+                'post.fullname': post.name,
+                'post.created_utc': float(post.created_utc),
+                'post.ingest_lag_ms': (fetch_end / 1e6) - post.created_utc * 1000,
+            }, start_ns=fetch_start)
+            root.child(
+                'reddit.check_subreddit', {'subreddit': subreddit_name, 'posts': len(posts)},
+                start_ns=fetch_start, kind=SPAN_KIND_CLIENT
+            ).end(fetch_end)
+            spans[post.name] = root
+        return spans
+
+    def _trace_match(
+        self,
+        span: Span,
+        entry: EntryFilter,
+        match_start: int,
+        fetch_start: int,
+        fetch_end: int
+    ) -> None:
+        """Record the filter evaluation and the fetch_user it relied on under a post's trace."""
+        span.child(
+            'filter.match', {'entry_id': entry.id, 'entry_name': entry.entry_name, 'matched': True},
+            start_ns=match_start
+        ).end()
+        span.child('discord.fetch_user', {'entry_id': entry.id}, start_ns=fetch_start, kind=SPAN_KIND_CLIENT).end(fetch_end)
+
+    def _trace_commit(
+        self,
+        spans: Dict[str, Span],
+        entry: EntryFilter,
+        cutoff: datetime,
+        commit_start: int
+    ) -> None:
+        """Attach the watermark commit to every sampled post it moved the entry past."""
+        commit_end = time.time_ns()
+        cutoff_ts = cutoff.timestamp() if cutoff > datetime.min.replace(tzinfo=timezone.utc) else float('-inf')
+        for span in spans.values():
+            if span.attributes['post.created_utc'] > cutoff_ts:
+                span.child(
+                    'db.watermark_commit', {'entry_id': entry.id, 'subreddit': span.attributes['subreddit']},
+                    start_ns=commit_start
+                ).end(commit_end)
 
     def _get_post_datetime(self, post: asyncpraw.models.Submission) -> datetime:
         """Convert post created_utc to timezone-aware datetime."""
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import logging
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+logger = logging.getLogger(__name__)
+
+# Applied to every new SQLite connection. WAL lets readers run while the
+# single writer commits; synchronous=NORMAL only fsyncs at checkpoints, which
+# in WAL mode can lose the last commits on power loss but never corrupts.
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', '5000'),  # ms a writer waits for the lock instead of failing with "database is locked"
+    ('foreign_keys', 'ON'),
+    ('temp_store', 'MEMORY'),
+    ('cache_size', '-16000'),  # KiB, negative means size rather than pages
+    ('mmap_size', str(128 * 1024 * 1024)),
+)
+
+
+def is_sqlite(database_url: str) -> bool:
+    return make_url(database_url).get_backend_name() == 'sqlite'
+
+
+def is_memory_sqlite(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def supports_concurrent_reads(database_url: str) -> bool:
+    """False for in-memory SQLite, where every session shares one connection."""
+    return not is_memory_sqlite(database_url)
+
+
+def engine_options(database_url: str) -> dict:
+    options = {
+        'echo': False,  # SQL logging goes through SQL_ECHO instead, see log_config.configure_sql_echo
+        'pool_pre_ping': True,  # Connection health checks
+    }
+    if not is_sqlite(database_url):
+        options.update(
+            pool_size=10,  # Maximum number of connections
+            pool_timeout=30,  # Time to wait for a connection from the pool
+            max_overflow=20  # Maximum number of connections above pool_size
+        )
+    return options
+
+
+def configure_sqlite(engine: AsyncEngine) -> None:
+    """Set SQLITE_PRAGMAS on each connection the engine opens."""
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in SQLITE_PRAGMAS:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_engine(database_url: str) -> AsyncEngine:
+    """
+    Create the bot's engine for MySQL or an embedded SQLite file.
+
+    For SQLite the database directory is created if needed and every
+    connection is put in WAL mode with SQLITE_PRAGMAS.
+    """
+    if is_sqlite(database_url) and not is_memory_sqlite(database_url):
+        directory = os.path.dirname(os.path.abspath(make_url(database_url).database))
+        os.makedirs(directory, exist_ok=True)
+
+    engine = create_async_engine(database_url, **engine_options(database_url))
+    if is_sqlite(database_url):
+        configure_sqlite(engine)
+    return engine
@@ -0,0 +1,111 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from unittest import mock
+
+from sqlalchemy import insert, inspect, select
+from sqlalchemy.orm import selectinload
+
+import bot
+from app import App
+from config import Config
+from models import Base, EntryFilter, UserSubreddit
+
+# Decorator to run async test methods
+def async_test(func):
+    def wrapper(*args, **kwargs):
+        return asyncio.run(func(*args, **kwargs))
+    return wrapper
+
+class TestApp(unittest.TestCase):
+    def test_config_from_env(self):
+        env = {'PING_TIMER': '100', 'NEW_POSTS': '10', 'CHANNEL_ID': '1, 2', 'DB_PASSWORD': 'p@ss',
+               'DB_USER': 'bot', 'DB_HOST': 'db', 'DB_SCHEMA': 'filters', 'METRICS_PORT': '9100'}
+        with mock.patch.dict(os.environ, env, clear=True), mock.patch('dotenv.load_dotenv'):
+            config = Config.from_env()
+        self.assertEqual(config.database_url, 'mysql+aiomysql://bot:p%40ss@db:3306/filters')
+        self.assertEqual(config.channel_ids, ['1', '2'])
+        self.assertEqual(config.cycle_budget, 90)
+        self.assertEqual(config.health_max_cycle_age, 300)
+        self.assertEqual(config.metrics_port, 9100)
+
+    def test_database_url_overrides_mysql_settings(self):
+        env = {'DATABASE_URL': 'sqlite+aiosqlite:///data/filters.db', 'DB_HOST': 'db'}
+        with mock.patch.dict(os.environ, env, clear=True), mock.patch('dotenv.load_dotenv'):
+            config = Config.from_env()
+        self.assertEqual(config.database_url, 'sqlite+aiosqlite:///data/filters.db')
+
+    def test_only_file_databases_get_concurrent_reads(self):
+        memory_monitor = App(Config()).reddit_monitor
+        self.assertIs(memory_monitor._read_lock, memory_monitor._db_lock)
+        with tempfile.TemporaryDirectory() as tmp:
+            file_monitor = App(Config(database_url=f"sqlite+aiosqlite:///{tmp}/filters.db")).reddit_monitor
+        self.assertIsNot(file_monitor._read_lock, file_monitor._db_lock)
+
+    @async_test
+    async def test_schema_check_runs_once(self):
+        app = App(Config())
+        try:
+            with mock.patch.object(Base.metadata, 'create_all', wraps=Base.metadata.create_all) as create_all:
+                await app.ensure_schema()
+                await app.ensure_schema()
+            create_all.assert_called_once()
+
+            async with app.engine.connect() as conn:
+                tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+            self.assertEqual(set(tables), set(Base.metadata.tables))
+        finally:
+            await app.stop()
+
+    @async_test
+    async def test_schema_check_backfills_entry_keywords(self):
+        app = App(Config())
+        try:
+            # A database from before entry_keywords existed
+            async with app.engine.begin() as conn:
+                await conn.run_sync(lambda sync_conn: Base.metadata.create_all(
+                    sync_conn, tables=[t for t in Base.metadata.sorted_tables if t.name != 'entry_keywords']
+                ))
+                await conn.execute(insert(UserSubreddit.__table__).values(
+                    id=1, user_id='1', discord_name='a', subreddit='deals'
+                ))
+                await conn.execute(insert(EntryFilter.__table__).values(
+                    [{'user_subreddit_id': 1, 'entry_name': 'gpu', 'keywords': 'RTX, flair:Selling,rtx'},
+                     {'user_subreddit_id': 1, 'entry_name': 'tv', 'keywords': 'oled'},
+                     {'user_subreddit_id': 1, 'entry_name': 'long', 'keywords': f"{'x' * 300}a,{'x' * 300}b"}]
+                ))
+
+            with self.assertLogs('migrations', 'WARNING') as logs:
+                await app.ensure_schema()
+            self.assertIn("Entry 3 has keywords over 255 characters", logs.output[0])
+
+            async with app.session_factory() as session:
+                entries = (await session.execute(
+                    select(EntryFilter).options(selectinload(EntryFilter.keyword_rows)).order_by(EntryFilter.id)
+                )).scalars().all()
+                self.assertEqual([[(row.field, row.keyword) for row in entry.keyword_rows] for entry in entries],
+                                 [[('title', 'rtx'), ('flair', 'selling')], [('title', 'oled')], [('title', 'x' * 255)]])
+                self.assertEqual(entries[0].compiled_keywords.flair, ('selling',))
+        finally:
+            await app.stop()
+
+    @async_test
+    async def test_create_bot_has_no_side_effects_until_setup(self):
+        filter_bot = bot.create_bot(Config())
+        try:
+            self.assertIsNone(filter_bot.app.monitor_task)
+            self.assertFalse(filter_bot.app._schema_ready)
+
+            with mock.patch.object(filter_bot.app.reddit_monitor, 'monitor_loop', mock.AsyncMock()):
+                await filter_bot.setup_hook()
+            self.assertIn('add_filter', {command.name for command in filter_bot.commands})
+            self.assertEqual({command.name for command in filter_bot.tree.get_commands()},
+                             {'remove_filter', 'show_profile'})
+            self.assertTrue(filter_bot.app._schema_ready)
+        finally:
+            await filter_bot.app.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
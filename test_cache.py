@@ -0,0 +1,44 @@
+import unittest
+from datetime import timedelta
+
+from cache import SubredditCache
+
+class TestSubredditCache(unittest.TestCase):
+    def test_expired_entries_are_dropped_on_read(self):
+        cache = SubredditCache(timeout=60)
+        cache.set('deals', 'ok')
+        cache._timestamps['deals'] -= timedelta(seconds=61)
+        self.assertIsNone(cache.get('deals'))
+        self.assertEqual(len(cache), 0)
+
+    def test_full_cache_evicts_expired_entries_first(self):
+        cache = SubredditCache(timeout=60, max_size=3)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, 'ok')
+        cache._timestamps['a'] -= timedelta(seconds=61)
+        cache._timestamps['b'] -= timedelta(seconds=61)
+
+        cache.set('d', 'banned')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('c'), 'ok')
+        self.assertEqual(cache.get('d'), 'banned')
+
+    def test_full_cache_evicts_oldest_write(self):
+        cache = SubredditCache(timeout=60, max_size=2)
+        cache.set('a', 'ok')
+        cache.set('b', 'ok')
+        # Rewriting a key makes it the newest
+        cache.set('a', 'private')
+        cache.set('c', 'ok')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'private')
+        self.assertEqual(len(cache), 2)
+
+        cache.delete('a')
+        cache.delete('missing')
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
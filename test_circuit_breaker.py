@@ -0,0 +1,50 @@
+import unittest
+
+import metrics
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, SubredditBreakers
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_probes_after_backoff(self):
+        breaker = CircuitBreaker(failure_threshold=3, base_backoff=10)
+        self.assertFalse(breaker.record_failure("boom", now=0))
+        self.assertFalse(breaker.record_failure("boom", now=0))
+        self.assertTrue(breaker.record_failure("boom", now=0))
+        self.assertEqual(breaker.state, OPEN)
+
+        self.assertFalse(breaker.allow(now=5))
+        self.assertTrue(breaker.allow(now=10))
+        self.assertEqual(breaker.state, HALF_OPEN)
+        # Only one probe while half-open
+        self.assertFalse(breaker.allow(now=10))
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow(now=10))
+
+    def test_permanent_failure_opens_immediately_and_backoff_doubles(self):
+        breaker = CircuitBreaker(base_backoff=10, max_backoff=25)
+        self.assertTrue(breaker.record_failure("private", permanent=True, now=0))
+        self.assertEqual(breaker.retry_at, 10)
+
+        self.assertTrue(breaker.allow(now=10))
+        # A failed probe reopens without reporting a fresh open
+        self.assertFalse(breaker.record_failure("private", permanent=True, now=10))
+        self.assertEqual(breaker.retry_at, 30)
+
+        breaker.allow(now=30)
+        breaker.record_failure("private", permanent=True, now=30)
+        self.assertEqual(breaker.backoff, 25, "Backoff is capped")
+
+    def test_registry_drops_recovered_breakers(self):
+        breakers = SubredditBreakers(base_backoff=60)
+        breakers.record_failure("Deals", "gone", permanent=True)
+        self.assertFalse(breakers.allow("deals"))
+        self.assertEqual(metrics.OPEN_CIRCUITS.labels().value, 1)
+
+        breakers.record_success("deals")
+        self.assertTrue(breakers.allow("deals"))
+        self.assertEqual(metrics.OPEN_CIRCUITS.labels().value, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
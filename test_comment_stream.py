@@ -0,0 +1,56 @@
+import unittest
+
+from comment_stream import CommentCursors, CommentPost, group_subreddits, thread_fullnames
+
+def _comment(comment_id, subreddit):
+    return CommentPost(comment_id, subreddit, "body", None, 0.0, "/r/x/comments/a/_/b/", "t3_a")
+
+class TestCommentStream(unittest.TestCase):
+    def test_cursors_split_a_combined_listing(self):
+        cursors = CommentCursors()
+        self.assertIsNone(cursors.floor(["Deals", "quiet"]))
+
+        fresh = cursors.advance(["Deals", "quiet"], [_comment("z", "deals"), _comment("y", "deals")])
+        self.assertEqual([c.id for c in fresh["Deals"]], ["z", "y"])
+        self.assertEqual(fresh["quiet"], [])
+        # The quiet subreddit was covered by the same listing, so it doesn't hold the floor back
+        self.assertEqual(cursors.floor(["deals", "quiet"]), int("z", 36))
+
+        fresh = cursors.advance(["Deals", "quiet"], [_comment("11", "quiet"), _comment("z", "deals")])
+        self.assertEqual([c.id for c in fresh["quiet"]], ["11"])
+        self.assertEqual(fresh["Deals"], [], "Already seen")
+
+    def test_rewind_refetches_a_failed_batch(self):
+        cursors = CommentCursors()
+        batch = [_comment("12", "deals"), _comment("11", "deals")]
+        cursors.advance(["deals"], batch)
+        cursors.rewind("deals", batch)
+        self.assertEqual(cursors.floor(["deals"]), int("11", 36) - 1)
+        self.assertEqual(len(cursors.advance(["deals"], batch)["deals"]), 2)
+
+    def test_rewinds_to_the_same_comments_are_bounded(self):
+        cursors = CommentCursors(max_rewinds=2)
+        batch = [_comment("12", "deals"), _comment("11", "deals")]
+        cursors.advance(["deals"], batch)
+        self.assertTrue(cursors.rewind("deals", batch))
+        self.assertTrue(cursors.rewind("deals", batch))
+        cursors.advance(["deals"], batch)
+        self.assertFalse(cursors.rewind("deals", batch))
+        self.assertEqual(cursors.floor(["deals"]), int("12", 36), "Given up, the cursor stays put")
+
+        # Newer comments failing get their own retries
+        newer = [_comment("13", "deals")]
+        cursors.advance(["deals"], newer)
+        self.assertTrue(cursors.rewind("deals", newer))
+
+    def test_comment_looks_like_a_post_to_the_matcher(self):
+        comment = _comment("b", "deals")
+        self.assertEqual(comment.name, "t1_b")
+        self.assertEqual(comment.title, comment.selftext)
+        self.assertIsNone(comment.link_flair_text)
+        self.assertEqual(thread_fullnames("a,c"), frozenset({"t3_a", "t3_c"}))
+        self.assertEqual(group_subreddits(["a", "b", "c"], 2), [("a", "b"), ("c",)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot import FilterCommands
+
+# Decorator to run async test methods
+def async_test(func):
+    def wrapper(*args, **kwargs):
+        return asyncio.run(func(*args, **kwargs))
+    return wrapper
+
+def make_cog():
+    app = MagicMock()
+    app.config.channel_ids = ['10']
+    app.reddit_monitor.subreddit_status = AsyncMock(return_value='ok')
+    app.reddit_monitor.add_filter = AsyncMock(return_value="Filter added")
+    return FilterCommands(app)
+
+def make_ctx(role=None, mention_everyone=False):
+    ctx = MagicMock()
+    ctx.channel.id = 10
+    ctx.author.id = 1
+    ctx.author.guild_permissions.mention_everyone = mention_everyone
+    ctx.message.role_mentions = [role] if role else []
+    ctx.send = AsyncMock()
+    return ctx
+
+class TestChannelFilterRoles(unittest.TestCase):
+    @async_test
+    async def test_unmentionable_role_needs_mention_everyone(self):
+        cog = make_cog()
+        role = MagicMock(id=5, mentionable=False, mention='<@&5>')
+        role.name = 'everyone-ish'
+
+        ctx = make_ctx(role)
+        await cog.add_channel_filter.callback(cog, ctx, 'deals', 'gpus', 'rtx', role.mention)
+        cog.reddit_monitor.add_filter.assert_not_awaited()
+        self.assertIn("can't mention everyone-ish", ctx.send.await_args.args[0])
+
+        ctx = make_ctx(role, mention_everyone=True)
+        with patch('bot.confirm', AsyncMock(return_value=True)):
+            await cog.add_channel_filter.callback(cog, ctx, 'deals', 'gpus', 'rtx', role.mention)
+        self.assertEqual(cog.reddit_monitor.add_filter.await_args.kwargs['role_id'], '5')
+
+
+class TestAddFilterCommands(unittest.TestCase):
+    @async_test
+    async def test_commands_share_validation_and_confirmation(self):
+        cog = make_cog()
+        for command, args in ((cog.add_filter, ()), (cog.add_channel_filter, ()),
+                              (cog.add_comment_filter, ('--thread', 'abc123'))):
+            ctx = make_ctx()
+            await command.callback(cog, ctx, 'r/deals', 'gpus', 'rtx', *args)
+            self.assertTrue(ctx.send.await_args.args[0].startswith("Invalid subreddit name"), command.name)
+        cog.reddit_monitor.add_filter.assert_not_awaited()
+
+        ctx = make_ctx()
+        with patch('bot.confirm', AsyncMock(return_value=None)):
+            await cog.add_filter.callback(cog, ctx, 'deals', 'gpus', 'rtx')
+        ctx.send.assert_awaited_once_with("No response received. Filter addition cancelled.")
+
+        with patch('bot.confirm', AsyncMock(return_value=True)) as confirm:
+            await cog.add_comment_filter.callback(cog, make_ctx(), 'deals', 'gpus', 'rtx', '--thread', 'abc123', '--fuzzy')
+        self.assertIn("Checks: comments in threads abc123", confirm.await_args.args[1])
+        call = cog.reddit_monitor.add_filter.await_args
+        self.assertEqual(call.args[2:], ('deals', 'gpus', ['fuzzy:rtx']))
+        self.assertEqual(call.kwargs, {'comment_threads': ['abc123']})
+
+
+class TestImportFilters(unittest.TestCase):
+    @async_test
+    async def test_channel_bindings_are_checked_like_add_channel_filter(self):
+        cog = make_cog()
+        cog.reddit_monitor.import_filters = AsyncMock(return_value=1)
+        role = MagicMock(id=5, mentionable=False)
+        role.name = 'everyone-ish'
+
+        async def run(data, mention_everyone=False):
+            ctx = make_ctx(mention_everyone=mention_everyone)
+            ctx.guild.get_role = MagicMock(side_effect=lambda role_id: role if role_id == 5 else None)
+            ctx.message.attachments = [MagicMock(filename='f.csv', read=AsyncMock(return_value=data))]
+            await cog.import_filters.callback(cog, ctx)
+            return ctx.send.await_args.args[0]
+
+        header = b"subreddit,entry_name,keywords,target,threads,channel,role\n"
+        self.assertIn("isn't one of the bot's configured channels", await run(header + b"deals,tv,oled,,,99,\n"))
+        self.assertIn("can't mention everyone-ish", await run(header + b"deals,tv,oled,,,10,5\n"))
+        self.assertIn("role isn't in this server", await run(header + b"deals,tv,oled,,,10,6\n"))
+        cog.reddit_monitor.import_filters.assert_not_awaited()
+
+        self.assertTrue((await run(header + b"deals,tv,oled,,,10,5\n", mention_everyone=True)).startswith("Imported 1"))
+        spec, = cog.reddit_monitor.import_filters.await_args.args[2]
+        self.assertEqual((spec.channel_id, spec.role_id), ('10', '5'))
+
+    @async_test
+    async def test_unavailable_subreddits_are_skipped_and_reported(self):
+        cog = make_cog()
+        cog.reddit_monitor.import_filters = AsyncMock(return_value=1)
+        cog.reddit_monitor.subreddit_status = AsyncMock(side_effect=lambda name: 'private' if name == 'secret' else 'ok')
+        ctx = make_ctx()
+        data = b"subreddit,entry_name,keywords\ndeals,tv,oled\nsecret,a,x\nsecret,b,y\n"
+        ctx.message.attachments = [MagicMock(filename='f.csv', read=AsyncMock(return_value=data))]
+        await cog.import_filters.callback(cog, ctx)
+
+        self.assertEqual([spec.subreddit for spec in cog.reddit_monitor.import_filters.await_args.args[2]], ['deals'])
+        self.assertEqual(cog.reddit_monitor.subreddit_status.await_count, 2, "Once per subreddit")
+        self.assertEqual(ctx.send.await_args.args[0],
+                         "Imported 1 filter(s) across 1 subreddit(s). Skipped r/secret (private), which can't be monitored.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from events import FILTER_ADDED, FILTER_REMOVED, FilterEvent
+from filter_index import FilterIndex, PrefixIndex, UserFilters, paginate_lines
+
+class TestPrefixIndex(unittest.TestCase):
+    def test_complete_ignores_case_and_respects_limit(self):
+        index = PrefixIndex(['hardwareswap', 'Hardware', 'buildapcsales', 'gamedeals'])
+        self.assertEqual(index.complete('HARD'), ['Hardware', 'hardwareswap'])
+        self.assertEqual(index.complete(''), ['buildapcsales', 'gamedeals', 'Hardware', 'hardwareswap'])
+        self.assertEqual(index.complete('', limit=2), ['buildapcsales', 'gamedeals'])
+        self.assertEqual(index.complete('x'), [])
+
+        index.add('hardwareswap')
+        index.add('hardwaresales')
+        index.discard('Hardware')
+        index.discard('missing')
+        self.assertEqual(index.complete('hard'), ['hardwaresales', 'hardwareswap'])
+
+class TestFilterIndex(unittest.TestCase):
+    def test_changes_update_names_and_drop_rendered_profile(self):
+        index = FilterIndex()
+        index.store('u1', UserFilters({'deals': ['gpu', 'cpu']}, ['Subreddit: r/deals']), index.generation)
+
+        index.apply(FilterEvent(FILTER_ADDED, 'u1', 'monitors', 'oled'))
+        filters = index.get('u1')
+        self.assertIsNone(filters.lines)
+        self.assertEqual(list(filters.subreddits), ['deals', 'monitors'])
+        self.assertEqual(filters.entries['deals'].complete(''), ['cpu', 'gpu'])
+
+        # Removing the last entry removes the subreddit, as remove_filter does
+        index.apply(FilterEvent(FILTER_REMOVED, 'u1', 'monitors', 'oled'))
+        self.assertEqual(list(filters.subreddits), ['deals'])
+        self.assertNotIn('monitors', filters.entries)
+
+    def test_listing_loaded_across_a_change_is_not_stored(self):
+        index = FilterIndex()
+        generation = index.generation
+        index.apply(FilterEvent(FILTER_ADDED, 'u1', 'deals', 'gpu'))
+        self.assertFalse(index.store('u1', UserFilters({}, []), generation))
+        self.assertIsNone(index.get('u1'))
+
+class TestPaginateLines(unittest.TestCase):
+    def test_pages_break_between_lines_and_fit_the_limit(self):
+        lines = ['Subreddit: r/deals'] + [f"  - entry{i}: keyword{i}" for i in range(10)] + ['', 'Subreddit: r/x']
+        pages = paginate_lines(lines, page_chars=60)
+        self.assertTrue(all(len(page) <= 60 for page in pages))
+        self.assertEqual([line for page in pages for line in page.split('\n') if line], [line for line in lines if line])
+        self.assertFalse(any(page.startswith('\n') or page.endswith('\n') for page in pages))
+        self.assertEqual(paginate_lines(['y' * 100], page_chars=10), ['y' * 9 + '…'])
+        self.assertEqual(paginate_lines([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
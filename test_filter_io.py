@@ -0,0 +1,50 @@
+import unittest
+
+from filter_io import (
+    MAX_COMMENT_THREADS, MAX_THREAD_IDS_LENGTH, FilterSpec, dump_filters, parse_filters, parse_thread_id
+)
+
+class TestFilterIO(unittest.TestCase):
+    def test_round_trip_json_and_csv(self):
+        specs = [
+            FilterSpec("hardwareswap", "gpu", ["3080", "fe"]),
+            FilterSpec("buildapcsales", "ssd", ["nvme"]),
+            FilterSpec("deals", "restocks", ["gpu"], ["abc123", "def456"]),
+            FilterSpec("deals", "all comments", ["gpu"], []),
+            FilterSpec("deals", "channel", ["gpu"], channel_id="10", role_id="5"),
+        ]
+        for fmt in ("json", "csv"):
+            self.assertEqual(parse_filters(dump_filters(specs, fmt), f"filters.{fmt}"), specs)
+
+    def test_later_duplicate_replaces_earlier(self):
+        data = b"subreddit,entry_name,keywords\ndeals,tv,\"oled,55\"\ndeals,tv,qled\n"
+        self.assertEqual(parse_filters(data, "f.csv"), [FilterSpec("deals", "tv", ["qled"])])
+
+    def test_invalid_rows_are_reported(self):
+        with self.assertRaisesRegex(ValueError, "Item 2: invalid subreddit"):
+            parse_filters(b'[{"subreddit": "ok_sub", "entry_name": "a", "keywords": ["x"]},'
+                          b' {"subreddit": "r/bad", "entry_name": "b", "keywords": ["x"]}]', "f.json")
+        with self.assertRaisesRegex(ValueError, "Line 2: at least one keyword"):
+            parse_filters(b"subreddit,entry_name,keywords\ndeals,tv,\n", "f.csv")
+        with self.assertRaisesRegex(ValueError, ".json or .csv"):
+            parse_filters(b"", "filters.txt")
+        with self.assertRaisesRegex(ValueError, "Line 2: threads are only for target 'comments'"):
+            parse_filters(b"subreddit,entry_name,keywords,threads\ndeals,tv,oled,abc123\n", "f.csv")
+        with self.assertRaisesRegex(ValueError, "Item 1: role must be a role id, with a channel"):
+            parse_filters(b'[{"subreddit": "deals", "entry_name": "a", "keywords": ["x"], "role": "5"}]', "f.json")
+
+    def test_thread_ids_from_ids_fullnames_and_links(self):
+        self.assertEqual(parse_thread_id("1abc2d"), "1abc2d")
+        self.assertEqual(parse_thread_id("t3_1ABC2D"), "1abc2d")
+        self.assertEqual(parse_thread_id("https://www.reddit.com/r/deals/comments/1abc2d/daily_thread/"), "1abc2d")
+        with self.assertRaises(ValueError):
+            parse_thread_id("https://example.com/thread")
+        with self.assertRaises(ValueError):
+            parse_thread_id("a" * 13)
+        # The most threads a filter can watch fit the thread_ids column even at the longest ids
+        longest = parse_thread_id("z" * 12)
+        self.assertLessEqual(len(','.join([longest] * MAX_COMMENT_THREADS)), MAX_THREAD_IDS_LENGTH)
+
+
+if __name__ == '__main__':
+    unittest.main()
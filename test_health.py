@@ -0,0 +1,60 @@
+import unittest
+import asyncio
+import time
+import logging
+
+import metrics
+from health import Watchdog
+
+# Decorator to run async test methods
+def async_test(func):
+    def wrapper(*args, **kwargs):
+        return asyncio.run(func(*args, **kwargs))
+    return wrapper
+
+class FakeMonitor:
+    last_cycle_completed_at = None
+
+class TestWatchdog(unittest.TestCase):
+    @async_test
+    async def test_blocked_loop_logs_stack(self):
+        watchdog = Watchdog(FakeMonitor(), interval=0.05, slow_threshold=0.2)
+        lag_before = metrics.LOOP_LAG.labels().sum
+        watchdog.start()
+        try:
+            with self.assertLogs('health', level=logging.WARNING) as logs:
+                await asyncio.sleep(0.1)
+                time.sleep(0.5)  # Block the loop like CPU-bound matching would
+                await asyncio.sleep(0.1)
+            self.assertIn("Event loop blocked", logs.output[0])
+            self.assertIn("test_blocked_loop_logs_stack", logs.output[0])
+            self.assertGreater(metrics.LOOP_LAG.labels().sum - lag_before, 0.3)
+        finally:
+            await watchdog.stop()
+
+    @async_test
+    async def test_status_tracks_cycles_and_task(self):
+        monitor = FakeMonitor()
+        watchdog = Watchdog(monitor, interval=0.05, max_cycle_age=0.3)
+        watchdog.start()
+        try:
+            status = watchdog.status()
+            self.assertTrue(status['live'])
+            self.assertFalse(status['ready'], "Not ready before the first cycle")
+
+            monitor.last_cycle_completed_at = time.monotonic()
+            self.assertTrue(watchdog.status()['ready'])
+
+            await asyncio.sleep(0.4)
+            self.assertFalse(watchdog.status()['live'], "Stale cycle should fail liveness")
+
+            monitor.last_cycle_completed_at = time.monotonic()
+            task = asyncio.create_task(asyncio.sleep(0))
+            watchdog.watch_task(task)
+            await task
+            self.assertFalse(watchdog.status()['live'], "Dead monitor task should fail liveness")
+        finally:
+            await watchdog.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+import logging
+import os
+import tempfile
+
+from log_config import configure_logging
+
+class TestLogConfig(unittest.TestCase):
+    def test_records_written_by_listener_thread(self):
+        root = logging.getLogger()
+        handlers_before = list(root.handlers)
+        level_before = root.level
+        with tempfile.TemporaryDirectory() as log_dir:
+            path = os.path.join(log_dir, 'app.log')
+            listener = configure_logging(path, sql_echo='')
+            try:
+                logging.getLogger('reddit_monitor').info("Cycle finished in %.2fs", 1.5)
+                logging.getLogger('sqlalchemy.engine.Engine').info("SELECT 1")
+            finally:
+                # stop() drains the queue before returning
+                listener.stop()
+                for handler in root.handlers:
+                    if handler not in handlers_before:
+                        root.removeHandler(handler)
+                root.setLevel(level_before)
+                for handler in listener.handlers:
+                    handler.close()
+
+            with open(path) as f:
+                contents = f.read()
+            self.assertIn("reddit_monitor - INFO - Cycle finished in 1.50s", contents)
+            self.assertNotIn("SELECT 1", contents, "SQL echo is off by default")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from unittest.mock import MagicMock
+
+import matching
+from matching import FuzzyIndex, compile_keywords, fuzzy_contains, make_fuzzy, matches_keywords
+
+def make_post(**fields):
+    defaults = dict(name="t3_x", title="[USA-CA] [H] RTX 3080 [W] PayPal", selftext="Also selling 32GB DDR4",
+                    link_flair_text="Selling", domain="self.hardwareswap", author="seller42")
+    defaults.update(fields)
+    return SimpleNamespace(**defaults)
+
+class TestMatching(unittest.TestCase):
+    def test_field_prefixes(self):
+        compiled = compile_keywords(("rtx", "flair:selling", "body:ddr4", "author:Seller42", "domain:hardwareswap"))
+        self.assertEqual(compiled.title, ("rtx",))
+        self.assertEqual(compiled.author, ("seller42",))
+
+        post = make_post()
+        self.assertTrue(matches_keywords(post, ["rtx", "flair:selling", "body:ddr4", "author:Seller42"]))
+        self.assertTrue(matches_keywords(post, ["domain:hardwareswap"]))
+        self.assertFalse(matches_keywords(post, ["flair:buying"]))
+        self.assertFalse(matches_keywords(make_post(author=None), ["author:seller42"]))
+        # Unknown prefixes stay part of a title keyword
+        self.assertTrue(matches_keywords(make_post(title="rtx:3080 deal"), ["rtx:3080"]))
+
+    def test_body_is_only_scanned_after_cheap_fields_match(self):
+        body = MagicMock()
+        body.lower.return_value = "32gb ddr4"
+        cache = {}
+
+        self.assertFalse(matches_keywords(make_post(selftext=body), ["gtx", "body:ddr4"], cache))
+        body.lower.assert_not_called()
+
+        post = make_post(selftext=body)
+        self.assertTrue(matches_keywords(post, ["rtx", "body:ddr4"], cache))
+        self.assertTrue(matches_keywords(post, ["3080", "body:32gb"], cache))
+        body.lower.assert_called_once()
+
+    def test_fuzzy_keywords_tolerate_typos_and_spacing(self):
+        self.assertEqual(make_fuzzy(["RTX 3080", "flair:selling"]), ["fuzzy:RTX 3080", "flair:selling"])
+        self.assertEqual(compile_keywords(("fuzzy:RTX 3080",)).fuzzy, ("rtx 3080",))
+
+        self.assertTrue(matches_keywords(make_post(title="[H] RTX3080 FE"), ["fuzzy:rtx 3080"]))
+        self.assertTrue(matches_keywords(make_post(title="[H] rtx 3080"), ["fuzzy:rtx3080"]))
+        self.assertTrue(matches_keywords(make_post(title="Nvidai 3080"), ["fuzzy:nvidia"]), "Swapped letters")
+        self.assertTrue(matches_keywords(make_post(title="Thinkpda x1"), ["fuzzy:thinkpad", "fuzzy:x1"]))
+        self.assertFalse(matches_keywords(make_post(title="PS4 bundle"), ["fuzzy:ps5"]), "Short keywords are exact")
+        self.assertFalse(matches_keywords(make_post(title="Radeon 6800"), ["fuzzy:nvidia"]))
+
+        self.assertTrue(fuzzy_contains("macbook", "xmacbokpro", 1))
+        self.assertFalse(fuzzy_contains("macbook", "xmcbkpro", 1))
+
+    def test_fuzzy_index_only_scores_trigram_candidates(self):
+        index = FuzzyIndex(["thinkpad", "macbook pro", "nvidia", "ps5"])
+        post = make_post(name="t3_a", title="Nvidai RTX 3080")
+
+        with mock.patch.object(matching, 'fuzzy_contains', wraps=matching.fuzzy_contains) as scored:
+            self.assertEqual(index.hits(post), frozenset({"nvidia"}))
+            self.assertEqual([call.args[0] for call in scored.call_args_list], ["nvidia"])
+            # Shared by every entry checked against the same post
+            index.hits(post)
+            self.assertEqual(scored.call_count, 1)
+
+        compiled = compile_keywords(("fuzzy:nvidia", "3080"))
+        self.assertTrue(matching.post_matches(post, compiled, fuzzy_index=index))
+
+
+if __name__ == '__main__':
+    unittest.main()
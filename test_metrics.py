@@ -0,0 +1,91 @@
+import unittest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+
+import metrics
+from metrics import MetricsRegistry, MetricsServer
+from reddit_monitor import RedditMonitor, UserSubreddit, EntryFilter
+
+# Decorator to run async test methods
+def async_test(func):
+    def wrapper(*args, **kwargs):
+        return asyncio.run(func(*args, **kwargs))
+    return wrapper
+
+class TestMetrics(unittest.TestCase):
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry()
+        fetched = registry.counter('posts_total', "Posts.", ['subreddit'])
+        latency = registry.histogram('fetch_seconds', "Fetch latency.", buckets=(0.1, 1.0))
+
+        fetched.labels('deals').inc(3)
+        latency.observe(0.05)
+        latency.observe(5)
+
+        text = registry.render()
+        self.assertIn('# TYPE posts_total counter', text)
+        self.assertIn('posts_total{subreddit="deals"} 3.0', text)
+        self.assertIn('fetch_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('fetch_seconds_bucket{le="1.0"} 1', text)
+        self.assertIn('fetch_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn('fetch_seconds_count 2', text)
+
+    def test_labelled_metric_requires_labels(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('errors_total', "Errors.", ['subreddit'])
+        with self.assertRaises(ValueError):
+            counter.inc()
+
+    def test_instrumented_engine_survives_failing_statements(self):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.exc import OperationalError
+
+        engine = create_engine('sqlite://')
+        metrics.instrument_engine(engine)
+        before = metrics.DB_QUERY_DURATION.count
+        with engine.connect() as conn:
+            for _ in range(3):
+                with self.assertRaises(OperationalError):
+                    conn.execute(text("SELECT * FROM missing_table"))
+            self.assertEqual(conn.execute(text("SELECT 1")).scalar(), 1)
+            # Nothing left behind by the failed statements, and the good one was timed
+            self.assertNotIn('query_start', conn.info)
+        self.assertGreater(metrics.DB_QUERY_DURATION.count, before)
+        engine.dispose()
+
+    @async_test
+    async def test_process_matches_counts_notifications(self):
+        reddit_monitor = RedditMonitor('id', 'secret', 'agent', session_factory=None)
+        user = MagicMock()
+        user.send = AsyncMock()
+        client = MagicMock()
+        client.fetch_user = AsyncMock(return_value=user)
+        post = MagicMock(title="RTX 3080 for sale", permalink="/r/test/1")
+        sent = metrics.NOTIFICATIONS.labels('sent')
+        before = sent.value
+
+        await reddit_monitor.process_matches(
+            client, [post],
+            UserSubreddit(user_id='1', discord_name='u', subreddit='test'),
+            EntryFilter(entry_name='gpu', keywords='rtx,3080')
+        )
+
+        self.assertEqual(sent.value - before, 1)
+
+    @async_test
+    async def test_metrics_endpoint(self):
+        server = MetricsServer(host='127.0.0.1', port=0)
+        await server.start()
+        try:
+            async with aiohttp.ClientSession() as http:
+                async with http.get(f"http://127.0.0.1:{server.port}/metrics") as response:
+                    self.assertEqual(response.status, 200)
+                    body = await response.text()
+            self.assertIn('reddit_monitor_cycle_duration_seconds', body)
+        finally:
+            await server.stop()
+
+if __name__ == '__main__':
+    unittest.main()
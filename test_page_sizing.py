@@ -0,0 +1,55 @@
+import unittest
+from types import SimpleNamespace
+
+from page_sizing import ListingSizer
+
+def _posts(*created):
+    return [SimpleNamespace(created_utc=c) for c in sorted(created, reverse=True)]
+
+class TestListingSizer(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.sizer = ListingSizer(min_posts=5, max_posts=100, headroom=1.5, smoothing=0.5, clock=lambda: self.now)
+
+    def test_first_poll_asks_for_max_posts(self):
+        self.assertEqual(self.sizer.limit("deals"), 100)
+        self.assertIsNone(self.sizer.watermark("deals"))
+        self.assertFalse(self.sizer.is_truncated("deals", _posts(*range(100)), 100))
+
+    def test_limit_follows_arrival_rate_and_elapsed_time(self):
+        # First listing: 11 posts 10s apart, one post per 10 seconds
+        self.sizer.observe("Deals", _posts(*range(900, 1001, 10)))
+        self.assertAlmostEqual(self.sizer.get("deals").rate, 0.1)
+        self.now += 200
+        # 0.1/s * 200s * 1.5 headroom
+        self.assertEqual(self.sizer.limit("deals"), 30)
+        self.now += 10000
+        self.assertEqual(self.sizer.limit("deals"), 100, "Clamped to max_posts")
+
+        # The busy spell ends: nothing new for a long poll pulls the rate down
+        self.sizer.observe("deals", _posts(*range(900, 1001, 10)))
+        self.assertAlmostEqual(self.sizer.get("deals").rate, 0.05)
+
+        # A subreddit with one post in its listing shows no rate at all
+        self.sizer.observe("quiet", _posts(10))
+        self.now += 600
+        self.assertEqual(self.sizer.limit("quiet"), 5, "Clamped to min_posts")
+
+    def test_truncation_needs_a_full_page_newer_than_the_watermark(self):
+        self.sizer.observe("deals", _posts(100, 200))
+        self.assertEqual(self.sizer.watermark("deals"), 200)
+        self.assertTrue(self.sizer.is_truncated("deals", _posts(300, 250), 2))
+        self.assertFalse(self.sizer.is_truncated("deals", _posts(300, 250), 5), "Short page reached the end")
+        self.assertFalse(self.sizer.is_truncated("deals", _posts(300, 200), 2), "Reached seen posts")
+        # An entry still waiting on posts from before the watermark pages back to them
+        self.assertTrue(self.sizer.is_truncated("deals", _posts(300, 200), 2, floor=150))
+        self.assertFalse(self.sizer.is_truncated("deals", _posts(300, 200), 2, floor=260), "Older watermark wins")
+        self.assertTrue(self.sizer.is_truncated("fresh", _posts(300, 250), 2, floor=100), "Floor without a watermark")
+
+    def test_rejects_inverted_bounds(self):
+        with self.assertRaises(ValueError):
+            ListingSizer(min_posts=50, max_posts=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
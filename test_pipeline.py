@@ -0,0 +1,102 @@
+import unittest
+import asyncio
+
+import metrics
+from pipeline import Pipeline, Stage
+
+# Decorator to run async test methods
+def async_test(func):
+    def wrapper(*args, **kwargs):
+        return asyncio.run(func(*args, **kwargs))
+    return wrapper
+
+class TestPipeline(unittest.TestCase):
+    @async_test
+    async def test_slow_downstream_applies_backpressure(self):
+        fetched = []
+        in_flight = []
+        release = asyncio.Event()
+
+        async def fetch(item):
+            fetched.append(item)
+            return [item]
+
+        async def notify(item):
+            in_flight.append(item)
+            await release.wait()
+            return None
+
+        pipeline = Pipeline([
+            Stage('fetch', fetch, concurrency=1, queue_size=1),
+            Stage('notify', notify, concurrency=1, queue_size=1),
+        ])
+        run = asyncio.create_task(pipeline.run(range(100)))
+        await asyncio.sleep(0.05)
+
+        # One item in notify, one queued for it, one blocked in fetch's put: fetching stalls
+        self.assertEqual(in_flight, [0])
+        self.assertLessEqual(len(fetched), 3)
+
+        release.set()
+        self.assertEqual(await run, [])
+        self.assertEqual(len(in_flight), 100)
+
+    @async_test
+    async def test_batches_and_should_stop(self):
+        batches = []
+
+        async def commit(items):
+            batches.append(list(items))
+            return None
+
+        async def passthrough(item):
+            await asyncio.sleep(0)
+            return [item]
+
+        pipeline = Pipeline([
+            Stage('fetch', passthrough, concurrency=2),
+            Stage('commit', commit, queue_size=10, batch_size=5),
+        ])
+        checks = 0
+        def should_stop():
+            nonlocal checks
+            checks += 1
+            return checks > 6
+
+        unfed = await pipeline.run(range(10), should_stop=should_stop)
+
+        self.assertEqual(unfed, [6, 7, 8, 9])
+        self.assertEqual(sorted(item for batch in batches for item in batch), [0, 1, 2, 3, 4, 5])
+        self.assertTrue(all(len(batch) <= 5 for batch in batches))
+
+    @async_test
+    async def test_overlapping_pipelines_share_gauges_without_clobbering(self):
+        busy = metrics.STAGE_BUSY.labels('overlap_notify')
+        depth = metrics.QUEUE_DEPTH.labels('overlap_notify')
+        release = asyncio.Event()
+
+        async def passthrough(item):
+            return [item]
+
+        async def slow_notify(item):
+            await release.wait()
+
+        async def fast_notify(item):
+            return None
+
+        slow = Pipeline([Stage('overlap_fetch', passthrough), Stage('overlap_notify', slow_notify)])
+        fast = Pipeline([Stage('overlap_fetch', passthrough), Stage('overlap_notify', fast_notify)])
+        slow_run = asyncio.create_task(slow.run(range(3)))
+        await asyncio.sleep(0.01)
+        self.assertEqual((busy.value, depth.value), (1, 2))
+
+        # The targeted-check pipeline finishing must leave the cycle's share alone
+        await fast.run(range(5))
+        self.assertEqual((busy.value, depth.value), (1, 2))
+
+        release.set()
+        await slow_run
+        self.assertEqual((busy.value, depth.value), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,23 @@
 import unittest
 import asyncio
+import json
+import os
+import tempfile
+import time
 from datetime import datetime, timezone, timedelta
 from unittest import mock
 from unittest.mock import AsyncMock, MagicMock, patch
+import discord
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from reddit_monitor import RedditMonitor, UserSubreddit, EntryFilter
-from models import Base
+from models import Base, EntryKeyword
+from exceptions import RedditMonitorError, SubredditUnavailableError
+from fake_reddit import FakeRedditServer
+from filter_io import FilterSpec
+from matching import FuzzyIndex
+from page_sizing import ListingSizer
+from tracing import FileSpanExporter, Tracer
 
 # Decorator to run async test methods
 def async_test(func):
@@ -345,6 +356,40 @@ class TestRedditMonitorSQLite(unittest.TestCase):
         finally:
             await self.asyncTearDown()
             
+    @async_test
+    async def test_profile_and_autocomplete_are_served_from_memory(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor('dummy_id', 'dummy_secret', 'dummy_agent', self.Session, max_posts=100)
+            await reddit_monitor.add_filter("u1", "user", "hardwareswap", "gpu", ["rtx"])
+            await reddit_monitor.add_filter("u1", "user", "Hardware", "cpu", ["ryzen"])
+
+            pages = await reddit_monitor.get_profile_pages("u1")
+            self.assertEqual(pages, ["Subreddit: r/Hardware\n  - cpu: ryzen\n\nSubreddit: r/hardwareswap\n  - gpu: rtx"])
+
+            # Nothing below may touch the database until a filter changes
+            loaded = reddit_monitor.session_factory
+            reddit_monitor.session_factory = MagicMock(side_effect=AssertionError("database queried"))
+            self.assertEqual(await reddit_monitor.get_profile_pages("u1"), pages)
+            self.assertEqual(await reddit_monitor.complete_subreddits("u1", "HARD"), ["Hardware", "hardwareswap"])
+            self.assertEqual(await reddit_monitor.complete_entries("u1", "hardwareswap", ""), ["gpu"])
+            self.assertEqual(await reddit_monitor.complete_entries("u1", "missing", ""), [])
+            reddit_monitor.session_factory = loaded
+
+            # add_filter updates the names in place and re-renders the profile on next view
+            await reddit_monitor.add_filter("u1", "user", "hardwareswap", "monitor", ["oled"])
+            reddit_monitor.session_factory = MagicMock(side_effect=AssertionError("database queried"))
+            self.assertEqual(await reddit_monitor.complete_entries("u1", "hardwareswap", ""), ["gpu", "monitor"])
+            reddit_monitor.session_factory = loaded
+            self.assertIn("  - monitor: oled", (await reddit_monitor.get_profile_pages("u1"))[0])
+
+            await reddit_monitor.remove_filter("u1", "Hardware", "cpu")
+            self.assertEqual(await reddit_monitor.complete_subreddits("u1", ""), ["hardwareswap"])
+            self.assertNotIn("r/Hardware\n", (await reddit_monitor.get_profile_pages("u1"))[0])
+            self.assertEqual(await reddit_monitor.get_profile_pages("u2"), [])
+        finally:
+            await self.asyncTearDown()
+
     @async_test
     async def test_initial_run_processes_all_posts(self):
         await self.asyncSetUp()
@@ -368,7 +413,7 @@ class TestRedditMonitorSQLite(unittest.TestCase):
             # Mock check_subreddit and process_matches
             with mock.patch.object(RedditMonitor, 'check_subreddit', AsyncMock(return_value=test_posts)):
                 sent_count = 0
-                async def mock_process_matches(*args):
+                async def mock_process_matches(*args, **kwargs):
                     nonlocal sent_count
                     sent_count = len(args[1])  # All posts are considered matches
                     return sent_count
@@ -415,7 +460,7 @@ class TestRedditMonitorSQLite(unittest.TestCase):
             post_new = self._create_mock_post(initial_check_time + timedelta(minutes=5))
             with mock.patch.object(RedditMonitor, 'check_subreddit', AsyncMock(return_value=[post_old, post_new])):
                 sent_count = 0
-                async def mock_process_matches(*args):
+                async def mock_process_matches(*args, **kwargs):
                     nonlocal sent_count
                     sent_count = len(args[1])
                     return sent_count
@@ -433,6 +478,565 @@ class TestRedditMonitorSQLite(unittest.TestCase):
             await self.asyncTearDown()
             
             
+    @async_test
+    async def test_profiler_writes_stage_breakdown(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor(
+                client_id='dummy_id',
+                client_secret='dummy_secret',
+                user_agent='dummy_agent',
+                session_factory=self.Session,
+                max_posts=100
+            )
+            await reddit_monitor.add_filter("user1", "test", "test_sub", "entry1", ["test"])
+            post = self._create_mock_post(datetime.now(timezone.utc))
+
+            with tempfile.TemporaryDirectory() as output_dir:
+                reddit_monitor.profiler.output_dir = output_dir
+                reddit_monitor.profiler.request(1)
+                with mock.patch.object(RedditMonitor, 'check_subreddit', AsyncMock(return_value=[post])):
+                    reddit_monitor.process_matches = AsyncMock(return_value=1)
+                    await reddit_monitor._process_all_filters(None, None)
+                    # Only one cycle was requested
+                    await reddit_monitor._process_all_filters(None, None)
+
+                files = sorted(os.listdir(output_dir))
+                self.assertEqual(len(files), 2)
+                self.assertTrue(files[1].endswith('.prof'))
+                with open(os.path.join(output_dir, files[0])) as f:
+                    summary = json.load(f)
+                self.assertTrue({'fetch', 'db', 'match', 'other'} <= set(summary['stages']))
+                self.assertEqual(reddit_monitor.profiler.remaining, 0)
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_traces_post_path_to_otlp_file(self):
+        await self.asyncSetUp()
+        try:
+            with tempfile.TemporaryDirectory() as output_dir:
+                exporter = FileSpanExporter(os.path.join(output_dir, 'spans.jsonl'))
+                reddit_monitor = RedditMonitor(
+                    client_id='dummy_id',
+                    client_secret='dummy_secret',
+                    user_agent='dummy_agent',
+                    session_factory=self.Session,
+                    max_posts=100,
+                    tracer=Tracer(exporter, sample_ratio=1.0)
+                )
+                await reddit_monitor.add_filter("user1", "test", "test_sub", "entry1", ["test"])
+                post = self._create_mock_post(datetime.now(timezone.utc))
+                post.name = "t3_abc"
+                user = MagicMock()
+                user.send = AsyncMock()
+                discord_client = MagicMock()
+                discord_client.fetch_user = AsyncMock(return_value=user)
+
+                with mock.patch.object(RedditMonitor, 'check_subreddit', AsyncMock(return_value=[post])):
+                    await reddit_monitor._process_all_filters(discord_client, None)
+                exporter.flush()
+                await exporter.stop()
+
+                with open(exporter.path) as f:
+                    request = json.loads(f.readline())
+                spans = request['resourceSpans'][0]['scopeSpans'][0]['spans']
+                names = {span['name'] for span in spans}
+                self.assertEqual(names, {
+                    'reddit_monitor.post', 'reddit.check_subreddit', 'filter.match',
+                    'discord.fetch_user', 'discord.send', 'db.watermark_commit'
+                })
+                self.assertEqual(len({span['traceId'] for span in spans}), 1)
+                root = next(span for span in spans if span['name'] == 'reddit_monitor.post')
+                self.assertIn(
+                    {'key': 'post.fullname', 'value': {'stringValue': 't3_abc'}}, root['attributes']
+                )
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_deadline_carries_over_unreached_subreddits(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor(
+                client_id='dummy_id',
+                client_secret='dummy_secret',
+                user_agent='dummy_agent',
+                session_factory=self.Session,
+                max_posts=100
+            )
+            for name in ("sub_a", "sub_b", "sub_c"):
+                await reddit_monitor.add_filter("user1", "test", name, "entry1", ["test"])
+
+            checked = []
+            async def mock_check_subreddit(reddit, subreddit_name, floor=None):
+                checked.append(subreddit_name)
+                return []
+
+            with mock.patch.object(RedditMonitor, 'check_subreddit', side_effect=mock_check_subreddit):
+                # A deadline already in the past defers everything
+                await reddit_monitor._process_all_filters(None, None, deadline=time.monotonic() - 1)
+                self.assertEqual(checked, [])
+                self.assertEqual(sorted(reddit_monitor._carryover), ["sub_a", "sub_b", "sub_c"])
+
+                reddit_monitor._carryover = ["sub_c"]
+                await reddit_monitor._process_all_filters(None, None)
+                self.assertEqual(checked[0], "sub_c", "Carried-over subreddit is checked first")
+                self.assertEqual(sorted(checked), ["sub_a", "sub_b", "sub_c"])
+                self.assertEqual(reddit_monitor._carryover, [])
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_unavailable_subreddit_opens_breaker_and_notifies_once(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor(
+                client_id='dummy_id',
+                client_secret='dummy_secret',
+                user_agent='dummy_agent',
+                session_factory=self.Session,
+                max_posts=100
+            )
+            await reddit_monitor.add_filter("user1", "test", "gone", "entry1", ["test"])
+            await reddit_monitor.add_filter("user2", "test", "gone", "entry1", ["test"])
+
+            check_subreddit = AsyncMock(side_effect=SubredditUnavailableError("gone", "private"))
+            mock_discord = MagicMock()
+            mock_user = AsyncMock()
+            mock_discord.fetch_user = AsyncMock(return_value=mock_user)
+
+            with mock.patch.object(RedditMonitor, 'check_subreddit', check_subreddit):
+                await reddit_monitor._process_all_filters(mock_discord, None)
+                await reddit_monitor._process_all_filters(mock_discord, None)
+
+            # The second cycle is skipped by the open breaker
+            self.assertEqual(check_subreddit.await_count, 1)
+            self.assertEqual(mock_user.send.await_count, 2, "Each affected user is told once")
+            self.assertEqual(reddit_monitor.breakers.get("gone").last_error, "r/gone is unavailable (private)")
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_recovered_subreddit_is_no_longer_reported_unavailable(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor('dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session)
+            await reddit_monitor.add_filter("user1", "test", "back", "entry1", ["test"])
+            mock_discord = MagicMock(fetch_user=AsyncMock(return_value=AsyncMock()))
+
+            failing = AsyncMock(side_effect=SubredditUnavailableError("back", "private"))
+            with mock.patch.object(RedditMonitor, 'check_subreddit', failing):
+                await reddit_monitor._process_all_filters(mock_discord, None)
+            self.assertEqual(reddit_monitor.subreddit_status_cache.get("back"), "private")
+
+            reddit_monitor.breakers.get("back").retry_at = 0
+            with mock.patch.object(RedditMonitor, 'check_subreddit', AsyncMock(return_value=[])):
+                await reddit_monitor._process_all_filters(mock_discord, None)
+            self.assertIsNone(reddit_monitor.subreddit_status_cache.get("back"))
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_new_filter_gets_targeted_check_with_bounded_backfill(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor(
+                client_id='dummy_id',
+                client_secret='dummy_secret',
+                user_agent='dummy_agent',
+                session_factory=self.Session,
+                max_posts=100,
+                new_filter_backfill=3600,
+                event_debounce=0.05
+            )
+            await reddit_monitor.add_filter("user1", "test", "other_sub", "entry1", ["test"])
+            events = reddit_monitor.events.subscribe()
+            consumer = asyncio.create_task(reddit_monitor._consume_filter_events(None, events))
+
+            now = datetime.now(timezone.utc)
+            recent = self._create_mock_post(now - timedelta(minutes=30))
+            stale = self._create_mock_post(now - timedelta(hours=5))
+            check_subreddit = AsyncMock(return_value=[recent, stale])
+            delivered = []
+            async def mock_process_matches(discord_client, posts, user_sub, entry, compiled=None, fuzzy_index=None):
+                self.assertNotIn('keywords', entry.__dict__, "The match stage reads keyword rows only")
+                self.assertEqual(compiled.title, ('test',))
+                delivered.extend(posts)
+                return len(posts)
+            reddit_monitor.process_matches = mock_process_matches
+
+            with mock.patch.object(RedditMonitor, 'check_subreddit', check_subreddit):
+                await reddit_monitor.add_filter("user1", "test", "test_sub", "entry1", ["test"])
+                # Added and removed within the debounce window: no check at all
+                await reddit_monitor.add_filter("user2", "test", "gone_sub", "entry1", ["test"])
+                await reddit_monitor.remove_filter("user2", "gone_sub", "entry1")
+                for _ in range(100):
+                    if delivered and not reddit_monitor._claimed_entries:
+                        break
+                    await asyncio.sleep(0.01)
+                consumer.cancel()
+                await asyncio.gather(consumer, return_exceptions=True)
+
+            checked = [call.args[1] for call in check_subreddit.await_args_list]
+            self.assertEqual(checked, ["test_sub"])
+            self.assertEqual(delivered, [recent], "Only posts inside the backfill window match")
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_import_filters_upserts_and_exports(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor('dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session)
+            await reddit_monitor.add_filter("user1", "old_name", "deals", "tv", ["oled"], channel_id="10", role_id="5")
+
+            count = await reddit_monitor.import_filters("user1", "new_name", [
+                FilterSpec("deals", "tv", ["qled", "65"]),
+                FilterSpec("deals", "laptop", ["thinkpad"], channel_id="10"),
+                FilterSpec("hardwareswap", "gpu", ["3080"], ["abc123"]),
+            ])
+            self.assertEqual(count, 3)
+
+            async with self.Session() as session:
+                user_subs = (await session.execute(select(UserSubreddit))).scalars().all()
+                self.assertEqual(len(user_subs), 2)
+                self.assertEqual({u.discord_name for u in user_subs}, {"new_name"})
+                self.assertEqual(await session.scalar(select(func.count(EntryFilter.id))), 3)
+
+            exported = await reddit_monitor.export_filters("user1")
+            # The imported tv entry is a plain DM filter again
+            self.assertEqual(exported, [
+                FilterSpec("deals", "laptop", ["thinkpad"], channel_id="10"),
+                FilterSpec("deals", "tv", ["qled", "65"]),
+                FilterSpec("hardwareswap", "gpu", ["3080"], ["abc123"]),
+            ])
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_keywords_are_normalized_into_keyword_rows(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor('dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session)
+            await reddit_monitor.add_filter("user1", "a", "deals", "gpu", ["RTX", "flair:Selling", "rtx"])
+            await reddit_monitor.add_filter("user2", "b", "hardwareswap", "gpu", ["rtx"])
+
+            async def keyword_rows():
+                async with self.Session() as session:
+                    result = await session.execute(
+                        select(EntryKeyword.entry_filter_id, EntryKeyword.field, EntryKeyword.keyword)
+                        .order_by(EntryKeyword.id)
+                    )
+                    return result.all()
+
+            rows = await keyword_rows()
+            self.assertEqual([(field, keyword) for _, field, keyword in rows],
+                             [("title", "rtx"), ("flair", "selling"), ("title", "rtx")])
+            async with self.Session() as session:
+                entry = (await session.execute(select(EntryFilter).limit(1))).scalar_one()
+                self.assertNotIn('keyword_rows', entry.__dict__, "Only loaded when asked for")
+                self.assertEqual(entry.compiled_keywords.flair, ('selling',))
+            self.assertEqual(await reddit_monitor.find_entries_with_keyword("RTX"),
+                             [("user1", "deals", "gpu"), ("user2", "hardwareswap", "gpu")])
+            self.assertEqual(await reddit_monitor.find_entries_with_keyword("rtx", subreddit="deals"),
+                             [("user1", "deals", "gpu")])
+            self.assertEqual(await reddit_monitor.find_entries_with_keyword("flair:selling"),
+                             [("user1", "deals", "gpu")])
+
+            # Updating keeps unchanged rows and replaces the rest
+            await reddit_monitor.add_filter("user1", "a", "deals", "gpu", ["rtx", "4090"])
+            updated = await keyword_rows()
+            self.assertIn(rows[0], updated)
+            self.assertEqual({(f, k) for entry_id, f, k in updated if entry_id == rows[0][0]},
+                             {("title", "rtx"), ("title", "4090")})
+
+            await reddit_monitor.import_filters("user2", "b", [FilterSpec("hardwareswap", "gpu", ["3080", "Body:16GB"])])
+            self.assertEqual(await reddit_monitor.find_entries_with_keyword("body:16gb"),
+                             [("user2", "hardwareswap", "gpu")])
+            self.assertEqual(await reddit_monitor.find_entries_with_keyword("rtx"), [("user1", "deals", "gpu")])
+
+            await reddit_monitor.remove_filter("user1", "deals", "gpu")
+            self.assertEqual(await reddit_monitor.find_entries_with_keyword("rtx"), [])
+            self.assertEqual(len(await keyword_rows()), 2)
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_channel_filters_fan_out_one_message_per_post(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor('dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session)
+            await reddit_monitor.add_filter("1", "a", "deals", "gpu", ["gpu"], channel_id="99")
+            await reddit_monitor.add_filter("2", "b", "deals", "cheap gpu", ["gpu", "cheap"], channel_id="99")
+            await reddit_monitor.add_filter("2", "b", "deals", "any gpu", ["gpu"], channel_id="99")
+            await reddit_monitor.add_filter("3", "c", "deals", "dm", ["gpu"])
+
+            post = self._create_mock_post(datetime.now(timezone.utc))
+            post.title = "Cheap GPU"
+            post.name = "t3_gpu"
+            channel = MagicMock(send=AsyncMock())
+            mock_discord = MagicMock()
+            mock_discord.get_channel.return_value = channel
+            dm_user = MagicMock(send=AsyncMock())
+            mock_discord.fetch_user = AsyncMock(return_value=dm_user)
+
+            with mock.patch.object(RedditMonitor, 'check_subreddit', AsyncMock(return_value=[post])):
+                await reddit_monitor._process_all_filters(mock_discord, None)
+
+            channel.send.assert_awaited_once()
+            content = channel.send.await_args.args[0]
+            self.assertIn("<@1>", content)
+            self.assertEqual(content.count("<@2>"), 1, "A user matched by several entries is mentioned once")
+            self.assertNotIn("<@3>", content)
+            dm_user.send.assert_awaited_once()
+
+            async with self.Session() as session:
+                unchecked = await session.scalar(
+                    select(func.count(EntryFilter.id)).where(EntryFilter.last_check_at.is_(None))
+                )
+            self.assertEqual(unchecked, 0)
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_comment_filters_read_one_combined_listing_incrementally(self):
+        await self.asyncSetUp()
+        try:
+            async with FakeRedditServer() as server:
+                reddit_monitor = RedditMonitor(
+                    'dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session,
+                    reddit_kwargs=server.reddit_kwargs()
+                )
+                megathread, other = server.add_posts("deals", ["Daily restock thread", "GPU for sale"])
+                server.add_comments("hwswap", ["old news"], created_utc=time.time() - 7200)
+                await reddit_monitor.add_filter("1", "a", "deals", "posts", ["gpu"])
+                await reddit_monitor.add_filter("1", "a", "deals", "restocks", ["gpu"], comment_threads=[megathread['id']])
+                await reddit_monitor.add_filter("2", "b", "hwswap", "comments", ["gpu"], comment_threads=[])
+                server.add_comments("deals", ["GPU back in stock"], link_id=megathread['name'])
+                server.add_comments("deals", ["any gpu left?"], link_id=other['name'])
+                server.add_comments("hwswap", ["selling a gpu"])
+
+                sent = []
+                user = MagicMock(send=AsyncMock(side_effect=sent.append))
+                mock_discord = MagicMock(fetch_user=AsyncMock(return_value=user))
+                reddit = await reddit_monitor.initialize_reddit()
+                async with reddit:
+                    await reddit_monitor._process_all_filters(mock_discord, reddit)
+                    self.assertEqual(len(sent), 3)
+                    self.assertTrue(any(m.startswith("Match found: GPU for sale\n") for m in sent), sent)
+                    self.assertTrue(any(m.startswith("Match found: GPU back in stock (comment in: Daily restock")
+                                        for m in sent), sent)
+                    self.assertFalse(any("any gpu left" in m for m in sent), "Not in the watched thread")
+                    self.assertFalse(any("old news" in m for m in sent))
+
+                    server.add_comments("hwswap", ["another gpu"])
+                    sent.clear()
+                    await reddit_monitor._process_all_filters(mock_discord, reddit)
+
+            self.assertEqual(len(sent), 1)
+            self.assertIn("another gpu", sent[0])
+            # Both subreddits' comments came from one combined listing per cycle
+            self.assertEqual(server.requests['/r/deals+hwswap/comments/'] + server.requests['/r/hwswap+deals/comments/'], 2)
+            self.assertEqual(server.requests['/r/hwswap/new'], 0, "No post filters on hwswap")
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_delivery_reuses_the_batch_fuzzy_index(self):
+        await self.asyncSetUp()
+        try:
+            async with FakeRedditServer() as server:
+                reddit_monitor = RedditMonitor(
+                    'dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session,
+                    reddit_kwargs=server.reddit_kwargs()
+                )
+                await reddit_monitor.add_filter("1", "a", "deals", "gpus", ["fuzzy:rtx 4090"])
+                await reddit_monitor.add_filter("2", "b", "deals", "gpus", ["fuzzy:rtx4090", "fe"])
+                server.add_posts("deals", ["RTX-4090 FE for sale", "Monitor"])
+
+                sent = []
+                user = MagicMock(send=AsyncMock(side_effect=sent.append))
+                mock_discord = MagicMock(fetch_user=AsyncMock(return_value=user))
+                reddit = await reddit_monitor.initialize_reddit()
+                async with reddit:
+                    with patch('reddit_monitor.FuzzyIndex', wraps=FuzzyIndex) as index:
+                        await reddit_monitor._process_all_filters(mock_discord, reddit)
+
+            self.assertEqual(len(sent), 2)
+            self.assertEqual(index.call_count, 1, "One index for the subreddit batch, none per delivery")
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_comments_skipped_for_a_claimed_entry_are_refetched(self):
+        await self.asyncSetUp()
+        try:
+            async with FakeRedditServer() as server:
+                reddit_monitor = RedditMonitor(
+                    'dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session,
+                    reddit_kwargs=server.reddit_kwargs()
+                )
+                await reddit_monitor.add_filter("1", "a", "hwswap", "comments", ["gpu"], comment_threads=[])
+                async with self.Session() as session:
+                    entry_id = (await session.execute(select(EntryFilter.id))).scalar_one()
+                server.add_comments("hwswap", ["selling a gpu"])
+
+                sent = []
+                user = MagicMock(send=AsyncMock(side_effect=sent.append))
+                mock_discord = MagicMock(fetch_user=AsyncMock(return_value=user))
+                reddit = await reddit_monitor.initialize_reddit()
+                async with reddit:
+                    # A targeted check still holds the entry when the cycle reads its comments
+                    reddit_monitor._claimed_entries.add(entry_id)
+                    await reddit_monitor._process_all_filters(mock_discord, reddit)
+                    self.assertEqual(sent, [])
+
+                    reddit_monitor._claimed_entries.discard(entry_id)
+                    await reddit_monitor._process_all_filters(mock_discord, reddit)
+
+            self.assertEqual(len(sent), 1)
+            self.assertIn("selling a gpu", sent[0])
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_failed_delivery_is_refetched_past_a_small_listing(self):
+        await self.asyncSetUp()
+        try:
+            async with FakeRedditServer() as server:
+                reddit_monitor = RedditMonitor(
+                    'dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session,
+                    max_posts=100, min_posts=5, reddit_kwargs=server.reddit_kwargs()
+                )
+                clock = [time.time()]
+                reddit_monitor.listing_sizer = ListingSizer(5, 100, clock=lambda: clock[0])
+                await reddit_monitor.add_filter("1", "a", "deals", "gpus", ["gpu"])
+                server.add_posts("deals", ["GPU for sale"], created_utc=clock[0] - 100)
+                for i in range(9):
+                    server.add_posts("deals", [f"noise {i}"], created_utc=clock[0] - 90 + i * 10)
+
+                sent = []
+                user = MagicMock(send=AsyncMock(side_effect=sent.append))
+                mock_discord = MagicMock(fetch_user=AsyncMock(side_effect=[RuntimeError("Discord down"), user]))
+                reddit = await reddit_monitor.initialize_reddit()
+                async with reddit:
+                    await reddit_monitor._process_all_filters(mock_discord, reddit)
+                    self.assertEqual(sent, [])
+
+                    # One new post a second later: the sizer alone asks for 5 posts
+                    clock[0] += 1
+                    server.add_posts("deals", ["noise 9"], created_utc=clock[0])
+                    self.assertEqual(reddit_monitor.listing_sizer.limit("deals"), 5)
+                    await reddit_monitor._process_all_filters(mock_discord, reddit)
+
+            self.assertEqual(len(sent), 1)
+            self.assertTrue(sent[0].startswith("Match found: GPU for sale\n"), sent)
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_closed_dms_count_as_delivered(self):
+        await self.asyncSetUp()
+        try:
+            async with FakeRedditServer() as server:
+                reddit_monitor = RedditMonitor(
+                    'dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session,
+                    max_posts=100, min_posts=5, reddit_kwargs=server.reddit_kwargs()
+                )
+                await reddit_monitor.add_filter("1", "a", "deals", "gpus", ["gpu"])
+                now = time.time()
+                server.add_posts("deals", ["GPU for sale"], created_utc=now - 3000)
+                for i in range(29):
+                    server.add_posts("deals", [f"noise {i}"], created_utc=now - 2900 + i * 100)
+
+                forbidden = discord.Forbidden(MagicMock(status=403, reason="Forbidden"), "Cannot send messages to this user")
+                user = MagicMock(send=AsyncMock(side_effect=forbidden))
+                mock_discord = MagicMock(fetch_user=AsyncMock(return_value=user))
+                reddit = await reddit_monitor.initialize_reddit()
+                async with reddit:
+                    await reddit_monitor._process_all_filters(mock_discord, reddit)
+                    user.send.assert_awaited_once()
+                    first = server.requests['/r/deals/new']
+
+                    server.add_posts("deals", ["noise 29"])
+                    await reddit_monitor._process_all_filters(mock_discord, reddit)
+
+            # The entry moved on, so the next poll doesn't page back for it
+            self.assertEqual(server.requests['/r/deals/new'] - first, 1)
+            async with self.Session() as session:
+                self.assertIsNotNone((await session.execute(select(EntryFilter))).scalar_one().last_check_at)
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_entry_floor_goes_back_at_most_the_backfill(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor('dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session)
+            await reddit_monitor.add_filter("1", "a", "deals", "gpus", ["gpu"])
+            async with self.Session() as session:
+                await session.execute(update(EntryFilter).values(last_check_at=datetime.now(timezone.utc) - timedelta(days=7)))
+                await session.commit()
+            await reddit_monitor._plan_fetches()
+            self.assertGreaterEqual(reddit_monitor._entry_floors["deals"], time.time() - reddit_monitor.new_filter_backfill - 5)
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_comment_threads_must_fit_their_column(self):
+        await self.asyncSetUp()
+        try:
+            reddit_monitor = RedditMonitor('dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session)
+            with self.assertRaises(RedditMonitorError):
+                await reddit_monitor.add_filter("1", "a", "deals", "megathreads", ["gpu"],
+                                                comment_threads=["z" * 12] * 20)
+            await reddit_monitor.add_filter("1", "a", "deals", "megathreads", ["gpu"], comment_threads=["z" * 12] * 19)
+        finally:
+            await self.asyncTearDown()
+
+    @async_test
+    async def test_half_open_member_of_a_failing_comment_group_is_probed(self):
+        await self.asyncSetUp()
+        try:
+            async with FakeRedditServer() as server:
+                server.add_subreddit("dead", status=403)
+                server.add_subreddit("alive")
+                reddit_monitor = RedditMonitor(
+                    'dummy_id', 'dummy_secret', 'dummy_agent', session_factory=self.Session,
+                    reddit_kwargs=server.reddit_kwargs()
+                )
+                await reddit_monitor.add_filter("1", "a", "dead", "comments", ["gpu"], comment_threads=[])
+                await reddit_monitor.add_filter("1", "a", "alive", "comments", ["gpu"], comment_threads=[])
+                mock_discord = MagicMock(fetch_user=AsyncMock(return_value=MagicMock(send=AsyncMock())))
+                reddit = await reddit_monitor.initialize_reddit()
+                async with reddit:
+                    await reddit_monitor._process_all_filters(mock_discord, reddit)
+                    breaker = reddit_monitor.breakers.get("dead")
+                    self.assertEqual((breaker.state, breaker.opens), ('open', 1))
+
+                    # Backoff expired: the group listing fails again and the
+                    # one-by-one retry must spend dead's half-open probe
+                    breaker.retry_at = 0
+                    await reddit_monitor._process_all_filters(mock_discord, reddit)
+
+            self.assertEqual(server.requests['/r/dead/comments/'], 2)
+            self.assertEqual((breaker.state, breaker.opens), ('open', 2))
+            self.assertTrue(reddit_monitor.breakers.allow("alive"))
+        finally:
+            await self.asyncTearDown()
+
+    def test_next_tick_is_fixed_rate_and_skips_overruns(self):
+        reddit_monitor = RedditMonitor('dummy_id', 'dummy_secret', 'dummy_agent', session_factory=None)
+        now = time.monotonic()
+
+        # Short cycle: next tick is exactly one interval after the last, not after the cycle
+        self.assertAlmostEqual(reddit_monitor._next_tick(now - 2, 10), now + 8, places=6)
+
+        # Cycle overran 2.5 intervals: the missed ticks are skipped
+        tick = reddit_monitor._next_tick(now - 25, 10)
+        self.assertAlmostEqual(tick, now + 5, places=2)
+
     def _create_mock_post(self, post_time: datetime) -> MagicMock:
         post = MagicMock()
         post.created_utc = post_time.timestamp()
@@ -440,5 +1044,93 @@ class TestRedditMonitorSQLite(unittest.TestCase):
         post.permalink = "/r/test/post"
         return post
 
+class TestRedditMonitorFakeReddit(unittest.TestCase):
+    """Exercise asyncpraw's real HTTP path against the local fake Reddit server."""
+
+    def _make_monitor(self, server, max_posts=100):
+        return RedditMonitor(
+            client_id='dummy_id',
+            client_secret='dummy_secret',
+            user_agent='dummy_agent',
+            session_factory=None,
+            max_posts=max_posts,
+            reddit_kwargs=server.reddit_kwargs()
+        )
+
+    @async_test
+    async def test_check_subreddit_paginates(self):
+        async with FakeRedditServer() as server:
+            server.add_posts("deals", [f"post {i}" for i in range(250)])
+            reddit_monitor = self._make_monitor(server, max_posts=250)
+
+            reddit = await reddit_monitor.initialize_reddit()
+            async with reddit:
+                posts = await reddit_monitor.check_subreddit(reddit, "deals")
+
+            self.assertEqual(len(posts), 250)
+            self.assertEqual(posts[0].title, "post 249")
+            # 250 posts at 100 per page
+            self.assertEqual(server.requests['/r/deals/new'], 3)
+
+    @async_test
+    async def test_check_subreddit_pages_past_a_truncated_listing(self):
+        async with FakeRedditServer() as server:
+            server.add_posts("deals", [f"old {i}" for i in range(30)], created_utc=time.time() - 3600)
+            reddit_monitor = RedditMonitor(
+                'dummy_id', 'dummy_secret', 'dummy_agent', None,
+                max_posts=10, min_posts=5, reddit_kwargs=server.reddit_kwargs()
+            )
+
+            reddit = await reddit_monitor.initialize_reddit()
+            async with reddit:
+                self.assertEqual(len(await reddit_monitor.check_subreddit(reddit, "deals")), 10)
+                # The first listing showed no arrival rate, so the next poll asks for min_posts
+                self.assertEqual(reddit_monitor.listing_sizer.limit("deals"), 5)
+                server.add_posts("deals", [f"new {i}" for i in range(25)])
+                posts = await reddit_monitor.check_subreddit(reddit, "deals")
+
+            titles = [post.title for post in posts]
+            self.assertEqual(titles[:25], [f"new {i}" for i in reversed(range(25))])
+            self.assertIn("old 29", titles)
+            # One request for the first poll; the truncated second poll asks for 5, then one full page
+            self.assertEqual(server.requests['/r/deals/new'], 3)
+
+    @async_test
+    async def test_check_subreddit_surfaces_rate_limit(self):
+        async with FakeRedditServer() as server:
+            server.add_posts("deals", ["post"])
+            server.fail_next(429)
+            reddit_monitor = self._make_monitor(server)
+
+            reddit = await reddit_monitor.initialize_reddit()
+            async with reddit:
+                with self.assertRaises(RedditMonitorError):
+                    await reddit_monitor.check_subreddit(reddit, "deals")
+                # The injected error is consumed, the next poll succeeds
+                posts = await reddit_monitor.check_subreddit(reddit, "deals")
+
+            self.assertEqual(len(posts), 1)
+            self.assertEqual(server.requests['error_429'], 1)
+
+    @async_test
+    async def test_missing_and_private_subreddits_are_unavailable(self):
+        async with FakeRedditServer() as server:
+            server.add_subreddit("secret", status=403)
+            server.add_subreddit("deals")
+            reddit_monitor = self._make_monitor(server)
+
+            reddit = await reddit_monitor.initialize_reddit()
+            async with reddit:
+                with self.assertRaises(SubredditUnavailableError) as raised:
+                    await reddit_monitor.check_subreddit(reddit, "nosuchsub")
+            self.assertEqual(raised.exception.reason, "banned")
+
+            self.assertEqual(await reddit_monitor.subreddit_status("secret"), "private")
+            self.assertEqual(await reddit_monitor.subreddit_status("deals"), "ok")
+            # Cached, so no second lookup
+            await reddit_monitor.subreddit_status("secret")
+            self.assertEqual(server.requests['/r/secret/about/'], 1)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
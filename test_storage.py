@@ -0,0 +1,72 @@
+import unittest
+import asyncio
+import os
+import tempfile
+
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import storage
+from models import Base, EntryFilter, UserSubreddit
+from reddit_monitor import RedditMonitor
+
+# Decorator to run async test methods
+def async_test(func):
+    def wrapper(*args, **kwargs):
+        return asyncio.run(func(*args, **kwargs))
+    return wrapper
+
+class TestStorage(unittest.TestCase):
+    def test_backend_detection(self):
+        self.assertTrue(storage.is_memory_sqlite('sqlite+aiosqlite:///:memory:'))
+        self.assertTrue(storage.is_memory_sqlite('sqlite+aiosqlite://'))
+        self.assertFalse(storage.supports_concurrent_reads('sqlite+aiosqlite:///:memory:'))
+        self.assertTrue(storage.supports_concurrent_reads('sqlite+aiosqlite:///data/filters.db'))
+        self.assertTrue(storage.supports_concurrent_reads('mysql+aiomysql://u:p@db:3306/filters'))
+        self.assertNotIn('pool_size', storage.engine_options('sqlite+aiosqlite:///data/filters.db'))
+        self.assertEqual(storage.engine_options('mysql+aiomysql://u:p@db:3306/filters')['pool_size'], 10)
+
+    @async_test
+    async def test_sqlite_file_runs_in_wal_mode(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = storage.create_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'data', 'filters.db')}")
+            try:
+                async with engine.connect() as conn:
+                    pragmas = {
+                        name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                        for name in ('journal_mode', 'synchronous', 'busy_timeout', 'foreign_keys')
+                    }
+            finally:
+                await engine.dispose()
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'data', 'filters.db')))
+
+        # synchronous=NORMAL is reported as 1
+        self.assertEqual(pragmas, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000, 'foreign_keys': 1})
+
+    @async_test
+    async def test_readers_are_not_blocked_by_an_open_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = storage.create_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'filters.db')}")
+            Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                monitor = RedditMonitor('id', 'secret', 'agent', Session, concurrent_reads=True)
+                await monitor.add_filter('user1', 'user1', 'deals', 'gpu', ['rtx'])
+
+                async with Session() as writer:
+                    await writer.execute(update(EntryFilter).values(keywords='rtx,4090'))
+                    # The write transaction is still open; a WAL reader sees the last commit
+                    profile = await asyncio.wait_for(monitor.get_user_profile('user1'), timeout=2)
+                    self.assertIn('rtx', profile)
+                    self.assertNotIn('4090', profile)
+                    await writer.commit()
+
+                async with Session() as reader:
+                    self.assertEqual((await reader.get(UserSubreddit, 1)).entries[0].keywords, 'rtx,4090')
+            finally:
+                await engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
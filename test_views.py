@@ -0,0 +1,92 @@
+import unittest
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+
+from views import ConfirmView, PageView, confirm, send_pages
+
+# Decorator to run async test methods
+def async_test(func):
+    def wrapper(*args, **kwargs):
+        return asyncio.run(func(*args, **kwargs))
+    return wrapper
+
+def make_interaction(user_id):
+    interaction = MagicMock()
+    interaction.user.id = user_id
+    interaction.response.edit_message = AsyncMock()
+    interaction.response.send_message = AsyncMock()
+    return interaction
+
+class TestConfirmView(unittest.TestCase):
+    @async_test
+    async def test_only_author_can_answer(self):
+        view = ConfirmView(author_id=1)
+        stranger = make_interaction(2)
+        self.assertFalse(await view.interaction_check(stranger))
+        stranger.response.send_message.assert_awaited_once()
+
+        author = make_interaction(1)
+        self.assertTrue(await view.interaction_check(author))
+        await view.cancel.callback(author)
+        self.assertIs(view.value, False)
+        author.response.edit_message.assert_awaited_once_with(view=None)
+
+    @async_test
+    async def test_confirm_returns_answer_or_none_on_timeout(self):
+        ctx = MagicMock()
+        ctx.author.id = 1
+        message = MagicMock(delete=AsyncMock())
+
+        async def press_confirm(prompt, view):
+            asyncio.get_running_loop().call_soon(
+                lambda: asyncio.ensure_future(view.confirm.callback(make_interaction(1)))
+            )
+            return message
+        ctx.send = AsyncMock(side_effect=press_confirm)
+        self.assertTrue(await confirm(ctx, "Sure?"))
+
+        async def ignore(prompt, view):
+            # What sending does for a real message: start the view's timeout
+            view._start_listening_from_store(MagicMock())
+            return message
+        ctx.send = AsyncMock(side_effect=ignore)
+        self.assertIsNone(await confirm(ctx, "Sure?", timeout=0.01))
+        message.delete.assert_awaited_once()
+
+
+class TestPageView(unittest.TestCase):
+    @async_test
+    async def test_buttons_flip_pages_and_stop_at_the_ends(self):
+        pages = [discord.Embed(description=f"page {i}") for i in range(3)]
+        view = PageView(author_id=1, pages=pages)
+        self.assertTrue(view.previous.disabled)
+
+        author = make_interaction(1)
+        await view.next.callback(author)
+        await view.next.callback(author)
+        self.assertEqual(view.index, 2)
+        self.assertTrue(view.next.disabled)
+        author.response.edit_message.assert_awaited_with(embed=pages[2], view=view)
+
+        await view.previous.callback(author)
+        self.assertEqual(view.index, 1)
+        self.assertFalse(view.previous.disabled or view.next.disabled)
+
+    @async_test
+    async def test_single_page_is_sent_without_buttons(self):
+        ctx = MagicMock()
+        ctx.author.id = 1
+        ctx.send = AsyncMock()
+        page = discord.Embed(description="only")
+        await send_pages(ctx, [page])
+        ctx.send.assert_awaited_once_with(embed=page)
+
+        ctx.send.reset_mock()
+        await send_pages(ctx, [page, discord.Embed(description="second")])
+        self.assertIsInstance(ctx.send.await_args.kwargs['view'], PageView)
+
+
+if __name__ == '__main__':
+    unittest.main()
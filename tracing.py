@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+import zlib
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SPANS_DROPPED = metrics.REGISTRY.counter(
+    'tracing_spans_dropped_total', "Spans dropped because the export buffer was full.")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        # OTLP JSON encodes 64-bit integers as strings
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()]
+
+
+class Span:
+    """A timed operation within a trace. Finished spans are handed to the tracer's exporter."""
+
+    __slots__ = ('tracer', 'trace_id', 'span_id', 'parent_id', 'name', 'kind',
+                 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(
+        self,
+        tracer: Tracer,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+        kind: int = SPAN_KIND_INTERNAL
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes) if attributes else {}
+        self.error: Optional[str] = None
+
+    def child(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+        kind: int = SPAN_KIND_INTERNAL
+    ) -> Span:
+        return Span(self.tracer, name, self.trace_id, self.span_id, attributes, start_ns, kind)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        self.tracer.exporter.add(self)
+
+    def __enter__(self) -> Span:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.record_error(exc)
+        self.end()
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': _otlp_attributes(self.attributes),
+            'status': {'code': STATUS_ERROR, 'message': self.error} if self.error else {'code': STATUS_OK},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+class FileSpanExporter:
+    """
+    Buffers finished spans and writes them in batches to a rotating file.
+
+    Each line is one OTLP/JSON ``ExportTraceServiceRequest``, so the file can
+    be replayed into any OTLP collector. Spans are only buffered on the event
+    loop; the file write happens in a worker thread from ``run()``.
+    """
+
+    def __init__(
+        self,
+        path: str = os.path.join('traces', 'spans.jsonl'),
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        flush_interval: float = 5.0,
+        max_buffer: int = 10_000,
+        service_name: str = 'reddit-discord-bot'
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.service_name = service_name
+        self._buffer: List[Span] = []
+        self._handler: Optional[RotatingFileHandler] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, span: Span) -> None:
+        if len(self._buffer) >= self.max_buffer:
+            SPANS_DROPPED.inc()
+            return
+        self._buffer.append(span)
+
+    def _take_batch(self) -> List[Span]:
+        batch, self._buffer = self._buffer, []
+        return batch
+
+    def _write(self, batch: List[Span]) -> None:
+        if not batch:
+            return
+        if self._handler is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backup_count)
+            self._handler.setFormatter(logging.Formatter('%(message)s'))
+        request = {
+            'resourceSpans': [{
+                'resource': {'attributes': _otlp_attributes({'service.name': self.service_name})},
+                'scopeSpans': [{
+                    'scope': {'name': 'reddit_monitor'},
+                    'spans': [span.to_otlp() for span in batch],
+                }],
+            }],
+        }
+        self._handler.emit(logging.makeLogRecord({'msg': json.dumps(request, separators=(',', ':'))}))
+
+    def flush(self) -> None:
+        """Write buffered spans synchronously."""
+        self._write(self._take_batch())
+
+    async def run(self) -> None:
+        """Flush buffered spans from a worker thread every ``flush_interval`` seconds."""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await asyncio.to_thread(self._write, self._take_batch())
+        finally:
+            self.flush()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._handler is not None:
+            self._handler.close()
+            self._handler = None
+
+
+class Tracer:
+    """
+    Creates per-post traces with head sampling.
+
+    Sampling is decided from a hash of the post fullname, so every span for a
+    given post makes the same decision. With no exporter or a zero ratio the
+    tracer is disabled and ``should_sample`` is a single attribute check.
+    """
+
+    def __init__(self, exporter: Optional[FileSpanExporter] = None, sample_ratio: float = 0.0):
+        self.exporter = exporter
+        self.sample_ratio = min(max(sample_ratio, 0.0), 1.0)
+        self.enabled = exporter is not None and self.sample_ratio > 0
+        self._threshold = int(self.sample_ratio * 0xFFFFFFFF)
+
+    def should_sample(self, key: str) -> bool:
+        if not self.enabled:
+            return False
+        return zlib.crc32(key.encode()) <= self._threshold
+
+    def start_trace(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None
+    ) -> Span:
+        return Span(self, name, os.urandom(16).hex(), attributes=attributes, start_ns=start_ns)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+import discord
+from discord.ext import commands
+
+
+class AuthorView(discord.ui.View):
+    """A view whose buttons only the user who ran the command can press."""
+
+    def __init__(self, author_id: int, timeout: float):
+        super().__init__(timeout=timeout)
+        self.author_id = author_id
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Only the person who ran the command can answer this.", ephemeral=True)
+            return False
+        return True
+
+
+class ConfirmView(AuthorView):
+    """
+    Confirm/Cancel buttons that only the invoking user can press.
+
+    Discord routes a button press straight to its view by custom id, so a
+    pending confirmation costs nothing per message, unlike a
+    ``bot.wait_for('message')`` check that runs against every message the
+    bot sees until it times out.
+    """
+
+    def __init__(self, author_id: int, timeout: float = 30.0):
+        super().__init__(author_id, timeout)
+        # True for confirm, False for cancel, None while pending or after a timeout
+        self.value: Optional[bool] = None
+
+    async def _answer(self, interaction: discord.Interaction, value: bool) -> None:
+        self.value = value
+        # Drop the buttons so the prompt can't be answered twice
+        await interaction.response.edit_message(view=None)
+        self.stop()
+
+    @discord.ui.button(label='Confirm', style=discord.ButtonStyle.success)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        await self._answer(interaction, True)
+
+    @discord.ui.button(label='Cancel', style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        await self._answer(interaction, False)
+
+
+async def confirm(ctx: commands.Context, prompt: str, timeout: float = 30.0) -> Optional[bool]:
+    """
+    Ask the command's author to confirm with buttons.
+
+    Returns:
+        True or False for the button pressed, None if nobody answered in time
+        (the prompt is deleted in that case)
+    """
+    view = ConfirmView(ctx.author.id, timeout)
+    message = await ctx.send(prompt, view=view)
+    timed_out = await view.wait()
+    if timed_out:
+        await message.delete()
+        return None
+    return view.value
+
+
+class PageView(AuthorView):
+    """
+    Previous/Next buttons that flip one message through a list of embeds.
+
+    The pages are built up front, so flipping only edits the message and
+    never goes back to the monitor or the database.
+    """
+
+    def __init__(self, author_id: int, pages: List[discord.Embed], timeout: float = 120.0):
+        super().__init__(author_id, timeout)
+        self.pages = pages
+        self.index = 0
+        self.message: Optional[discord.Message] = None
+        self._update_buttons()
+
+    def _update_buttons(self) -> None:
+        self.previous.disabled = self.index == 0
+        self.next.disabled = self.index == len(self.pages) - 1
+
+    async def _show(self, interaction: discord.Interaction, index: int) -> None:
+        self.index = index
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages[index], view=self)
+
+    @discord.ui.button(label='Previous', style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        await self._show(interaction, max(self.index - 1, 0))
+
+    @discord.ui.button(label='Next', style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        await self._show(interaction, min(self.index + 1, len(self.pages) - 1))
+
+    async def on_timeout(self) -> None:
+        # Leave the current page up without buttons that no longer answer
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+
+async def send_pages(ctx: commands.Context, pages: List[discord.Embed], timeout: float = 120.0) -> discord.Message:
+    """Send embeds as one message, with page buttons for the author if there is more than one."""
+    if len(pages) == 1:
+        return await ctx.send(embed=pages[0])
+    view = PageView(ctx.author.id, pages, timeout)
+    view.message = await ctx.send(embed=pages[0], view=view)
+    return view.message